@@ -1,3 +1,7 @@
 from .analyzer import AIVisionAnalyzer
+from .batching import MicroBatcher
+from .onnx_backend import ONNXDetector
+from .service import InferenceService
+from .tracking import ObjectTracker, TrackingAnalyzer
 
-__all__ = ['AIVisionAnalyzer']
+__all__ = ['AIVisionAnalyzer', 'MicroBatcher', 'ONNXDetector', 'InferenceService', 'ObjectTracker', 'TrackingAnalyzer']
@@ -1,29 +1,78 @@
-import cv2
-import numpy as np
-from PIL import Image, ImageDraw
-import torch
+from concurrent.futures import Future
+from typing import Iterable, Optional
+
+from utils.config import Config
+from .detections import annotate, empty_detections, from_prediction
+from .model_store import load_in_background, load_yolov5
 
 class AIVisionAnalyzer:
-    def __init__(self):
+    """YOLOv5 object detection on captured frames.
+
+    With background=True the model loads on its own thread. ready is a
+    future that resolves once the model is usable; until then frames
+    analyze to None with no detections.
+    """
+    def __init__(self, min_confidence: float = 0.0, classes: Optional[Iterable[int]] = None,
+                 backend: Optional[str] = None, background: bool = False):
         self.model = None
-        try:
-            self.model = torch.hub.load('ultralytics/yolov5', 'yolov5s', pretrained=True)
-        except Exception as e:
-            print(f"Failed to load AI vision model: {e}")
+        self.detector = None
+        self.names = {}
+        self.min_confidence = min_confidence
+        self.classes = classes
+        self.settings = Config().vision
+        self.backend = backend or ('onnx' if self.settings['quantized'] else self.settings['backend'])
+        if background:
+            self.ready = load_in_background(self._load_model, name='vision-model-loader')
+        else:
+            self.ready = Future()
+            try:
+                self.ready.set_result(self._load_model())
+            except Exception as e:
+                print(f"Failed to load AI vision model: {e}")
+                self.ready.set_exception(e)
+
+    @property
+    def loading(self) -> bool:
+        return not self.ready.done()
+
+    def _load_model(self):
+        # Names first, so a frame analyzed as soon as the model appears can be labelled
+        if self.backend == 'onnx':
+            from .onnx_backend import load_detector
+            from .quantization import load_quantized_detector
+            load = load_quantized_detector if self.settings['quantized'] else load_detector
+            detector = load('yolov5s', self.settings['onnx_models'].get('yolov5s'),
+                            img_size=self.settings['img_size'], threads=self.settings['threads'])
+            self.names, self.detector, self.model = detector.names, detector, detector
+        else:
+            model = load_yolov5('yolov5s')
+            self.names, self.model = model.names, model
+        return self
     
     def analyze_frame(self, frame):
         if self.model is None:
-            return None, []
-            
-        results = self.model(frame)
-        detections = results.pandas().xyxy[0]
-        
-        # Draw bounding boxes and labels
-        annotated_frame = frame.copy()
-        for idx, det in detections.iterrows():
-            x1, y1, x2, y2 = int(det['xmin']), int(det['ymin']), int(det['xmax']), int(det['ymax'])
-            cv2.rectangle(annotated_frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-            cv2.putText(annotated_frame, f"{det['name']} {det['confidence']:.2f}",
-                       (x1, y1-10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
-        
-        return annotated_frame, detections.to_dict('records')
+            return None, empty_detections()
+        return self.analyze_batch([frame])[0]
+
+    def analyze_batch(self, frames):
+        """Analyze several frames in one forward pass.
+
+        Returns an (annotated_frame, detections) pair per frame, in order.
+        Detections are structured arrays of ai_vision.detections.DETECTION_DTYPE;
+        use detections.to_records() or to_dataframe() with self.names for
+        the dict or pandas view.
+        """
+        if self.model is None:
+            return [(None, empty_detections()) for _ in frames]
+        if not frames:
+            return []
+
+        if self.detector is not None:
+            predictions = self.detector.predict(list(frames))
+        else:
+            predictions = self.model(list(frames)).xyxy
+        results = []
+        for frame, prediction in zip(frames, predictions):
+            detections = from_prediction(prediction, self.min_confidence, self.classes)
+            results.append((annotate(frame, detections, self.names), detections))
+        return results
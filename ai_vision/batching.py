@@ -0,0 +1,97 @@
+import logging
+import time
+from concurrent.futures import Future
+from threading import Thread, Condition
+from typing import Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class MicroBatcher:
+    """Collects frames from several sources and analyzes them together.
+
+    submit() returns a future immediately. A worker thread waits until
+    max_batch frames are queued or the oldest has waited max_delay seconds,
+    then runs them through analyzer.analyze_batch() in one forward pass and
+    resolves each caller's future with its own (annotated_frame, detections).
+    """
+    def __init__(self, analyzer, max_batch: int = 8, max_delay: float = 0.02):
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+        self.analyzer = analyzer
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.stats = {'batches': 0, 'frames': 0}
+        self._pending: List[Tuple[Any, float, Future]] = []
+        self._cond = Condition()
+        self._running = False
+        self._thread: Optional[Thread] = None
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = Thread(target=self._run, name='vision-batcher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        # Anything still queued will never run
+        with self._cond:
+            pending, self._pending = self._pending, []
+        for _, _, future in pending:
+            future.cancel()
+
+    def submit(self, frame) -> Future:
+        """Queue a frame; the future resolves to (annotated_frame, detections)"""
+        future = Future()
+        with self._cond:
+            if not self._running:
+                raise RuntimeError("MicroBatcher is not running")
+            self._pending.append((frame, time.monotonic(), future))
+            self._cond.notify_all()
+        return future
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.stats['frames'] / self.stats['batches'] if self.stats['batches'] else 0.0
+
+    def _next_batch(self) -> list:
+        with self._cond:
+            while self._running:
+                if len(self._pending) >= self.max_batch:
+                    break
+                if self._pending:
+                    remaining = self._pending[0][1] + self.max_delay - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                else:
+                    self._cond.wait()
+            batch = self._pending[:self.max_batch]
+            del self._pending[:self.max_batch]
+            return batch
+
+    def _run(self):
+        while self._running:
+            batch = self._next_batch()
+            # Callers may have cancelled while waiting
+            batch = [item for item in batch if item[2].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                results = self.analyzer.analyze_batch([frame for frame, _, _ in batch])
+            except Exception as e:
+                logger.error(f"Batch analysis error: {e}")
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.stats['batches'] += 1
+            self.stats['frames'] += len(batch)
+            for (_, _, future), result in zip(batch, results):
+                future.set_result(result)
@@ -0,0 +1,96 @@
+"""Per-frame overhead of turning YOLOv5 output into detections.
+
+Compares the old pandas path (results.pandas().xyxy, iterrows, then
+to_dict('records')) with the structured-array path on synthetic
+predictions, so no model or GPU is needed:
+
+    python -m ai_vision.detection_benchmark --boxes 5 50 300 --output bench.json
+"""
+import numpy as np
+import argparse
+import json
+import logging
+import sys
+from typing import Any, Callable, Dict, List, Optional
+
+from modules.capture_benchmark import measure
+from .detections import from_prediction
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BOX_COUNTS = [5, 50, 300]
+NAMES = {i: f"class{i}" for i in range(80)}
+
+def synthetic_prediction(boxes: int, seed: int = 0) -> np.ndarray:
+    """(boxes, 6) array shaped like one image of results.xyxy"""
+    rng = np.random.default_rng(seed)
+    xy = rng.uniform(0, 600, (boxes, 2))
+    wh = rng.uniform(10, 200, (boxes, 2))
+    return np.column_stack([xy, xy + wh, rng.uniform(0.25, 1.0, boxes),
+                            rng.integers(0, len(NAMES), boxes)]).astype(np.float32)
+
+def pandas_case(prediction: np.ndarray, min_confidence: float) -> Callable:
+    import pandas as pd
+    columns = ['xmin', 'ymin', 'xmax', 'ymax', 'confidence', 'class', 'name']
+
+    def run():
+        # What YOLOv5's Detections.pandas() builds per image
+        frame = pd.DataFrame([x[:5] + [int(x[5]), NAMES[int(x[5])]] for x in prediction.tolist()],
+                             columns=columns)
+        boxes = []
+        for _, det in frame.iterrows():
+            if det['confidence'] >= min_confidence:
+                boxes.append((int(det['xmin']), int(det['ymin']), int(det['xmax']), int(det['ymax'])))
+        return boxes, frame.to_dict('records')
+    return run
+
+def structured_case(prediction: np.ndarray, min_confidence: float) -> Callable:
+    def run():
+        detections = from_prediction(prediction, min_confidence)
+        boxes = np.stack([detections['xmin'], detections['ymin'],
+                          detections['xmax'], detections['ymax']], axis=1).astype(int).tolist()
+        return boxes, detections
+    return run
+
+def run_benchmarks(box_counts: List[int] = None, frames: int = 200, warmup: int = 5,
+                   min_confidence: float = 0.5) -> Dict[str, Any]:
+    """Time both conversion paths for each box count"""
+    results: Dict[str, Dict[str, Any]] = {}
+    for boxes in box_counts or DEFAULT_BOX_COUNTS:
+        prediction = synthetic_prediction(boxes)
+        cases = {'structured': structured_case(prediction, min_confidence)}
+        try:
+            cases['pandas'] = pandas_case(prediction, min_confidence)
+        except ImportError:
+            logger.warning("pandas not installed, timing the structured path only")
+        key = f"{boxes}_boxes"
+        results[key] = {name: measure(func, frames, warmup) for name, func in cases.items()}
+        if 'pandas' in results[key]:
+            saved = (results[key]['pandas']['latency_p50_ms']
+                     - results[key]['structured']['latency_p50_ms'])
+            results[key]['saved_p50_ms'] = saved
+            logger.info(f"{key}: {saved:.3f} ms saved per frame")
+    return {'min_confidence': min_confidence, 'results': results}
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Detection conversion overhead benchmark')
+    parser.add_argument('--boxes', type=int, nargs='+', default=DEFAULT_BOX_COUNTS,
+                        help='Boxes per frame before filtering')
+    parser.add_argument('--frames', type=int, default=200, help='Timed frames per case')
+    parser.add_argument('--warmup', type=int, default=5, help='Untimed frames per case')
+    parser.add_argument('--min-confidence', type=float, default=0.5)
+    parser.add_argument('--output', help='Write results JSON to this file')
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.boxes, args.frames, args.warmup, args.min_confidence)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
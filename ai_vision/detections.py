@@ -0,0 +1,76 @@
+import cv2
+import numpy as np
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+# One row per box, as YOLOv5 emits them: x1, y1, x2, y2, confidence, class
+DETECTION_DTYPE = np.dtype([
+    ('xmin', np.float32),
+    ('ymin', np.float32),
+    ('xmax', np.float32),
+    ('ymax', np.float32),
+    ('confidence', np.float32),
+    ('class', np.int32)
+])
+
+def empty_detections() -> np.ndarray:
+    return np.empty(0, dtype=DETECTION_DTYPE)
+
+def from_prediction(prediction, min_confidence: float = 0.0,
+                    classes: Optional[Iterable[int]] = None) -> np.ndarray:
+    """Detections from an (n, 6) prediction tensor or array.
+
+    Confidence and class filters are applied as one vectorized mask, so no
+    per-box Python objects are created.
+    """
+    if hasattr(prediction, 'detach'):
+        prediction = prediction.detach().cpu().numpy()
+    prediction = np.asarray(prediction, dtype=np.float32).reshape(-1, 6)
+
+    mask = prediction[:, 4] >= min_confidence
+    if classes is not None:
+        mask &= np.isin(prediction[:, 5].astype(np.int32), np.fromiter(classes, dtype=np.int32))
+    prediction = prediction[mask]
+
+    detections = np.empty(len(prediction), dtype=DETECTION_DTYPE)
+    for i, field in enumerate(DETECTION_DTYPE.names[:5]):
+        detections[field] = prediction[:, i]
+    detections['class'] = prediction[:, 5]
+    return detections
+
+def box_iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU of (n, 4+) and (m, 4+) arrays whose first columns are x1, y1, x2, y2"""
+    top_left = np.maximum(a[:, None, :2], b[None, :, :2])
+    bottom_right = np.minimum(a[:, None, 2:4], b[None, :, 2:4])
+    overlap = np.clip(bottom_right - top_left, 0, None).prod(axis=2)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return overlap / (area_a[:, None] + area_b[None, :] - overlap + 1e-9)
+
+def annotate(frame: np.ndarray, detections: np.ndarray, names: Sequence[str]) -> np.ndarray:
+    """Copy of frame with a labelled box drawn for each detection (or track)"""
+    annotated = frame.copy()
+    boxes = np.stack([detections['xmin'], detections['ymin'],
+                      detections['xmax'], detections['ymax']], axis=1).astype(int).tolist()
+    for (x1, y1, x2, y2), det in zip(boxes, detections):
+        cv2.rectangle(annotated, (x1, y1), (x2, y2), (0, 255, 0), 2)
+        cv2.putText(annotated, f"{names[int(det['class'])]} {det['confidence']:.2f}",
+                    (x1, y1-10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+    return annotated
+
+def to_records(detections: np.ndarray, names: Sequence[str]) -> List[Dict[str, Any]]:
+    """Dict view matching the old results.pandas().xyxy[0].to_dict('records')"""
+    return [{
+        'xmin': float(det['xmin']),
+        'ymin': float(det['ymin']),
+        'xmax': float(det['xmax']),
+        'ymax': float(det['ymax']),
+        'confidence': float(det['confidence']),
+        'class': int(det['class']),
+        'name': names[int(det['class'])]
+    } for det in detections]
+
+def to_dataframe(detections: np.ndarray, names: Sequence[str]):
+    """pandas view for callers that still want one; pandas is imported on demand"""
+    import pandas as pd
+    columns = ['xmin', 'ymin', 'xmax', 'ymax', 'confidence', 'class', 'name']
+    return pd.DataFrame(to_records(detections, names), columns=columns)
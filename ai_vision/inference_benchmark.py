@@ -0,0 +1,159 @@
+"""CPU latency of the vision model backends.
+
+Runs the same frames through each backend, times them and reports how
+well every backend's detections agree with the first one:
+
+    python -m ai_vision.inference_benchmark --backends torch onnx --video recording.mp4
+
+Without --video or --images the frames are random noise, which is enough
+for latency but gives few detections to compare.
+"""
+import cv2
+import numpy as np
+import argparse
+import itertools
+import json
+import logging
+import os
+import platform
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from modules.capture_benchmark import measure
+from .detections import box_iou
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKENDS = ['torch', 'onnx']
+
+def load_backend(backend: str, model_name: str = 'yolov5s', model_path: Optional[str] = None,
+                 img_size: int = 640, threads: int = 0) -> Callable[[Sequence[np.ndarray]], List[np.ndarray]]:
+    """Predict function returning (n, 6) x1, y1, x2, y2, confidence, class rows per frame"""
+    if backend == 'onnx':
+        from .onnx_backend import load_detector
+        return load_detector(model_name, model_path, img_size=img_size, threads=threads).predict
+    if backend == 'onnx-int8':
+        from .quantization import load_quantized_detector
+        return load_quantized_detector(model_name, model_path, img_size=img_size, threads=threads).predict
+    if backend == 'torch':
+        import torch
+        if threads:
+            torch.set_num_threads(threads)
+        model = torch.hub.load('ultralytics/yolov5', model_name, pretrained=True).cpu()
+        return lambda frames: [p.cpu().numpy() for p in model(list(frames), size=img_size).xyxy]
+    raise ValueError(f"Unknown vision backend: {backend}")
+
+def agreement(reference: Sequence[np.ndarray], candidate: Sequence[np.ndarray],
+              iou_threshold: float = 0.5) -> Dict[str, float]:
+    """Recall and precision of candidate detections against reference ones.
+
+    A box matches when a box of the same class overlaps it by iou_threshold.
+    """
+    matched_reference = matched_candidate = total_reference = total_candidate = 0
+    for ref, cand in zip(reference, candidate):
+        total_reference += len(ref)
+        total_candidate += len(cand)
+        if not len(ref) or not len(cand):
+            continue
+        same = (box_iou(ref, cand) >= iou_threshold) & (ref[:, None, 5] == cand[None, :, 5])
+        matched_reference += int(same.any(axis=1).sum())
+        matched_candidate += int(same.any(axis=0).sum())
+    return {
+        'recall': matched_reference / total_reference if total_reference else 1.0,
+        'precision': matched_candidate / total_candidate if total_candidate else 1.0,
+        'reference_boxes': total_reference,
+        'boxes': total_candidate
+    }
+
+def load_frames(video: Optional[str] = None, images: Optional[str] = None, count: int = 16,
+                size=(1920, 1080)) -> List[np.ndarray]:
+    """BGR frames from a video, an image directory or random noise"""
+    if images:
+        paths = sorted(p for p in Path(images).iterdir()
+                       if p.suffix.lower() in ('.png', '.jpg', '.jpeg', '.bmp'))[:count]
+        return [cv2.imread(str(p)) for p in paths]
+    if video:
+        capture = cv2.VideoCapture(video)
+        total = int(capture.get(cv2.CAP_PROP_FRAME_COUNT)) or count
+        frames = []
+        # Spread the samples over the whole recording
+        for index in np.linspace(0, total - 1, count).astype(int):
+            capture.set(cv2.CAP_PROP_POS_FRAMES, int(index))
+            ok, frame = capture.read()
+            if ok:
+                frames.append(frame)
+        capture.release()
+        return frames
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 255, (size[1], size[0], 3), dtype=np.uint8) for _ in range(count)]
+
+def run_benchmarks(frames: List[np.ndarray], backends: List[str] = None, model_name: str = 'yolov5s',
+                   model_path: Optional[str] = None, img_size: int = 640, threads: int = 0,
+                   iterations: int = 20, warmup: int = 3) -> Dict[str, Any]:
+    """Time single-frame inference per backend and compare detections with the first backend"""
+    results: Dict[str, Dict[str, Any]] = {}
+    reference = None
+    for backend in backends or DEFAULT_BACKENDS:
+        try:
+            predict = load_backend(backend, model_name, model_path, img_size, threads)
+        except Exception as e:
+            logger.warning(f"Skipping {backend}: {e}")
+            continue
+        frame_cycle = itertools.cycle(frames)
+        stats = measure(lambda: predict([next(frame_cycle)]), iterations, warmup)
+        predictions = [predict([frame])[0] for frame in frames]
+        if reference is None:
+            reference = predictions
+        stats['agreement'] = agreement(reference, predictions)
+        results[backend] = stats
+        logger.info(f"{backend}: p50 {stats['latency_p50_ms']:.1f} ms, "
+                    f"{stats['achieved_fps']:.1f} fps, recall {stats['agreement']['recall']:.3f}")
+    return {
+        'model': model_name,
+        'img_size': img_size,
+        'threads': threads or os.cpu_count(),
+        'frame_size': list(frames[0].shape[1::-1]) if frames else None,
+        'platform': {
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+            'cpu_count': os.cpu_count()
+        },
+        'results': results
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Vision model CPU latency benchmark')
+    parser.add_argument('--backends', nargs='+', default=DEFAULT_BACKENDS,
+                        help='Backends to compare (torch, onnx, onnx-int8); '
+                             'the first is the accuracy reference')
+    parser.add_argument('--model', default='yolov5s', help='YOLOv5 model name')
+    parser.add_argument('--onnx-model', help='ONNX file, exported from --model if missing')
+    parser.add_argument('--img-size', type=int, default=640)
+    parser.add_argument('--threads', type=int, default=0, help='CPU threads, 0 for all cores')
+    parser.add_argument('--video', help='Recording to sample frames from')
+    parser.add_argument('--images', help='Directory of frames')
+    parser.add_argument('--frames', type=int, default=16, help='Frames to sample')
+    parser.add_argument('--iterations', type=int, default=20, help='Timed inferences per backend')
+    parser.add_argument('--warmup', type=int, default=3, help='Untimed inferences per backend')
+    parser.add_argument('--output', help='Write results JSON to this file')
+    args = parser.parse_args(argv)
+
+    frames = load_frames(args.video, args.images, args.frames)
+    if not frames:
+        logger.error("No frames to benchmark")
+        return 1
+    report = run_benchmarks(frames, args.backends, args.model, args.onnx_model, args.img_size,
+                            args.threads, args.iterations, args.warmup)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0 if report['results'] else 1
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
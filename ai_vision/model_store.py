@@ -0,0 +1,122 @@
+import hashlib
+import json
+import logging
+import shutil
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from threading import Lock, Thread
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.config import Config
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = 'manifest.json'
+HUB_REPO = 'ultralytics/yolov5'
+
+def file_hash(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ModelStore:
+    """Versioned on-disk model cache.
+
+    Files live in <root>/<name>/<version>/ next to a manifest recording
+    each file's sha256 and when the version was added. resolve() returns
+    the newest (or a pinned) version whose file is present and intact, so
+    models load without network access once they have been cached.
+    """
+    def __init__(self, root: Optional[str] = None):
+        self.root = Path(root or Config().vision['model_dir'])
+        self._lock = Lock()
+
+    def _manifest(self, name: str, version: str) -> Dict[str, Any]:
+        try:
+            with open(self.root / name / version / MANIFEST) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {'added': 0.0, 'files': {}}
+
+    def versions(self, name: str) -> List[str]:
+        """Cached versions of name, newest first"""
+        base = self.root / name
+        if not base.is_dir():
+            return []
+        versions = [p.name for p in base.iterdir() if (p / MANIFEST).exists()]
+        return sorted(versions, key=lambda v: self._manifest(name, v)['added'], reverse=True)
+
+    def latest(self, name: str) -> Optional[str]:
+        versions = self.versions(name)
+        return versions[0] if versions else None
+
+    def resolve(self, name: str, filename: str, version: Optional[str] = None) -> Optional[Path]:
+        """Path of filename in the pinned or newest intact version, or None"""
+        for candidate in [version] if version else self.versions(name):
+            path = self.root / name / candidate / filename
+            if not path.exists():
+                continue
+            expected = self._manifest(name, candidate)['files'].get(filename)
+            if expected and expected != file_hash(path):
+                logger.warning(f"Ignoring corrupt cached model {path}")
+                continue
+            return path
+        return None
+
+    def add(self, name: str, source, version: Optional[str] = None,
+            filename: Optional[str] = None) -> Path:
+        """Copy source into the store; the version defaults to its content hash"""
+        digest = file_hash(source)
+        version = version or digest[:12]
+        filename = filename or Path(source).name
+        target = self.root / name / version / filename
+        with self._lock:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            if Path(source).resolve() != target.resolve():
+                shutil.copyfile(source, target)
+            manifest = self._manifest(name, version)
+            manifest['added'] = manifest['added'] or time.time()
+            manifest['files'][filename] = digest
+            with open(target.parent / MANIFEST, 'w') as f:
+                json.dump(manifest, f, indent=2)
+        logger.info(f"Cached {filename} as {name} version {version}")
+        return target
+
+def _cached_hub_repo() -> Optional[Path]:
+    import torch
+    repo = Path(torch.hub.get_dir()) / (HUB_REPO.replace('/', '_') + '_master')
+    return repo if repo.is_dir() else None
+
+def load_yolov5(model_name: str, store: Optional[ModelStore] = None,
+                version: Optional[str] = None):
+    """torch hub YOLOv5 model, from cached weights and hub code when both are on disk"""
+    import torch
+    store = store or ModelStore()
+    weights = store.resolve(model_name, f"{model_name}.pt", version)
+    repo = _cached_hub_repo()
+    if weights is not None and repo is not None:
+        return torch.hub.load(str(repo), 'custom', path=str(weights), source='local')
+    model = torch.hub.load(HUB_REPO, model_name, pretrained=True)
+    # The hub downloads pretrained weights into the working directory
+    downloaded = Path(f"{model_name}.pt")
+    if weights is None and downloaded.exists():
+        store.add(model_name, downloaded)
+    return model
+
+def load_in_background(loader: Callable[[], Any], name: str = 'model-loader') -> Future:
+    """Run loader on a daemon thread; the future resolves to its result or exception"""
+    future = Future()
+    future.set_running_or_notify_cancel()
+
+    def run():
+        try:
+            future.set_result(loader())
+        except Exception as e:
+            logger.error(f"Model load error: {e}")
+            future.set_exception(e)
+
+    Thread(target=run, name=name, daemon=True).start()
+    return future
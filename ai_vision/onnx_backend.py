@@ -0,0 +1,229 @@
+import cv2
+import numpy as np
+import ast
+import logging
+import os
+import tempfile
+from pathlib import Path
+from threading import Lock
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+STRIDE = 32
+PAD_COLOR = (114, 114, 114)
+# Per-class box offset so one NMS pass never suppresses across classes
+MAX_WH = 7680
+MAX_NMS = 30000
+
+_sessions: Dict[Tuple[str, int], 'onnxruntime.InferenceSession'] = {}
+_sessions_lock = Lock()
+
+def session_options(threads: int = 0):
+    """CPU-tuned options: full graph fusion, one op at a time across all cores"""
+    import onnxruntime as ort
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    options.intra_op_num_threads = threads or os.cpu_count() or 1
+    options.inter_op_num_threads = 1
+    return options
+
+def get_session(model_path: str, threads: int = 0):
+    """InferenceSession for model_path, built once per process and thread count"""
+    import onnxruntime as ort
+    key = (str(Path(model_path).resolve()), threads)
+    with _sessions_lock:
+        if key not in _sessions:
+            _sessions[key] = ort.InferenceSession(key[0], session_options(threads),
+                                                  providers=['CPUExecutionProvider'])
+        return _sessions[key]
+
+def letterbox(image: np.ndarray, shape: Tuple[int, int]) -> Tuple[np.ndarray, float, Tuple[float, float]]:
+    """Resize keeping aspect ratio and pad to shape (height, width), as YOLOv5 does.
+
+    Returns the padded image, the resize ratio and the (x, y) padding.
+    """
+    height, width = image.shape[:2]
+    ratio = min(shape[0] / height, shape[1] / width)
+    new_width, new_height = int(round(width * ratio)), int(round(height * ratio))
+    pad_x, pad_y = (shape[1] - new_width) / 2, (shape[0] - new_height) / 2
+    if (width, height) != (new_width, new_height):
+        image = cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
+    top, bottom = int(round(pad_y - 0.1)), int(round(pad_y + 0.1))
+    left, right = int(round(pad_x - 0.1)), int(round(pad_x + 0.1))
+    image = cv2.copyMakeBorder(image, top, bottom, left, right, cv2.BORDER_CONSTANT, value=PAD_COLOR)
+    return image, ratio, (pad_x, pad_y)
+
+def inference_shape(frames: Sequence[np.ndarray], img_size: int) -> Tuple[int, int]:
+    """Smallest stride-aligned shape holding every frame scaled to img_size, like YOLOv5 AutoShape"""
+    sizes = np.array([frame.shape[:2] for frame in frames], dtype=np.float64)
+    scaled = (sizes * (img_size / sizes.max(axis=1, keepdims=True))).max(axis=0)
+    height, width = (np.ceil(scaled / STRIDE) * STRIDE).astype(int)
+    return int(height), int(width)
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """Indices of the boxes kept by greedy non-maximum suppression, best first.
+
+    Each step compares the best remaining box against all others at once.
+    """
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1) * (y2 - y1)
+    order = scores.argsort()[::-1]
+    keep = []
+    while order.size:
+        best, rest = order[0], order[1:]
+        keep.append(best)
+        width = np.clip(np.minimum(x2[best], x2[rest]) - np.maximum(x1[best], x1[rest]), 0, None)
+        height = np.clip(np.minimum(y2[best], y2[rest]) - np.maximum(y1[best], y1[rest]), 0, None)
+        overlap = width * height
+        iou = overlap / (areas[best] + areas[rest] - overlap + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.array(keep, dtype=np.int64)
+
+def postprocess(output: np.ndarray, conf_threshold: float = 0.25, iou_threshold: float = 0.45,
+                max_det: int = 1000) -> np.ndarray:
+    """(n, 6) x1, y1, x2, y2, confidence, class rows from one image of raw YOLOv5 output.
+
+    output rows are cx, cy, w, h, objectness and per-class scores.
+    """
+    output = output[output[:, 4] > conf_threshold]
+    scores = output[:, 5:] * output[:, 4:5]
+    classes = scores.argmax(axis=1)
+    confidence = scores[np.arange(len(scores)), classes]
+    mask = confidence > conf_threshold
+    output, classes, confidence = output[mask], classes[mask], confidence[mask]
+    if len(output) > MAX_NMS:
+        top = confidence.argsort()[::-1][:MAX_NMS]
+        output, classes, confidence = output[top], classes[top], confidence[top]
+
+    boxes = np.empty((len(output), 4), dtype=np.float32)
+    boxes[:, :2] = output[:, :2] - output[:, 2:4] / 2
+    boxes[:, 2:] = output[:, :2] + output[:, 2:4] / 2
+    keep = nms(boxes + classes[:, None] * MAX_WH, confidence, iou_threshold)[:max_det]
+    return np.column_stack([boxes[keep], confidence[keep], classes[keep]]).astype(np.float32)
+
+def scale_boxes(prediction: np.ndarray, ratio: float, pad: Tuple[float, float],
+                shape: Tuple[int, int]) -> np.ndarray:
+    """Map boxes from the letterboxed input back onto the original (height, width) frame"""
+    prediction[:, [0, 2]] = ((prediction[:, [0, 2]] - pad[0]) / ratio).clip(0, shape[1])
+    prediction[:, [1, 3]] = ((prediction[:, [1, 3]] - pad[1]) / ratio).clip(0, shape[0])
+    return prediction
+
+class _IndexNames(dict):
+    """Class names for models exported without metadata: the class index itself"""
+    def __missing__(self, key):
+        return str(key)
+
+class ONNXDetector:
+    """YOLOv5 inference through ONNX Runtime on the CPU.
+
+    Preprocessing, NMS and box rescaling are done here in NumPy, so
+    predict() returns the same (n, 6) rows as the torch hub model's
+    results.xyxy. Frames are fed in their given channel order, as the hub
+    model does with NumPy input.
+    """
+    def __init__(self, model_path: str, img_size: int = 640, conf_threshold: float = 0.25,
+                 iou_threshold: float = 0.45, max_det: int = 1000, threads: int = 0):
+        self.model_path = model_path
+        self.img_size = img_size
+        self.conf_threshold = conf_threshold
+        self.iou_threshold = iou_threshold
+        self.max_det = max_det
+        self.session = get_session(model_path, threads)
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        # Exports with fixed spatial axes need exactly that shape
+        height, width = model_input.shape[2:]
+        self.fixed_shape = (height, width) if isinstance(height, int) and isinstance(width, int) else None
+        self.dynamic_batch = not isinstance(model_input.shape[0], int)
+        self.names = self._read_names()
+
+    def _read_names(self) -> Dict[int, str]:
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        try:
+            names = ast.literal_eval(metadata['names'])
+        except (KeyError, ValueError, SyntaxError):
+            return _IndexNames()
+        return dict(enumerate(names)) if isinstance(names, list) else names
+
+    def predict(self, frames: Sequence[np.ndarray]) -> List[np.ndarray]:
+        """(n, 6) prediction array per frame, in frame coordinates"""
+        if not frames:
+            return []
+        shape = self.fixed_shape or inference_shape(frames, self.img_size)
+        boxed = [letterbox(frame, shape) for frame in frames]
+        batch = np.stack([image for image, _, _ in boxed]).transpose(0, 3, 1, 2)
+        batch = np.ascontiguousarray(batch, dtype=np.float32) / 255.0
+        if self.dynamic_batch:
+            outputs = self.session.run(None, {self.input_name: batch})[0]
+        else:
+            outputs = np.concatenate([self.session.run(None, {self.input_name: image[None]})[0]
+                                      for image in batch])
+        return [scale_boxes(postprocess(output, self.conf_threshold, self.iou_threshold, self.max_det),
+                            ratio, pad, frame.shape[:2])
+                for output, frame, (_, ratio, pad) in zip(outputs, frames, boxed)]
+
+def export_yolov5(model_name: str, output_path: str, img_size: int = 640, opset: int = 12,
+                  weights: Optional[str] = None) -> str:
+    """Export a torch hub YOLOv5 model to ONNX with dynamic batch and image size.
+
+    weights exports a local checkpoint instead of the pretrained download,
+    through the cached hub code when it is on disk, so it works offline.
+    """
+    import onnx
+    import torch
+    if weights is not None:
+        from .model_store import HUB_REPO, _cached_hub_repo
+        repo = _cached_hub_repo()
+        model = torch.hub.load(str(repo) if repo else HUB_REPO, 'custom', path=str(weights),
+                               source='local' if repo else 'github', autoshape=False)
+    else:
+        model = torch.hub.load('ultralytics/yolov5', model_name, pretrained=True, autoshape=False)
+    model.eval()
+    for module in model.modules():
+        # The Detect head returns only the concatenated predictions when exporting
+        if hasattr(module, 'export'):
+            module.export = True
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    dummy = torch.zeros(1, 3, img_size, img_size)
+    torch.onnx.export(model, dummy, output_path, opset_version=opset, dynamo=False,
+                      input_names=['images'], output_names=['output0'],
+                      dynamic_axes={'images': {0: 'batch', 2: 'height', 3: 'width'},
+                                    'output0': {0: 'batch', 1: 'anchors'}})
+    exported = onnx.load(output_path)
+    for key, value in {'stride': STRIDE, 'names': model.names}.items():
+        meta = exported.metadata_props.add()
+        meta.key, meta.value = key, str(value)
+    onnx.save(exported, output_path)
+    logger.info(f"Exported {model_name} to {output_path}")
+    return output_path
+
+def resolve_model_path(model_name: str, export: bool = True, img_size: int = 640,
+                       store=None) -> str:
+    """Newest cached ONNX export of model_name, exporting it into the model store if missing"""
+    from .model_store import ModelStore
+    store = store or ModelStore()
+    path = store.resolve(model_name, f"{model_name}.onnx")
+    if path is None:
+        if not export:
+            raise FileNotFoundError(f"No cached ONNX model for {model_name} in {store.root}")
+        with tempfile.TemporaryDirectory() as tmp:
+            exported = export_yolov5(model_name, str(Path(tmp) / f"{model_name}.onnx"), img_size)
+            # Keep the export with the weights it came from
+            path = store.add(model_name, exported, version=store.latest(model_name))
+    return str(path)
+
+def load_detector(model_name: str, model_path: Optional[str] = None, export: bool = True,
+                  **options) -> ONNXDetector:
+    """ONNXDetector for model_path, or for the model store's copy of model_name.
+
+    A missing model is exported first unless export is False.
+    """
+    if model_path is None:
+        model_path = resolve_model_path(model_name, export, options.get('img_size', 640))
+    elif not Path(model_path).exists():
+        if not export:
+            raise FileNotFoundError(f"ONNX model not found: {model_path}")
+        export_yolov5(model_name, model_path, options.get('img_size', 640))
+    return ONNXDetector(model_path, **options)
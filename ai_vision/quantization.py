@@ -0,0 +1,158 @@
+"""INT8 YOLOv5 models for CPU-only hosts.
+
+Statically quantizes an exported FP32 ONNX model, calibrating activation
+ranges on recorded frames, then reports accuracy and latency against the
+FP32 model:
+
+    python -m ai_vision.quantization --model yolov5s --video recording.mp4 \\
+        --report performance/int8_report.json
+
+The INT8 file is written next to the FP32 one as <name>-int8.onnx (in the
+model store unless --onnx-model is given), where
+VisionProcessor.load_model(..., quantized=True) finds it.
+"""
+import numpy as np
+import argparse
+import json
+import logging
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from .onnx_backend import ONNXDetector, export_yolov5, inference_shape, letterbox, resolve_model_path
+
+logger = logging.getLogger(__name__)
+
+def int8_path(model_path: str) -> str:
+    path = Path(model_path)
+    return str(path.with_name(f"{path.stem}-int8{path.suffix}"))
+
+def _calibration_reader(input_name: str, frames: Sequence[np.ndarray], img_size: int):
+    from onnxruntime.quantization import CalibrationDataReader
+
+    class FrameReader(CalibrationDataReader):
+        """Feeds recorded frames through the same letterbox as inference"""
+        def __init__(self):
+            self._frames = iter(frames)
+
+        def get_next(self) -> Optional[Dict[str, np.ndarray]]:
+            frame = next(self._frames, None)
+            if frame is None:
+                return None
+            image, _, _ = letterbox(frame, inference_shape([frame], img_size))
+            batch = image.transpose(2, 0, 1)[None].astype(np.float32) / 255.0
+            return {input_name: np.ascontiguousarray(batch)}
+
+    return FrameReader()
+
+def quantize_model(model_path: str, frames: Sequence[np.ndarray], output_path: Optional[str] = None,
+                   img_size: int = 640, per_channel: bool = True,
+                   nodes_to_exclude: Optional[List[str]] = None) -> str:
+    """Write a statically quantized INT8 copy of model_path calibrated on frames.
+
+    Weights are signed INT8, activations unsigned INT8, in QDQ format so ONNX
+    Runtime can fuse them into integer kernels. Class names are carried over.
+    """
+    import onnx
+    from onnxruntime.quantization import CalibrationMethod, QuantFormat, QuantType, quantize_static
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+    if not frames:
+        raise ValueError("Calibration needs at least one frame")
+    output_path = output_path or int8_path(model_path)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        prepared = str(Path(tmp) / 'prepared.onnx')
+        try:
+            quant_pre_process(model_path, prepared)
+        except Exception as e:
+            # Symbolic shape inference can fail on exotic graphs; quantization still works without it
+            logger.warning(f"Quantization pre-processing skipped: {e}")
+            shutil.copyfile(model_path, prepared)
+        input_name = onnx.load(prepared).graph.input[0].name
+        quantize_static(prepared, output_path,
+                        _calibration_reader(input_name, frames, img_size),
+                        quant_format=QuantFormat.QDQ,
+                        activation_type=QuantType.QUInt8,
+                        weight_type=QuantType.QInt8,
+                        per_channel=per_channel,
+                        nodes_to_exclude=nodes_to_exclude,
+                        calibrate_method=CalibrationMethod.MinMax)
+
+    source, quantized = onnx.load(model_path), onnx.load(output_path)
+    for prop in source.metadata_props:
+        meta = quantized.metadata_props.add()
+        meta.key, meta.value = prop.key, prop.value
+    onnx.save(quantized, output_path)
+    logger.info(f"Quantized {model_path} to {output_path} with {len(frames)} calibration frames")
+    return output_path
+
+def load_quantized_detector(model_name: str, model_path: Optional[str] = None,
+                            **options) -> ONNXDetector:
+    """ONNXDetector for the INT8 copy of model_path.
+
+    The INT8 file has to be calibrated first, since that needs recorded frames.
+    """
+    path = int8_path(model_path or resolve_model_path(model_name, export=False))
+    if not Path(path).exists():
+        raise FileNotFoundError(f"INT8 model not found: {path}. Calibrate it with "
+                                f"python -m ai_vision.quantization --model {model_name} --video <recording>")
+    return ONNXDetector(path, **options)
+
+def accuracy_report(frames: Sequence[np.ndarray], model_path: str, quantized_path: str,
+                    img_size: int = 640, threads: int = 0, iterations: int = 20,
+                    warmup: int = 3) -> Dict[str, Any]:
+    """Latency of both models and recall/precision of INT8 detections against FP32"""
+    from .inference_benchmark import run_benchmarks
+    report = run_benchmarks(list(frames), ['onnx', 'onnx-int8'], model_path=model_path,
+                            img_size=img_size, threads=threads, iterations=iterations, warmup=warmup)
+    results = report['results']
+    if 'onnx' in results and 'onnx-int8' in results:
+        report['speedup'] = results['onnx']['latency_p50_ms'] / results['onnx-int8']['latency_p50_ms']
+    report['quantized_model'] = quantized_path
+    return report
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from .inference_benchmark import load_frames
+    parser = argparse.ArgumentParser(description='Calibrate and quantize a YOLOv5 ONNX model to INT8')
+    parser.add_argument('--model', default='yolov5s', help='YOLOv5 model name')
+    parser.add_argument('--onnx-model', help='FP32 ONNX file, exported from --model if missing')
+    parser.add_argument('--video', help='Recording to calibrate on')
+    parser.add_argument('--images', help='Directory of recorded frames to calibrate on')
+    parser.add_argument('--frames', type=int, default=100, help='Calibration frames to sample')
+    parser.add_argument('--eval-frames', type=int, default=32,
+                        help='Frames for the accuracy report')
+    parser.add_argument('--img-size', type=int, default=640)
+    parser.add_argument('--threads', type=int, default=0, help='CPU threads, 0 for all cores')
+    parser.add_argument('--per-tensor', action='store_true', help='Per-tensor instead of per-channel weights')
+    parser.add_argument('--exclude', nargs='*', default=None, help='Node names to keep in FP32')
+    parser.add_argument('--report', help='Write the accuracy vs latency report to this file')
+    args = parser.parse_args(argv)
+
+    if not (args.video or args.images):
+        parser.error("Calibration needs recorded frames: pass --video or --images")
+    frames = load_frames(args.video, args.images, args.frames)
+    if not frames:
+        logger.error("No calibration frames")
+        return 1
+
+    model_path = args.onnx_model or resolve_model_path(args.model, img_size=args.img_size)
+    if not Path(model_path).exists():
+        export_yolov5(args.model, model_path, args.img_size)
+    quantized_path = quantize_model(model_path, frames, img_size=args.img_size,
+                                    per_channel=not args.per_tensor, nodes_to_exclude=args.exclude)
+
+    eval_frames = load_frames(args.video, args.images, args.eval_frames)
+    report = accuracy_report(eval_frames, model_path, quantized_path, args.img_size, args.threads)
+    output = json.dumps(report, indent=2)
+    if args.report:
+        with open(args.report, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
@@ -0,0 +1,168 @@
+import logging
+import time
+from collections import deque, namedtuple
+from concurrent.futures import Future, ProcessPoolExecutor
+from threading import Condition, Thread
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# timestamp: monotonic capture time of the source frame; latency: seconds from
+# capture to the result being ready
+VisionResult = namedtuple("VisionResult", "source timestamp annotated detections latency")
+
+_process_analyzer = None
+
+def _init_process(factory: Callable[[], Any]):
+    global _process_analyzer
+    _process_analyzer = factory()
+
+def _analyze_in_process(frame):
+    return _process_analyzer.analyze_frame(frame)
+
+class InferenceService:
+    """Asynchronous analyzer front end with latest-frame-wins semantics.
+
+    submit() never blocks: it parks the frame as its source's pending frame,
+    replacing (and cancelling) any older one still waiting. Worker threads
+    take the oldest pending source, so every source gets a turn, and never
+    work on two frames of one source at once, so results arrive in order.
+    With mode='process' the workers hand frames to a process pool whose
+    processes each build their own analyzer from analyzer_factory.
+    Results are VisionResult tuples delivered through the returned future
+    and the optional callback.
+    """
+    def __init__(self, analyzer=None, workers: int = 1, mode: str = 'thread',
+                 analyzer_factory: Optional[Callable[[], Any]] = None, history: int = 500):
+        if mode not in ('thread', 'process'):
+            raise ValueError(f"Unknown inference service mode: {mode}")
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        if mode == 'process' and analyzer_factory is None:
+            raise ValueError("Process workers need an analyzer_factory")
+        if mode == 'thread' and analyzer is None:
+            analyzer = analyzer_factory() if analyzer_factory else None
+        if mode == 'thread' and analyzer is None:
+            raise ValueError("Thread workers need an analyzer or analyzer_factory")
+        self.analyzer = analyzer
+        self.analyzer_factory = analyzer_factory
+        self.workers = workers
+        self.mode = mode
+        self.stats = {'submitted': 0, 'completed': 0, 'dropped': 0, 'failed': 0}
+        self.latencies = deque(maxlen=history)
+        # source -> (frame, timestamp, future, callback)
+        self._pending: Dict[Any, tuple] = {}
+        self._busy = set()
+        self._cond = Condition()
+        self._running = False
+        self._threads: List[Thread] = []
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def start(self):
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        if self.mode == 'process':
+            self._pool = ProcessPoolExecutor(self.workers, initializer=_init_process,
+                                             initargs=(self.analyzer_factory,))
+        self._threads = [Thread(target=self._run, name=f'vision-worker-{i}', daemon=True)
+                         for i in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            pending, self._pending = list(self._pending.values()), {}
+            self._cond.notify_all()
+        for _, _, future, _ in pending:
+            future.cancel()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        if self._pool:
+            self._pool.shutdown()
+            self._pool = None
+
+    def submit(self, source, frame: np.ndarray, timestamp: Optional[float] = None,
+               callback: Optional[Callable[[VisionResult], None]] = None) -> Future:
+        """Queue frame as source's newest; the future resolves to a VisionResult.
+
+        timestamp is when the frame was captured (time.monotonic()), defaulting
+        to now. A frame still waiting from the same source is dropped and its
+        future cancelled.
+        """
+        future = Future()
+        timestamp = time.monotonic() if timestamp is None else timestamp
+        with self._cond:
+            if not self._running:
+                raise RuntimeError("InferenceService is not running")
+            replaced = self._pending.pop(source, None)
+            self._pending[source] = (frame, timestamp, future, callback)
+            self.stats['submitted'] += 1
+            if replaced:
+                self.stats['dropped'] += 1
+            self._cond.notify()
+        if replaced:
+            replaced[2].cancel()
+        return future
+
+    def _next(self):
+        with self._cond:
+            while self._running:
+                # Dicts keep insertion order, so the first free source waited longest
+                source = next((s for s in self._pending if s not in self._busy), None)
+                if source is not None:
+                    self._busy.add(source)
+                    return source, self._pending.pop(source)
+                self._cond.wait()
+            return None, None
+
+    def _analyze(self, frame):
+        if self._pool:
+            return self._pool.submit(_analyze_in_process, frame).result()
+        return self.analyzer.analyze_frame(frame)
+
+    def _run(self):
+        while True:
+            source, item = self._next()
+            if item is None:
+                return
+            frame, timestamp, future, callback = item
+            try:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    annotated, detections = self._analyze(frame)
+                except Exception as e:
+                    logger.error(f"Inference error for {source}: {e}")
+                    self.stats['failed'] += 1
+                    future.set_exception(e)
+                    continue
+                result = VisionResult(source, timestamp, annotated, detections,
+                                      time.monotonic() - timestamp)
+                self.stats['completed'] += 1
+                self.latencies.append(result.latency)
+                future.set_result(result)
+                if callback:
+                    try:
+                        callback(result)
+                    except Exception as e:
+                        logger.error(f"Inference callback error for {source}: {e}")
+            finally:
+                with self._cond:
+                    self._busy.discard(source)
+                    self._cond.notify()
+
+    @property
+    def latency_stats(self) -> Dict[str, float]:
+        """End-to-end capture-to-result latency in milliseconds"""
+        if not self.latencies:
+            return {'samples': 0, 'p50_ms': 0.0, 'p95_ms': 0.0, 'max_ms': 0.0}
+        latencies = np.fromiter(self.latencies, dtype=np.float64) * 1000
+        p50, p95 = np.percentile(latencies, [50, 95])
+        return {'samples': len(latencies), 'p50_ms': float(p50), 'p95_ms': float(p95),
+                'max_ms': float(latencies.max())}
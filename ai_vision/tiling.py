@@ -0,0 +1,167 @@
+import numpy as np
+import logging
+from typing import Callable, List, Optional, Sequence
+
+from .onnx_backend import MAX_WH, nms
+
+logger = logging.getLogger(__name__)
+
+# Runs the model on a batch of images; one (n, 6) prediction per image
+PredictBatch = Callable[[List[np.ndarray]], Sequence[np.ndarray]]
+
+def tile_grid(height: int, width: int, tile_size: int, overlap: float) -> np.ndarray:
+    """(n, 4) x1, y1, x2, y2 tiles covering the frame, row by row.
+
+    Neighbouring tiles share about overlap * tile_size pixels and the last
+    row and column sit flush with the frame edge. Sides shorter than
+    tile_size get a single tile spanning them.
+    """
+    stride = max(int(tile_size * (1.0 - overlap)), 1)
+
+    def starts(length: int) -> np.ndarray:
+        if length <= tile_size:
+            return np.zeros(1, dtype=np.int64)
+        return np.unique(np.append(np.arange(0, length - tile_size, stride), length - tile_size))
+
+    ys, xs = np.meshgrid(starts(height), starts(width), indexing='ij')
+    x1, y1 = xs.ravel(), ys.ravel()
+    return np.stack([x1, y1, np.minimum(x1 + tile_size, width), np.minimum(y1 + tile_size, height)], axis=1)
+
+def dirty_mask(tiles: np.ndarray, dirty_rects: Sequence[Sequence[int]]) -> np.ndarray:
+    """Which tiles intersect any of the (x, y, width, height) dirty rectangles"""
+    if not len(dirty_rects):
+        return np.zeros(len(tiles), dtype=bool)
+    rects = np.asarray(dirty_rects, dtype=np.int64)
+    rx1, ry1 = rects[:, 0], rects[:, 1]
+    rx2, ry2 = rx1 + rects[:, 2], ry1 + rects[:, 3]
+    hits = ((tiles[:, None, 0] < rx2) & (tiles[:, None, 2] > rx1)
+            & (tiles[:, None, 1] < ry2) & (tiles[:, None, 3] > ry1))
+    return hits.any(axis=1)
+
+def clipped_boxes(prediction: np.ndarray, tile: np.ndarray, height: int, width: int) -> np.ndarray:
+    """Boxes touching a tile side that lies inside the frame, i.e. likely cut off by the tile"""
+    x1, y1, x2, y2 = tile
+    return (((prediction[:, 0] <= x1 + 1) & (x1 > 0)) | ((prediction[:, 2] >= x2 - 1) & (x2 < width))
+            | ((prediction[:, 1] <= y1 + 1) & (y1 > 0)) | ((prediction[:, 3] >= y2 - 1) & (y2 < height)))
+
+def merge_predictions(predictions: Sequence[np.ndarray], threshold: float = 0.5,
+                      clipped: Optional[Sequence[np.ndarray]] = None) -> np.ndarray:
+    """Cross-tile NMS over (n, 6) predictions already in frame coordinates.
+
+    Boxes are merged with standard IoU NMS; boxes of different classes never
+    suppress each other. Boxes flagged in clipped (see clipped_boxes) rank
+    below every unclipped box, and a clipped box that survives NMS is still
+    dropped when more than threshold of its own area lies inside a better
+    kept box, so a fragment cut off at a tile border folds into the complete
+    box from a neighbouring tile or the full frame.
+    """
+    prediction = np.concatenate([np.asarray(p, dtype=np.float32).reshape(-1, 6) for p in predictions]
+                                or [np.empty((0, 6), dtype=np.float32)])
+    if not len(prediction):
+        return prediction
+    boxes = prediction[:, :4] + prediction[:, 5:6] * MAX_WH
+    rank = prediction[:, 4].copy()
+    if clipped is not None:
+        clipped = np.concatenate(clipped)
+        rank -= clipped.astype(np.float32)
+    keep = nms(boxes, rank, threshold)
+    if clipped is None or not clipped[keep].any():
+        return prediction[keep]
+
+    # keep is best first, so each fragment is only checked against better boxes
+    kept = boxes[keep]
+    areas = (kept[:, 2] - kept[:, 0]) * (kept[:, 3] - kept[:, 1])
+    accepted = np.ones(len(keep), dtype=bool)
+    for i in np.flatnonzero(clipped[keep]):
+        better = kept[:i][accepted[:i]]
+        width = np.clip(np.minimum(kept[i, 2], better[:, 2]) - np.maximum(kept[i, 0], better[:, 0]), 0, None)
+        height = np.clip(np.minimum(kept[i, 3], better[:, 3]) - np.maximum(kept[i, 1], better[:, 1]), 0, None)
+        accepted[i] = not (width * height > threshold * areas[i]).any()
+    return prediction[keep[accepted]]
+
+class TiledInference:
+    """Detection on large frames through overlapping tiles.
+
+    A 4K frame letterboxed down to the model's input size loses small UI
+    elements. Instead the frame is cut into tile_size tiles overlapping by
+    overlap, which run through the model in one batch at close to native
+    resolution, and the per-tile boxes are merged with cross-tile NMS. With
+    full_frame the downscaled whole frame joins the batch so objects larger
+    than a tile are still found whole.
+
+    With dirty_only, predict() takes the change detector's FrameChanges and
+    reruns only the tiles touching a dirty rectangle; the others reuse their
+    boxes from the previous call.
+    """
+    def __init__(self, tile_size: int = 640, overlap: float = 0.2, merge_threshold: float = 0.5,
+                 full_frame: bool = True, dirty_only: bool = False):
+        if tile_size < 1:
+            raise ValueError("tile_size must be at least 1")
+        if not 0.0 <= overlap < 1.0:
+            raise ValueError("overlap must be in [0, 1)")
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.merge_threshold = merge_threshold
+        self.full_frame = full_frame
+        self.dirty_only = dirty_only
+        self.stats = {'frames': 0, 'tiles_run': 0, 'tiles_reused': 0}
+        self.reset()
+
+    def reset(self):
+        self._shape = None
+        self._tiles = np.empty((0, 4), dtype=np.int64)
+        self._cache: List[Optional[np.ndarray]] = []
+        self._clipped: List[Optional[np.ndarray]] = []
+        self._full_cache: Optional[np.ndarray] = None
+
+    def tiles(self, height: int, width: int) -> np.ndarray:
+        if self._shape != (height, width):
+            self._shape = (height, width)
+            self._tiles = tile_grid(height, width, self.tile_size, self.overlap)
+            self._cache = [None] * len(self._tiles)
+            self._clipped = [None] * len(self._tiles)
+            self._full_cache = None
+        return self._tiles
+
+    def predict(self, frame: np.ndarray, predict_batch: PredictBatch, changes=None) -> np.ndarray:
+        """Merged (n, 6) prediction for frame.
+
+        changes is a modules.change_detector.FrameChanges for this frame;
+        it only matters with dirty_only, and without it every tile runs.
+        """
+        tiles = self.tiles(*frame.shape[:2])
+        run = np.ones(len(tiles), dtype=bool)
+        if self.dirty_only and changes is not None:
+            run = dirty_mask(tiles, changes.dirty_rects)
+        # Tiles never analyzed have nothing to reuse
+        run |= np.array([cached is None for cached in self._cache], dtype=bool)
+        indices = np.flatnonzero(run)
+        rerun_full = self.full_frame and (len(indices) > 0 or self._full_cache is None)
+
+        images = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in tiles[indices]]
+        if rerun_full:
+            images.append(frame)
+        if images:
+            outputs = [np.asarray(output.detach().cpu().numpy() if hasattr(output, 'detach') else output,
+                                  dtype=np.float32).reshape(-1, 6)
+                       for output in predict_batch(images)]
+            if rerun_full:
+                self._full_cache = outputs.pop()
+            for index, output in zip(indices, outputs):
+                # Tile coordinates to frame coordinates
+                output = output.copy()
+                output[:, [0, 2]] += tiles[index, 0]
+                output[:, [1, 3]] += tiles[index, 1]
+                self._cache[index] = output
+                self._clipped[index] = clipped_boxes(output, tiles[index], *frame.shape[:2])
+
+        self.stats['frames'] += 1
+        self.stats['tiles_run'] += len(indices)
+        self.stats['tiles_reused'] += len(tiles) - len(indices)
+        logger.debug(f"Tiled inference: {len(indices)}/{len(tiles)} tiles run")
+
+        predictions, clipped = list(self._cache), list(self._clipped)
+        if self.full_frame:
+            predictions.append(self._full_cache)
+            clipped.append(np.zeros(len(self._full_cache), dtype=bool))
+        return merge_predictions(predictions, self.merge_threshold, clipped)
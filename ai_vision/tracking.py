@@ -0,0 +1,207 @@
+import numpy as np
+import logging
+import time
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+
+from .detections import DETECTION_DTYPE, annotate, box_iou
+
+logger = logging.getLogger(__name__)
+
+# Detections plus the identity of the track they belong to
+TRACK_DTYPE = np.dtype(DETECTION_DTYPE.descr + [('track_id', np.int32)])
+
+def _boxes(detections: np.ndarray) -> np.ndarray:
+    return np.stack([detections['xmin'], detections['ymin'],
+                     detections['xmax'], detections['ymax']], axis=1).astype(np.float32)
+
+class ObjectTracker:
+    """Carries detections forward between keyframes with stable track IDs.
+
+    On a keyframe, update() matches detections to the predicted track boxes
+    by IoU within each class. Matched tracks take the detected box and a
+    velocity in pixels per second from how far the box moved since its last
+    detection. Unmatched detections start new tracks, and tracks missed on
+    more than max_missed keyframes are dropped. Between keyframes predict()
+    moves every box by its velocity times the time since it was detected,
+    so frames arriving at irregular intervals still land in the right
+    place. How far the prediction was off when the next detection arrives
+    (1 - IoU) is recorded as drift. All times are time.monotonic() seconds.
+    """
+    def __init__(self, keyframe_interval: int = 5, iou_threshold: float = 0.3,
+                 max_missed: int = 1, smoothing: float = 0.5, history: int = 500):
+        if keyframe_interval < 1:
+            raise ValueError("keyframe_interval must be at least 1")
+        self.keyframe_interval = keyframe_interval
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.smoothing = smoothing
+        self.drift = deque(maxlen=history)
+        self._next_id = 1
+        self.reset()
+
+    def reset(self):
+        self._ids = np.empty(0, dtype=np.int32)
+        self._classes = np.empty(0, dtype=np.int32)
+        self._confidence = np.empty(0, dtype=np.float32)
+        self._detected = np.empty((0, 4), dtype=np.float32)  # box at the last detection
+        self._velocity = np.empty((0, 4), dtype=np.float32)  # pixels per second
+        self._detected_at = np.empty(0, dtype=np.float64)
+        self._missed = np.empty(0, dtype=np.int32)
+        # The next frame is a keyframe
+        self._frames_since_keyframe = self.keyframe_interval
+
+    @property
+    def keyframe_due(self) -> bool:
+        return self._frames_since_keyframe + 1 >= self.keyframe_interval
+
+    def _predicted(self, now: float) -> np.ndarray:
+        elapsed = (now - self._detected_at).astype(np.float32)
+        return self._detected + self._velocity * elapsed[:, None]
+
+    def _tracks(self, now: float) -> np.ndarray:
+        tracks = np.empty(len(self._ids), dtype=TRACK_DTYPE)
+        boxes = self._predicted(now)
+        for i, field in enumerate(('xmin', 'ymin', 'xmax', 'ymax')):
+            tracks[field] = boxes[:, i]
+        tracks['confidence'] = self._confidence
+        tracks['class'] = self._classes
+        tracks['track_id'] = self._ids
+        return tracks
+
+    def _associate(self, predicted: np.ndarray, boxes: np.ndarray,
+                   classes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Greedy best-IoU matching as (track indices, detection indices)"""
+        if not len(predicted) or not len(boxes):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        iou = box_iou(predicted, boxes)
+        iou[self._classes[:, None] != classes[None, :]] = 0.0
+        iou[iou < self.iou_threshold] = 0.0
+        rows, cols = [], []
+        while iou.max() > 0:
+            row, col = np.unravel_index(iou.argmax(), iou.shape)
+            rows.append(row)
+            cols.append(col)
+            iou[row, :] = 0.0
+            iou[:, col] = 0.0
+        return np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64)
+
+    def update(self, detections: np.ndarray, now: Optional[float] = None) -> np.ndarray:
+        """Fold a keyframe's detections into the tracks; returns the tracks"""
+        now = time.monotonic() if now is None else now
+        boxes = _boxes(detections)
+        classes = detections['class'].astype(np.int32)
+        predicted = self._predicted(now)
+        rows, cols = self._associate(predicted, boxes, classes)
+
+        if len(rows):
+            self.drift.extend((1.0 - box_iou(predicted[rows], boxes[cols]).diagonal()).tolist())
+            # Velocity over the time since each track was last detected
+            elapsed = np.maximum(now - self._detected_at[rows], 1e-3).astype(np.float32)
+            measured = (boxes[cols] - self._detected[rows]) / elapsed[:, None]
+            self._velocity[rows] = self.smoothing * self._velocity[rows] + (1 - self.smoothing) * measured
+            self._detected[rows] = boxes[cols]
+            self._confidence[rows] = detections['confidence'][cols]
+            self._detected_at[rows] = now
+            self._missed[rows] = 0
+
+        unmatched = np.ones(len(self._ids), dtype=bool)
+        unmatched[rows] = False
+        self._missed[unmatched] += 1
+        keep = self._missed <= self.max_missed
+        self._ids, self._classes, self._confidence = self._ids[keep], self._classes[keep], self._confidence[keep]
+        self._detected, self._velocity = self._detected[keep], self._velocity[keep]
+        self._detected_at, self._missed = self._detected_at[keep], self._missed[keep]
+
+        new = np.ones(len(boxes), dtype=bool)
+        new[cols] = False
+        count = int(new.sum())
+        if count:
+            new_ids = np.arange(self._next_id, self._next_id + count, dtype=np.int32)
+            self._ids = np.concatenate([self._ids, new_ids])
+            self._next_id += count
+            self._classes = np.concatenate([self._classes, classes[new]])
+            self._confidence = np.concatenate([self._confidence, detections['confidence'][new]])
+            self._detected = np.concatenate([self._detected, boxes[new]])
+            self._velocity = np.concatenate([self._velocity, np.zeros((count, 4), dtype=np.float32)])
+            self._detected_at = np.concatenate([self._detected_at, np.full(count, now)])
+            self._missed = np.concatenate([self._missed, np.zeros(count, dtype=np.int32)])
+
+        self._frames_since_keyframe = 0
+        return self._tracks(now)
+
+    @property
+    def coasting(self) -> np.ndarray:
+        """Mask over the tracks of those the last keyframe did not detect"""
+        return self._missed > 0
+
+    def predict(self, now: Optional[float] = None) -> np.ndarray:
+        """Tracks moved on to now, for a frame without a detection"""
+        self._frames_since_keyframe += 1
+        return self._tracks(time.monotonic() if now is None else now)
+
+    def hold(self, now: Optional[float] = None):
+        """Stop every track at its last detected box, for frames known to match the last keyframe"""
+        now = time.monotonic() if now is None else now
+        self._velocity[:] = 0.0
+        self._detected_at[:] = now
+
+    @property
+    def drift_stats(self) -> Dict[str, Any]:
+        """Prediction error at keyframes as 1 - IoU with the detected box"""
+        if not self.drift:
+            return {'samples': 0, 'mean': 0.0, 'p95': 0.0}
+        drift = np.fromiter(self.drift, dtype=np.float64)
+        return {'samples': len(drift), 'mean': float(drift.mean()),
+                'p95': float(np.percentile(drift, 95))}
+
+class TrackingAnalyzer:
+    """Runs analyzer.analyze_frame() on keyframes only and tracks boxes in between.
+
+    A drop-in for the analyzer: analyze_frame() returns the frame annotated
+    with the current tracks and the tracks themselves (TRACK_DTYPE). On
+    keyframes the analyzer's own annotation is reused and only the tracks
+    it did not detect are drawn on top.
+
+    The analyzer may be a motion gate (modules.adaptive_inference) so the
+    tracker sits in front of it: every frame advances the tracks, and on a
+    keyframe the gate decides whether the model actually runs. A skipped
+    keyframe coasts on the tracks and the next frame is due again; while
+    the gate reports the screen unchanged since the last run the tracks
+    stay where that run found them.
+    """
+    def __init__(self, analyzer, keyframe_interval: int = 5, **options):
+        self.analyzer = analyzer
+        self.tracker = ObjectTracker(keyframe_interval, **options)
+
+    @property
+    def names(self):
+        return self.analyzer.names
+
+    def _detect(self, frame, now: float):
+        """(annotated, detections) from the analyzer, annotated None if the model did not run"""
+        if not hasattr(self.analyzer, 'process'):
+            return self.analyzer.analyze_frame(frame)
+        annotated, detections, decision = self.analyzer.process(frame, now)
+        if not decision.ran:
+            if decision.idle:
+                self.tracker.hold(now)
+            return None, detections
+        return annotated, detections
+
+    def analyze_frame(self, frame, now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        keyframe = self.tracker.keyframe_due
+        if keyframe:
+            annotated, detections = self._detect(frame, now)
+            if annotated is not None:
+                tracks = self.tracker.update(detections, now)
+                coasting = self.tracker.coasting
+                if coasting.any():
+                    annotated = annotate(annotated, tracks[coasting], self.names)
+                return annotated, tracks
+        tracks = self.tracker.predict(now)
+        if keyframe and not len(tracks):
+            # Nothing to show yet, e.g. the model is still loading
+            return None, tracks
+        return annotate(frame, tracks, self.names), tracks
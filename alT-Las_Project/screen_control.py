@@ -5,29 +5,186 @@
 Geliştiriciler: Özgür ve Vahap
 """
 import pyautogui
+import threading
 import time
+import cv2
+import numpy as np
 from PIL import Image
 import mss
+from template_matcher import TemplateMatcher, LocationCache, DPI_SCALES
 
 confidence_level = 0.7
 
-def capture_screen():
+# Bekleme fonksiyonlarının ekranı yoklama aralığı (saniye)
+poll_interval = 0.02
+# Bölge değişimi için küçültülmüş gri görüntüde piksel başına fark eşiği
+change_threshold = 12
+# click_element'e bölge verilmezse tıklanan noktanın bu kadar çevresi izlenir (piksel);
+# tüm ekranın küçültülmüş halinde odak çerçevesi gibi küçük tepkiler kaybolur
+click_watch_radius = 100
+
+# Şablonlar bir kez okunup bellekte tutulur
+matcher = TemplateMatcher()
+# Ekranın o kısmı değişmediyse elemanın son bulunduğu yer tekrar kullanılır
+location_cache = LocationCache()
+
+# mss yerine kullanılacak yakalama kaynağı (ör. video veya sentetik kaynak).
+# "monitors" listesi ve BGRA numpy dizisi döndüren grab(bölge) sağlamalıdır.
+capture_backend = None
+
+def set_capture_backend(backend):
+    global capture_backend
+    capture_backend = backend
+
+def capture_screen(region=None):
+    # region: (left, top, width, height); sadece bu alan yakalanır
     try:
+        if region is not None:
+            left, top, width, height = region
+            region = {"left": left, "top": top, "width": width, "height": height}
+        if capture_backend is not None:
+            frame = capture_backend.grab(region or capture_backend.monitors[1])
+            return Image.frombuffer("RGB", (frame.shape[1], frame.shape[0]), frame, "raw", "BGRX", 0, 1)
         with mss.mss() as sct:
-            monitor = sct.monitors[1]
-            screen_data = sct.grab(monitor)
+            screen_data = sct.grab(region or sct.monitors[1])
             return Image.frombytes("RGB", screen_data.size, screen_data.bgra, "raw", "BGRX")
     except Exception as e:
         print(f"Ekran görüntüsü alma hatası: {str(e)}")
         return None
 
-def find_element(screenshot, element_name):
+_thread_local = threading.local()
+
+def _sct():
+    # Her iş parçacığında tek mss örneği
+    sct = getattr(_thread_local, "sct", None)
+    if sct is None:
+        sct = _thread_local.sct = mss.mss()
+    return sct
+
+def _monitor():
+    return (capture_backend or _sct()).monitors[1]
+
+def _grab(region):
+    # Yoklama döngüleri için: BGRA numpy dizisi
+    if region is not None:
+        left, top, width, height = region
+        region = {"left": left, "top": top, "width": width, "height": height}
+    if capture_backend is not None:
+        return capture_backend.grab(region or capture_backend.monitors[1])
+    sct = _sct()
+    shot = sct.grab(region or sct.monitors[1])
+    return np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+
+def _around(x, y, radius):
+    # (x, y) çevresindeki kare bölge, ekran sınırlarına kırpılmış
+    monitor = _monitor()
+    left, top = max(monitor["left"], int(x) - radius), max(monitor["top"], int(y) - radius)
+    right = min(monitor["left"] + monitor["width"], int(x) + radius)
+    bottom = min(monitor["top"] + monitor["height"], int(y) + radius)
+    return left, top, max(1, right - left), max(1, bottom - top)
+
+def _signature(frame, size=64):
+    height, width = frame.shape[:2]
+    scale = min(1.0, size / width)
+    small = cv2.resize(frame, (max(1, int(width * scale)), max(1, int(height * scale))),
+                       interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(small, cv2.COLOR_BGRA2GRAY).astype(np.int16)
+
+def region_signature(region=None, size=64):
+    # Bölgenin en fazla size piksel genişliğe küçültülmüş gri hali; ucuz karşılaştırma için
+    return _signature(_grab(region), size)
+
+def _changed(a, b):
+    return a.shape != b.shape or np.abs(a - b).max() > change_threshold
+
+def wait_for_change(region=None, timeout=5.0, reference=None):
+    # Bölge reference'a (verilmezse şimdiki haline) göre değişince True, süre dolarsa False
+    deadline = time.monotonic() + timeout
+    try:
+        if reference is None:
+            reference = region_signature(region)
+        while True:
+            if _changed(region_signature(region), reference):
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(poll_interval)
+    except Exception as e:
+        print(f"Ekran değişimi bekleme hatası: {str(e)}")
+        return False
+
+def wait_for_stable(region=None, timeout=5.0, stable_time=0.1):
+    # Bölge stable_time boyunca değişmeden kalınca True (animasyonlar bitti), süre dolarsa False
+    deadline = time.monotonic() + timeout
+    try:
+        previous = region_signature(region)
+        stable_since = time.monotonic()
+        while True:
+            current = region_signature(region)
+            now = time.monotonic()
+            if _changed(current, previous):
+                previous, stable_since = current, now
+            elif now - stable_since >= stable_time:
+                return True
+            if now >= deadline:
+                return False
+            time.sleep(poll_interval)
+    except Exception as e:
+        print(f"Ekran sabitlenmesi bekleme hatası: {str(e)}")
+        return False
+
+def _match_frame(frame, element_name, region):
+    # frame: _grab(region) çıktısı; eşleşme ekran koordinatında döner
+    if region is None:
+        match = location_cache.lookup(frame, element_name, None, confidence_level)
+        if match is None:
+            match = matcher.match(frame, element_name, threshold=confidence_level)
+            location_cache.store(frame, element_name, match)
+        return None if match is None else (match.x, match.y)
+    # Önbellek tüm ekran koordinatında tutulduğundan bölge karelerinde kullanılmaz
+    match = matcher.match(frame, element_name, threshold=confidence_level)
+    return None if match is None else (match.x + region[0], match.y + region[1])
+
+def wait_for_element(element_name, timeout=5.0, region=None):
+    # Eleman ekranda görünene kadar bekler; (x, y) veya süre dolarsa (None, None).
+    # region verilirse sadece o alan yakalanır. Şablon eşleştirme pahalı olduğundan
+    # yalnızca alanın küçültülmüş hali son aramadan beri değiştiyse tekrarlanır.
+    deadline = time.monotonic() + timeout
+    searched = None
+    error = None
+    while True:
+        try:
+            frame = _grab(region)
+            if frame is not None:
+                signature = _signature(frame)
+                if searched is None or _changed(signature, searched):
+                    searched = signature
+                    location = _match_frame(frame, element_name, region)
+                    if location is not None:
+                        return location
+        except Exception as e:
+            # Anlık yakalama hataları beklemeyi bitirmez, süre dolana kadar tekrar denenir
+            error = e
+        if time.monotonic() >= deadline:
+            if error is not None:
+                print(f"Eleman bekleme hatası: {str(error)}")
+            print(f"Eleman zaman aşımına kadar bulunamadı: {element_name}")
+            return None, None
+        time.sleep(poll_interval)
+
+def find_element(screenshot, element_name, region=None):
+    # screenshot: capture_screen() çıktısı; None ise ekran yeniden yakalanır
+    # region: (left, top, width, height) sadece bu alanda aranır
     global confidence_level
     try:
-        location = pyautogui.locateCenterOnScreen(element_name, confidence=confidence_level)
-        if location is not None:
-            x, y = location
-            return x, y
+        if screenshot is None:
+            screenshot = capture_screen()
+        match = location_cache.lookup(screenshot, element_name, region, confidence_level)
+        if match is None:
+            match = matcher.match(screenshot, element_name, region=region, threshold=confidence_level)
+            location_cache.store(screenshot, element_name, match)
+        if match is not None:
+            return match.x, match.y
         else:
             print(f"Eleman bulunamadı: {element_name}. Güven düzeyi: {confidence_level}")
             return None, None
@@ -35,10 +192,53 @@ def find_element(screenshot, element_name):
         print(f"Eleman bulma hatası: {str(e)}")
         return None, None
 
-def click_element(x, y):
+def find_elements(screenshot, element_names, region=None, scales=DPI_SCALES):
+    # Birden çok elemanı tek çağrıda arar; {ad: (x, y)} döndürür, bulunamayanlar (None, None)
+    # scales: ekran ölçeklemesi bilinmiyorsa şablonun denenecek boyutları
+    global confidence_level
+    try:
+        if screenshot is None:
+            screenshot = capture_screen()
+        matches = {name: location_cache.lookup(screenshot, name, region, confidence_level)
+                   for name in element_names}
+        missing = [name for name, match in matches.items() if match is None]
+        if missing:
+            found = matcher.find_all(screenshot, missing, region=region,
+                                     threshold=confidence_level, scales=scales)
+            for name, match in found.items():
+                location_cache.store(screenshot, name, match)
+            matches.update(found)
+    except Exception as e:
+        print(f"Eleman bulma hatası: {str(e)}")
+        return {name: (None, None) for name in element_names}
+    locations = {}
+    for name, match in matches.items():
+        if match is None:
+            print(f"Eleman bulunamadı: {name}. Güven düzeyi: {confidence_level}")
+            locations[name] = (None, None)
+        else:
+            locations[name] = (match.x, match.y)
+    return locations
+
+def click_element(x, y, region=None, timeout=1.0, move_duration=0):
+    # Tıkladıktan sonra sabit beklemek yerine arayüzün tepki vermesini
+    # (region değişir, ardından sabitlenir) en fazla timeout saniye bekler.
+    # region verilmezse (x, y) çevresindeki click_watch_radius alanı izlenir.
+    # Arayüz tepki verdiyse True döner.
     try:
-        pyautogui.moveTo(x, y, duration=0.2)
-        pyautogui.click()
-        time.sleep(1)
+        if region is None and timeout > 0:
+            region = _around(x, y, click_watch_radius)
+        reference = region_signature(region) if timeout > 0 else None
+        if move_duration:
+            pyautogui.moveTo(x, y, duration=move_duration, _pause=False)
+        pyautogui.click(x, y, _pause=False)
+        if reference is None:
+            return True
+        start = time.monotonic()
+        if not wait_for_change(region, timeout, reference):
+            return False
+        wait_for_stable(region, max(0.0, timeout - (time.monotonic() - start)))
+        return True
     except Exception as e:
         print(f"Elemana tıklama hatası: {str(e)}")
+        return False
@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+"""
+alT-Las Projesi
+Şablon eşleştirme modülü.
+Ekrandan yeniden görüntü almadan, önceden yakalanmış kare üzerinde
+cv2.matchTemplate ile eleman arar.
+Geliştiriciler: Özgür ve Vahap
+"""
+import os
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+MODES = ("color", "gray", "edges")
+
+# Farklı DPI ölçeklemeleri (%100, %125, %150, %175, %200) için şablon boyutları
+DPI_SCALES = (1.0, 1.25, 1.5, 1.75, 2.0)
+
+# Kaba aramanın yapıldığı piramit seviyesi ve bu seviyede şablonun en küçük kenarı
+COARSE_FACTOR = 0.5
+MIN_COARSE_SIZE = 12
+# Kaba seviyede bu kadar düşük skor alan şablon ekranda yok sayılır
+COARSE_MARGIN = 0.2
+
+# x, y: eşleşmenin merkezi; rect: (left, top, width, height); hepsi görüntü koordinatında
+# scale: eşleşen şablon ölçeği
+Match = namedtuple("Match", "x y score rect scale", defaults=(1.0,))
+
+def load_image(path):
+    # cv2.imread Windows'ta Türkçe karakterli yolları açamaz, bu yüzden imdecode
+    data = np.fromfile(path, dtype=np.uint8)
+    image = cv2.imdecode(data, cv2.IMREAD_UNCHANGED)
+    if image is None:
+        raise ValueError(f"Şablon okunamadı: {path}")
+    return image
+
+def to_bgr(image):
+    # PIL görüntüsü (RGB) veya numpy dizisi (gri, BGR, BGRA) kabul eder
+    if not isinstance(image, np.ndarray):
+        image = cv2.cvtColor(np.asarray(image.convert("RGB")), cv2.COLOR_RGB2BGR)
+    if image.ndim == 2:
+        return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+    if image.shape[2] == 4:
+        return cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
+    return image
+
+def variants(bgr, mode):
+    # Eşleştirmede kullanılan görüntü biçimi
+    if mode == "color":
+        return bgr
+    gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+    if mode == "gray":
+        return gray
+    return cv2.Canny(gray, 50, 150)
+
+def clip_region(region, width, height):
+    # region: (left, top, width, height); görüntü sınırlarına kırpılır
+    if region is None:
+        return 0, 0, width, height
+    left, top, w, h = region
+    right, bottom = min(width, int(left + w)), min(height, int(top + h))
+    left, top = max(0, int(left)), max(0, int(top))
+    return left, top, max(0, right - left), max(0, bottom - top)
+
+class TemplateCache:
+    """Diskten okunan şablonları ve gri/kenar biçimlerini bellekte tutar.
+
+    Dosya değiştirildiğinde (mtime) şablon yeniden okunur.
+    """
+    def __init__(self):
+        self._templates = {}
+        self._lock = threading.Lock()
+
+    def get(self, name, mode, scale=1.0):
+        # Ölçeklenmiş şablonlar da ilk kullanımda hesaplanıp saklanır
+        mtime = os.path.getmtime(name)
+        with self._lock:
+            entry = self._templates.get(name)
+            if entry is None or entry["mtime"] != mtime:
+                entry = {"mtime": mtime, "color": to_bgr(load_image(name))}
+                self._templates[name] = entry
+            key = (mode, round(scale, 4))
+            if key not in entry:
+                color = entry["color"]
+                if key[1] != 1.0:
+                    height, width = color.shape[:2]
+                    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+                    interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+                    color = cv2.resize(color, size, interpolation=interpolation)
+                entry[key] = variants(color, mode)
+            return entry[key]
+
+    def clear(self):
+        with self._lock:
+            self._templates.clear()
+
+    def __len__(self):
+        return len(self._templates)
+
+def crop_bgr(image, rect):
+    # Tüm ekranı dönüştürmeden sadece rect alanını BGR olarak alır
+    left, top, width, height = rect
+    if isinstance(image, np.ndarray):
+        if top + height > image.shape[0] or left + width > image.shape[1]:
+            return None
+        return to_bgr(image[top:top + height, left:left + width])
+    if top + height > image.height or left + width > image.width:
+        return None
+    return to_bgr(image.crop((left, top, left + width, top + height)))
+
+def fingerprint(bgr, size=16):
+    # Bölgenin küçültülmüş gri hali; karşılaştırması mikrosaniyeler sürer
+    gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
+    return cv2.resize(gray, (size, size), interpolation=cv2.INTER_AREA).astype(np.int16)
+
+class LocationCache:
+    """Her şablonun son bulunduğu yeri ve altındaki piksellerin parmak izini saklar.
+
+    lookup() o alanın parmak izini yeni ekranla karşılaştırır; alan
+    değişmediyse tam arama yapmadan eski eşleşmeyi döndürür.
+    """
+    def __init__(self, tolerance=8):
+        self.tolerance = tolerance
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, image, name, region=None, threshold=0.0):
+        with self._lock:
+            entry = self._entries.get(name)
+        if entry is None or entry["match"].score < threshold or not self._inside(entry["match"], region):
+            self.misses += 1
+            return None
+        try:
+            if os.path.getmtime(name) != entry["mtime"]:
+                raise ValueError("şablon değişti")
+            crop = crop_bgr(image, entry["match"].rect)
+        except (OSError, ValueError):
+            crop = None
+        if crop is None or np.abs(fingerprint(crop) - entry["fingerprint"]).max() > self.tolerance:
+            self.invalidate(name)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry["match"]
+
+    def store(self, image, name, match):
+        if match is None:
+            self.invalidate(name)
+            return
+        crop = crop_bgr(image, match.rect)
+        if crop is None:
+            return
+        entry = {"match": match, "fingerprint": fingerprint(crop), "mtime": os.path.getmtime(name)}
+        with self._lock:
+            self._entries[name] = entry
+
+    def invalidate(self, name=None):
+        # name verilmezse tüm önbellek temizlenir
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(name, None)
+
+    @staticmethod
+    def _inside(match, region):
+        if region is None:
+            return True
+        left, top, width, height = match.rect
+        r_left, r_top, r_width, r_height = region
+        return (left >= r_left and top >= r_top and left + width <= r_left + r_width
+                and top + height <= r_top + r_height)
+
+    def __len__(self):
+        return len(self._entries)
+
+class TemplateMatcher:
+    """Yakalanmış bir kare üzerinde şablon arar.
+
+    mode: "color" (pyautogui ile aynı), "gray" (yaklaşık 3 kat hızlı) veya
+    "edges" (tema/renk değişimlerine dayanıklı).
+    """
+    def __init__(self, mode="gray", method=cv2.TM_CCOEFF_NORMED, cache=None, workers=None):
+        if mode not in MODES:
+            raise ValueError(f"Bilinmeyen eşleştirme modu: {mode}")
+        self.mode = mode
+        self.method = method
+        self.cache = cache or TemplateCache()
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self._executor = None
+        self._pool_lock = threading.Lock()
+
+    def prepare(self, image, mode=None):
+        # Aynı kare üzerinde birden çok arama için dönüşüm bir kez yapılır
+        return variants(to_bgr(image), mode or self.mode)
+
+    def match(self, image, name, region=None, threshold=0.7, mode=None, prepared=False):
+        """En iyi eşleşmeyi Match olarak döndürür; skor eşiğin altındaysa None.
+
+        region: (left, top, width, height) arama alanı. prepared=True ise
+        image zaten prepare() çıktısıdır.
+        """
+        mode = mode or self.mode
+        haystack = image if prepared else self.prepare(image, mode)
+        return self._search(haystack, self.cache.get(name, mode), region, threshold)
+
+    def _search(self, haystack, template, region, threshold, scale=1.0):
+        left, top, width, height = clip_region(region, haystack.shape[1], haystack.shape[0])
+        t_height, t_width = template.shape[:2]
+        if t_width > width or t_height > height:
+            return None
+        roi = haystack[top:top + height, left:left + width]
+        result = cv2.matchTemplate(roi, template, self.method)
+        min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+        if self.method in (cv2.TM_SQDIFF, cv2.TM_SQDIFF_NORMED):
+            # Kare farkı yöntemlerinde en küçük değer en iyisidir
+            score, (x, y) = 1.0 - min_val, min_loc
+        else:
+            score, (x, y) = max_val, max_loc
+        if score < threshold:
+            return None
+        x, y = x + left, y + top
+        return Match(x + t_width // 2, y + t_height // 2, float(score), (x, y, t_width, t_height), scale)
+
+    def _search_scaled(self, levels, name, mode, region, threshold, scale):
+        # Önce yarım çözünürlükte kaba arama, sonra tam çözünürlükte
+        # bulunan yerin çevresinde ince arama yapılır
+        haystack, coarse = levels
+        template = self.cache.get(name, mode, scale)
+        if coarse is None or min(template.shape[:2]) * COARSE_FACTOR < MIN_COARSE_SIZE:
+            return self._search(haystack, template, region, threshold, scale)
+        coarse_region = None
+        if region is not None:
+            coarse_region = tuple(v * COARSE_FACTOR for v in region)
+        hit = self._search(coarse, self.cache.get(name, mode, scale * COARSE_FACTOR),
+                           coarse_region, threshold - COARSE_MARGIN, scale)
+        if hit is None:
+            return None
+        t_height, t_width = template.shape[:2]
+        pad = int(2 / COARSE_FACTOR) + 2
+        left = int(hit.rect[0] / COARSE_FACTOR) - pad
+        top = int(hit.rect[1] / COARSE_FACTOR) - pad
+        fine_region = (left, top, t_width + 2 * pad, t_height + 2 * pad)
+        if region is not None:
+            r_left, r_top, r_width, r_height = clip_region(region, haystack.shape[1], haystack.shape[0])
+            f_left, f_top = max(left, r_left), max(top, r_top)
+            f_right = min(left + fine_region[2], r_left + r_width)
+            f_bottom = min(top + fine_region[3], r_top + r_height)
+            fine_region = (f_left, f_top, f_right - f_left, f_bottom - f_top)
+        return self._search(haystack, template, fine_region, threshold, scale)
+
+    def _find_one(self, levels, name, mode, region, threshold, scales):
+        best = None
+        for scale in scales:
+            try:
+                hit = self._search_scaled(levels, name, mode, region, threshold, scale)
+            except Exception as e:
+                print(f"Şablon eşleştirme hatası ({name}): {str(e)}")
+                return None
+            if hit is not None and (best is None or hit.score > best.score):
+                best = hit
+        return best
+
+    def _pool(self):
+        with self._pool_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                    thread_name_prefix="template-match")
+            return self._executor
+
+    def find_all(self, image, names, region=None, threshold=0.7, scales=(1.0,), mode=None):
+        """Birden çok şablonu tek çağrıda arar; {ad: Match veya None} döndürür.
+
+        Ekran görüntüsü bir kez dönüştürülür ve yarım çözünürlüklü kopyası
+        bir kez çıkarılır. Her şablon scales içindeki her ölçekte (ör.
+        DPI_SCALES) aranır ve en yüksek skorlu eşleşme seçilir. OpenCV
+        matchTemplate sırasında GIL'i bıraktığı için şablonlar iş
+        parçacıklarına dağıtılır.
+        """
+        mode = mode or self.mode
+        bgr = to_bgr(image)
+        coarse = None
+        if min(bgr.shape[:2]) * COARSE_FACTOR >= MIN_COARSE_SIZE:
+            # Şablonlarla aynı şekilde: önce küçült, sonra gri/kenar biçimine çevir
+            coarse = variants(cv2.resize(bgr, None, fx=COARSE_FACTOR, fy=COARSE_FACTOR,
+                                         interpolation=cv2.INTER_AREA), mode)
+        levels = (variants(bgr, mode), coarse)
+        names = list(dict.fromkeys(names))
+        if len(names) <= 1:
+            return {name: self._find_one(levels, name, mode, region, threshold, scales) for name in names}
+        results = self._pool().map(
+            lambda name: self._find_one(levels, name, mode, region, threshold, scales), names)
+        return dict(zip(names, results))
+
+    def close(self):
+        with self._pool_lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
@@ -1,11 +1,107 @@
 # -*- coding: utf-8 -*-
+import time
 import unittest
+from unittest import mock
+import numpy as np
+import screen_control
 from screen_control import capture_screen
+from template_matcher import Match
+
+class SabitKaynak:
+    monitors = [{}, {"left": 0, "top": 0, "width": 40, "height": 30}]
+
+    def grab(self, bolge):
+        return np.zeros((bolge["height"], bolge["width"], 4), dtype=np.uint8)
+
+class DegisenKaynak(SabitKaynak):
+    # degisim kadar yakalamadan sonra ekran beyaza döner
+    def __init__(self, degisim):
+        self.degisim = degisim
+        self.sayac = 0
+
+    def grab(self, bolge):
+        self.sayac += 1
+        kare = super().grab(bolge)
+        if self.sayac > self.degisim:
+            kare[:] = 255
+        return kare
+
+class KayitliKaynak(SabitKaynak):
+    # Yakalanan bölgeleri kaydeder
+    def __init__(self):
+        self.bolgeler = []
+
+    def grab(self, bolge):
+        self.bolgeler.append(bolge)
+        return super().grab(bolge)
 
 class TestScreenControl(unittest.TestCase):
     def test_capture_screen(self):
         img = capture_screen()
         self.assertIsNotNone(img)
 
+    def test_capture_screen_with_backend(self):
+        screen_control.set_capture_backend(SabitKaynak())
+        try:
+            self.assertEqual(capture_screen().size, (40, 30))
+            self.assertEqual(capture_screen(region=(5, 5, 10, 8)).size, (10, 8))
+        finally:
+            screen_control.set_capture_backend(None)
+
+    def test_wait_for_change(self):
+        screen_control.set_capture_backend(DegisenKaynak(degisim=3))
+        try:
+            self.assertTrue(screen_control.wait_for_change(timeout=1.0))
+            self.assertFalse(screen_control.wait_for_change(timeout=0.05))
+        finally:
+            screen_control.set_capture_backend(None)
+
+    def test_wait_for_stable(self):
+        screen_control.set_capture_backend(DegisenKaynak(degisim=2))
+        try:
+            baslangic = time.monotonic()
+            self.assertTrue(screen_control.wait_for_stable(timeout=1.0, stable_time=0.05))
+            self.assertLess(time.monotonic() - baslangic, 0.5)
+        finally:
+            screen_control.set_capture_backend(None)
+
+    def test_wait_for_element_rematches_only_on_change(self):
+        kaynak = KayitliKaynak()
+        screen_control.set_capture_backend(kaynak)
+        try:
+            with mock.patch.object(screen_control.matcher, "match", return_value=None) as eslestir:
+                sonuc = screen_control.wait_for_element("yok.png", timeout=0.1, region=(5, 5, 10, 8))
+        finally:
+            screen_control.set_capture_backend(None)
+        self.assertEqual(sonuc, (None, None))
+        # Ekran değişmediği için şablon bir kez aranır, sadece bölge yakalanır
+        self.assertEqual(eslestir.call_count, 1)
+        self.assertGreater(len(kaynak.bolgeler), 1)
+        self.assertTrue(all(b["width"] == 10 and b["height"] == 8 for b in kaynak.bolgeler))
+
+    def test_wait_for_element_retries_failed_captures(self):
+        kaynak = DegisenKaynak(degisim=0)
+        yakala = mock.Mock(side_effect=[None, RuntimeError("geçici"), kaynak.grab({"width": 40, "height": 30})])
+        kaynak.grab = yakala
+        bulundu = Match(12, 7, 0.9, (10, 5, 4, 4))
+        screen_control.set_capture_backend(kaynak)
+        try:
+            with mock.patch.object(screen_control.matcher, "match", return_value=bulundu):
+                self.assertEqual(screen_control.wait_for_element("var.png", timeout=1.0, region=(3, 4, 40, 30)),
+                                 (15, 11))
+        finally:
+            screen_control.set_capture_backend(None)
+
+    def test_click_watches_around_the_point(self):
+        kaynak = KayitliKaynak()
+        kaynak.monitors = [{}, {"left": 0, "top": 0, "width": 1920, "height": 1080}]
+        screen_control.set_capture_backend(kaynak)
+        try:
+            with mock.patch.object(screen_control, "pyautogui"):
+                screen_control.click_element(50, 500, timeout=0.05)
+        finally:
+            screen_control.set_capture_backend(None)
+        self.assertEqual(kaynak.bolgeler[0], {"left": 0, "top": 400, "width": 150, "height": 200})
+
 if __name__ == "__main__":
     unittest.main()
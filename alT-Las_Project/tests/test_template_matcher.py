@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+import os
+import tempfile
+import unittest
+import cv2
+import numpy as np
+from PIL import Image
+from template_matcher import TemplateMatcher, LocationCache, DPI_SCALES
+
+def ekran_ve_sablon():
+    rng = np.random.default_rng(0)
+    ekran = rng.integers(0, 256, (300, 400, 3), dtype=np.uint8)
+    sablon = ekran[120:150, 200:240].copy()
+    return ekran, sablon
+
+class TestTemplateMatcher(unittest.TestCase):
+    def setUp(self):
+        self.klasor = tempfile.TemporaryDirectory()
+        self.ekran, sablon = ekran_ve_sablon()
+        self.yol = os.path.join(self.klasor.name, "düğme.png")
+        cv2.imencode(".png", sablon)[1].tofile(self.yol)
+
+    def tearDown(self):
+        self.klasor.cleanup()
+
+    def test_finds_center(self):
+        for mod in ("color", "gray", "edges"):
+            eslesme = TemplateMatcher(mode=mod).match(self.ekran, self.yol)
+            self.assertEqual((eslesme.x, eslesme.y), (220, 135), mod)
+            self.assertGreater(eslesme.score, 0.7)
+
+    def test_region_limits_search(self):
+        matcher = TemplateMatcher()
+        self.assertIsNone(matcher.match(self.ekran, self.yol, region=(0, 0, 150, 150)))
+        eslesme = matcher.match(self.ekran, self.yol, region=(180, 100, 100, 80))
+        self.assertEqual(eslesme.rect, (200, 120, 40, 30))
+
+    def test_template_is_cached(self):
+        matcher = TemplateMatcher()
+        matcher.match(self.ekran, self.yol)
+        matcher.match(self.ekran, self.yol)
+        self.assertEqual(len(matcher.cache), 1)
+
+class TestLocationCache(unittest.TestCase):
+    def setUp(self):
+        self.klasor = tempfile.TemporaryDirectory()
+        self.ekran, sablon = ekran_ve_sablon()
+        self.yol = os.path.join(self.klasor.name, "düğme.png")
+        cv2.imencode(".png", sablon)[1].tofile(self.yol)
+        self.eslesme = TemplateMatcher().match(self.ekran, self.yol)
+        self.onbellek = LocationCache()
+        self.onbellek.store(self.ekran, self.yol, self.eslesme)
+
+    def tearDown(self):
+        self.klasor.cleanup()
+
+    def test_hit_while_region_unchanged(self):
+        ekran = self.ekran.copy()
+        ekran[0:50, 0:50] = 0  # elemanın dışında değişiklik
+        self.assertEqual(self.onbellek.lookup(ekran, self.yol), self.eslesme)
+        pil = Image.fromarray(cv2.cvtColor(ekran, cv2.COLOR_BGR2RGB))
+        self.assertEqual(self.onbellek.lookup(pil, self.yol), self.eslesme)
+        self.assertEqual(self.onbellek.hits, 2)
+
+    def test_miss_when_region_changes(self):
+        ekran = self.ekran.copy()
+        ekran[120:150, 200:240] = 0
+        self.assertIsNone(self.onbellek.lookup(ekran, self.yol))
+        self.assertEqual(len(self.onbellek), 0)
+
+    def test_miss_outside_requested_region(self):
+        self.assertIsNone(self.onbellek.lookup(self.ekran, self.yol, region=(0, 0, 100, 100)))
+        self.assertIsNotNone(self.onbellek.lookup(self.ekran, self.yol, region=(150, 100, 150, 100)))
+
+class TestFindAll(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        kaba = rng.integers(0, 256, (90, 160, 3), dtype=np.uint8)
+        self.ekran = cv2.resize(kaba, (640, 360), interpolation=cv2.INTER_LINEAR)
+        self.klasor = tempfile.TemporaryDirectory()
+        self.yollar = []
+        for i, (x, y) in enumerate([(40, 30), (300, 100), (500, 250)]):
+            yol = os.path.join(self.klasor.name, f"eleman{i}.png")
+            cv2.imencode(".png", self.ekran[y:y + 32, x:x + 64])[1].tofile(yol)
+            self.yollar.append(yol)
+        bos = np.full((32, 64, 3), 127, dtype=np.uint8)
+        bos[8:24, 16:48] = 0
+        self.yok = os.path.join(self.klasor.name, "yok.png")
+        cv2.imencode(".png", bos)[1].tofile(self.yok)
+        self.matcher = TemplateMatcher(workers=2)
+
+    def tearDown(self):
+        self.matcher.close()
+        self.klasor.cleanup()
+
+    def test_finds_all_templates_in_one_call(self):
+        sonuc = self.matcher.find_all(self.ekran, self.yollar + [self.yok])
+        merkezler = [(sonuc[yol].x, sonuc[yol].y) for yol in self.yollar]
+        self.assertEqual(merkezler, [(72, 46), (332, 116), (532, 266)])
+        self.assertIsNone(sonuc[self.yok])
+
+    def test_matches_scaled_screen(self):
+        ekran = cv2.resize(self.ekran, None, fx=1.5, fy=1.5, interpolation=cv2.INTER_LINEAR)
+        sonuc = self.matcher.find_all(ekran, self.yollar[1:2], scales=DPI_SCALES)[self.yollar[1]]
+        self.assertEqual(sonuc.scale, 1.5)
+        self.assertLessEqual(abs(sonuc.x - 498), 2)
+        self.assertLessEqual(abs(sonuc.y - 174), 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -36,6 +36,8 @@
     from modules.performance import get_cpu_usage, get_memory_usage
     from modules.cuda_helper import is_cuda_available
     from modules.screen_capture import ScreenCapture
+    from modules.change_detector import ChangeDetector
+    from modules.frame_bus import FrameBusSubscriber
     from modules.vision import VisionProcessor
     screen_capture = ScreenCapture()
 except ImportError as e:
@@ -47,16 +49,31 @@
     )
     screen_capture = None
 
+from modules.frame_pacing import TickScheduler
+from utils.config import Config
+
+try:
+    from modules.adaptive_inference import AdaptiveInference
+except ImportError as e:
+    logger.warning(f"Adaptive inference import error: {e}")
+    AdaptiveInference = None
+
 # Fix AI vision import
 try:
     from ai_vision.analyzer import AIVisionAnalyzer
+    from ai_vision.tracking import TrackingAnalyzer
+    from ai_vision.service import InferenceService
 except ImportError:
     logger.error("Failed to import AIVisionAnalyzer")
     class AIVisionAnalyzer:
-        def __init__(self):
+        loading = False
+        def __init__(self, *args, **kwargs):
             self.model = None
+            self.names = {}
         def analyze_frame(self, frame):
             return frame, []
+    TrackingAnalyzer = None
+    InferenceService = None
 
 # Optional dependencies with fallbacks
 AUDIO_AVAILABLE = False
@@ -87,6 +104,10 @@ def analyze_frame(self, frame):
     logger.info("To enable full monitoring, install matplotlib: pip install matplotlib")
     plt = None
 
+# Display sizes of the preview and AI vision tabs
+PREVIEW_SIZE = (400, 300)
+VISION_SIZE = (640, 480)
+
 def check_dependencies():
     required = {
         'numpy': 'numpy',
@@ -151,12 +172,35 @@ class DebugInterface(ttk.Frame):
     def __init__(self, parent):
         super().__init__(parent)
         self.audio_queue = queue.Queue() if AUDIO_AVAILABLE else None
+        # Vision display updates from other threads, applied on the Tk thread
+        self.vision_updates = queue.Queue()
         self.cpu_data = []
         self.mem_data = []
-        self.ai_vision = AIVisionAnalyzer()
+        # Loads off the GUI thread; the vision tab shows a loading state meanwhile
+        self.ai_vision = AIVisionAnalyzer(background=True)
+        # The motion gate decides which keyframes actually run the model
+        self.vision_gate = None
+        if AdaptiveInference:
+            self.vision_gate = AdaptiveInference(self.ai_vision)
+        # Tracked boxes on every frame, full inference on keyframes only
+        self.vision_tracker = None
+        if TrackingAnalyzer:
+            self.vision_tracker = TrackingAnalyzer(self.vision_gate or self.ai_vision,
+                                                   Config().vision['keyframe_interval'])
+        # Inference runs on worker threads so a slow model never holds up capture
+        self.vision_service = None
+        if InferenceService:
+            self.vision_service = InferenceService(self.vision_tracker or self.vision_gate or self.ai_vision,
+                                                   Config().vision['workers'])
+            self.vision_service.start()
+        self.vision_status = None
         self.is_recording_audio = False
         self.is_capturing_screen = False
         self.is_monitoring_vision = False
+        self.pacers = {
+            'preview': TickScheduler(10, name='preview'),
+            'vision': TickScheduler(10, name='vision')
+        }
         self.setup_interface()
         
     def setup_interface(self):
@@ -336,6 +380,7 @@ def start_monitoring(self):
         threading.Thread(target=self.update_screen_capture, daemon=True).start()
         # AI vision monitoring thread
         threading.Thread(target=self.update_vision_display, daemon=True).start()
+        self.after(50, self.drain_vision_updates)
     
     def update_system_graphs(self):
         while self.running:
@@ -401,54 +446,161 @@ def update_screen_capture(self):
             logger.warning("Screen capture module not available")
             return
             
+        detector = ChangeDetector()
+        subscriber, last_seq = None, 0
         while self.running:
             try:
                 if self.is_capturing_screen and self.toggles['Screen Capture'].get():
-                    screen = screen_capture.capture()
-                    if screen is not None:
-                        img = Image.fromarray(screen)
-                        img.thumbnail((400, 300))
+                    subscriber = self.attach_frame_bus(subscriber, PREVIEW_SIZE)
+                    seq, _, screen = subscriber.latest() if subscriber else (0, 0.0, None)
+                    fresh = screen is not None and seq != last_seq
+                    last_seq = seq
+                    # Nothing to redraw for a repeated frame or when no tile changed
+                    rgb = None
+                    if fresh and not detector.update(screen).unchanged:
+                        rgb = cv2.cvtColor(screen, cv2.COLOR_BGRA2RGB)
+                    # The zero-copy view may have been overwritten while converting; skip it if so
+                    if rgb is not None and subscriber.is_current(seq):
+                        img = Image.fromarray(rgb)
+                        img.thumbnail(PREVIEW_SIZE)
                         photo = ImageTk.PhotoImage(img)
                         self.screen_label.configure(image=photo)
                         self.screen_label.image = photo
-                time.sleep(0.1)
             except Exception as e:
                 logger.error(f"Screen capture error: {e}")
+            self.pacers['preview'].wait()
     
     def update_vision_display(self):
+        subscriber, last_seq = None, 0
         while self.running:
             try:
                 if self.is_monitoring_vision and hasattr(self, 'vision_canvas'):
-                    if screen_capture and hasattr(self, 'vision_canvas'):
-                        screen = screen_capture.capture()
-                        if screen is not None:
+                    # Widgets belong to the Tk thread; drain_vision_updates() applies these
+                    if self.ai_vision.loading:
+                        self.vision_updates.put((self.show_vision_status, "Loading AI vision model..."))
+                    elif self.ai_vision.model is None:
+                        self.vision_updates.put((self.show_vision_status, "AI vision model is not available"))
+                    elif screen_capture and self.vision_service:
+                        subscriber = self.attach_frame_bus(subscriber, VISION_SIZE)
+                        seq, timestamp, screen = subscriber.latest() if subscriber else (0, 0.0, None)
+                        fresh = screen is not None and seq != last_seq
+                        last_seq = seq
+                        if fresh:
                             # Convert to cv2 format
-                            frame = cv2.cvtColor(np.array(screen), cv2.COLOR_RGB2BGR)
+                            frame = cv2.cvtColor(screen, cv2.COLOR_BGRA2BGR)
+                            # The zero-copy view may have been overwritten while converting
+                            fresh = subscriber.is_current(seq)
+                        if fresh:
+                            # Vision runs on a pyramid level; report locations in screen pixels
+                            full_shape = screen_capture.frame_bus_shape
+                            scale = full_shape[1] / screen.shape[1] if full_shape else 1.0
                             
-                            # Get AI analysis
-                            annotated_frame, detections = self.ai_vision.analyze_frame(frame)
-                            
-                            if annotated_frame is not None:
-                                # Convert back to PhotoImage
-                                image = Image.fromarray(cv2.cvtColor(annotated_frame, cv2.COLOR_BGR2RGB))
-                                image.thumbnail((640, 480))
-                                photo = ImageTk.PhotoImage(image)
-                                
-                                self.vision_canvas.configure(image=photo)
-                                self.vision_canvas.image = photo
-                                
-                                # Update detection info
-                                self.detection_text.delete('1.0', tk.END)
-                                if detections:
-                                    for det in detections:
-                                        info = f"Found: {det['name']}\n"
-                                        info += f"Confidence: {det['confidence']:.2f}\n"
-                                        info += f"Location: ({int(det['xmin'])}, {int(det['ymin'])}) to "
-                                        info += f"({int(det['xmax'])}, {int(det['ymax'])})\n\n"
-                                        self.detection_text.insert(tk.END, info)
-                time.sleep(0.1)
+                            # Returns at once; a frame still waiting for a worker is replaced
+                            self.vision_service.submit(
+                                'screen', frame, timestamp,
+                                callback=lambda result, scale=scale: self.queue_vision_result(result, scale))
             except Exception as e:
                 logger.error(f"AI Vision error: {e}")
+            self.pacers['vision'].wait()
+
+    def queue_vision_result(self, result, scale):
+        """Inference callback on the worker thread.
+
+        Never touches Tk: a Tk call from here would wait for the main loop,
+        which may itself be waiting for this worker in vision_service.stop().
+        The stats are read here, next to the code that updates them.
+        Frames the motion gate skipped leave the display as is.
+        """
+        if result.annotated is not None:
+            self.vision_updates.put((self.show_vision_result, result, scale, self.vision_stats_text()))
+
+    def drain_vision_updates(self):
+        """Apply the newest queued vision update on the Tk thread; each one replaces the last"""
+        update = None
+        try:
+            while True:
+                update = self.vision_updates.get_nowait()
+        except queue.Empty:
+            pass
+        if update is not None:
+            try:
+                update[0](*update[1:])
+            except Exception as e:
+                logger.error(f"AI Vision display error: {e}")
+        if self.running:
+            self.after(50, self.drain_vision_updates)
+
+    def vision_stats_text(self):
+        """Gate, latency and tracking summary lines"""
+        lines = []
+        if self.vision_gate:
+            stats = self.vision_gate.stats
+            lines.append(f"Inference every {stats['interval']:.2f}s, "
+                         f"ran on {stats['run_ratio']:.0%} of keyframes\n")
+        latency = self.vision_service.latency_stats
+        lines.append(f"Capture to result: p50 {latency['p50_ms']:.0f} ms, "
+                     f"p95 {latency['p95_ms']:.0f} ms, {self.vision_service.stats['dropped']} stale frames dropped\n")
+        if self.vision_tracker:
+            drift = self.vision_tracker.tracker.drift_stats
+            lines.append(f"Tracking drift: mean {drift['mean']:.2f}, p95 {drift['p95']:.2f} (1 - IoU)\n")
+        return ''.join(lines)
+
+    def show_vision_result(self, result, scale, stats_text):
+        """Draw a finished inference; runs on the Tk thread"""
+        if not self.is_monitoring_vision:
+            return
+        # Convert back to PhotoImage
+        image = Image.fromarray(cv2.cvtColor(result.annotated, cv2.COLOR_BGR2RGB))
+        image.thumbnail(VISION_SIZE)
+        photo = ImageTk.PhotoImage(image)
+        
+        self.vision_canvas.configure(image=photo)
+        self.vision_canvas.image = photo
+        
+        # Update detection info
+        self.vision_status = None
+        self.detection_text.delete('1.0', tk.END)
+        for det in result.detections:
+            info = f"Found: {self.ai_vision.names[int(det['class'])]}"
+            info += f" #{det['track_id']}\n" if 'track_id' in det.dtype.names else "\n"
+            info += f"Confidence: {det['confidence']:.2f}\n"
+            info += f"Location: ({int(det['xmin'] * scale)}, {int(det['ymin'] * scale)}) to "
+            info += f"({int(det['xmax'] * scale)}, {int(det['ymax'] * scale)})\n\n"
+            self.detection_text.insert(tk.END, info)
+        self.detection_text.insert(tk.END, stats_text)
+
+    def show_vision_status(self, text):
+        """Show a status line instead of detections, rewriting it only when it changes"""
+        if self.vision_status != text:
+            self.vision_status = text
+            self.detection_text.delete('1.0', tk.END)
+            self.detection_text.insert(tk.END, text)
+
+    def attach_frame_bus(self, subscriber, max_size):
+        """Subscriber for the shared capture bus, so preview and vision share one grab per tick.
+
+        None while the bus is stopped; only update_frame_bus() starts it.
+        """
+        name = screen_capture.frame_bus_for(max_size)
+        if subscriber is not None and subscriber.name == name:
+            return subscriber
+        if subscriber is not None:
+            subscriber.close()
+        return FrameBusSubscriber(name) if name else None
+
+    def update_frame_bus(self):
+        """Run the capture bus exactly while a consumer is switched on.
+
+        Called from the toggle handlers only, so a loop thread that is still
+        finishing a tick can never restart the bus after it was stopped.
+        """
+        if not screen_capture:
+            return
+        if self.is_capturing_screen or self.is_monitoring_vision:
+            # The bus runs at the GUI loop rate
+            screen_capture.start_frame_bus(fps=10, pyramid_levels=4)
+        else:
+            screen_capture.stop_frame_bus()
     
     def save_settings(self):
         settings = {
@@ -487,6 +639,7 @@ def toggle_screen_capture(self):
             self.capture_start_btn.configure(text="Stop Capture")
         else:
             self.capture_start_btn.configure(text="Start Capture")
+        self.update_frame_bus()
             
     def toggle_ai_vision(self):
         self.is_monitoring_vision = not self.is_monitoring_vision
@@ -494,6 +647,7 @@ def toggle_ai_vision(self):
             self.vision_start_btn.configure(text="Stop AI Vision")
         else:
             self.vision_start_btn.configure(text="Start AI Vision")
+        self.update_frame_bus()
     
     def validate_apis(self):
         """Validate API keys and connections"""
@@ -599,6 +753,10 @@ def clear_status(self):
             
     def on_closing(self):
         """Handle window closing"""
+        if screen_capture:
+            screen_capture.stop_frame_bus()
+        if hasattr(self, 'debug_interface') and self.debug_interface.vision_service:
+            self.debug_interface.vision_service.stop()
         self.root.quit()
         
     def run_analysis(self):
@@ -615,6 +773,11 @@ def check_performance(self):
             mem = get_memory_usage()
             cuda = is_cuda_available()
             self.status_text.insert(tk.END, f"CPU: {cpu}%\nMemory: {mem}%\nCUDA: {cuda}\n")
+            for pacer in self.debug_interface.pacers.values():
+                stats = pacer.get_stats()
+                self.status_text.insert(tk.END, f"{stats['name'].title()} loop: {stats['achieved_fps']:.1f}/"
+                                                f"{stats['target_fps']:.0f} FPS, p95 lateness "
+                                                f"{stats['lateness_p95_ms']:.1f} ms, {stats['skipped']} skipped\n")
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
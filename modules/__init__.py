@@ -9,6 +9,10 @@
 try:
     from .performance import get_cpu_usage, get_memory_usage, GPUMonitor
     from .screen_capture import ScreenCapture
+    from .change_detector import ChangeDetector
+    from .multi_monitor import MultiMonitorCapture
+    from .frame_pacing import TickScheduler
+    from .adaptive_inference import AdaptiveInference
     from .cuda_helper import is_cuda_available, get_gpu_info
     from .audio import AudioManager
     from .vision import VisionProcessor
@@ -23,6 +27,10 @@
     'get_memory_usage',
     'GPUMonitor',
     'ScreenCapture',
+    'ChangeDetector',
+    'MultiMonitorCapture',
+    'TickScheduler',
+    'AdaptiveInference',
     'is_cuda_available',
     'get_gpu_info',
     'AudioManager',
@@ -0,0 +1,133 @@
+import cv2
+import numpy as np
+import logging
+import time
+from collections import Counter, deque, namedtuple
+from typing import Any, Dict, Optional, Tuple
+
+from ai_vision.detections import empty_detections
+
+logger = logging.getLogger(__name__)
+
+# Why a frame was or was not sent to the model
+RUN_FIRST = 'first'
+RUN_MOTION = 'motion'
+SKIP_IDLE = 'idle'
+SKIP_RATE = 'rate_limited'
+
+# timestamp: monotonic seconds; motion: mean absolute difference in 0..1 against
+# the last analyzed frame; interval: the minimum spacing between inferences in force
+class Decision(namedtuple("Decision", "timestamp ran reason motion interval latency")):
+    __slots__ = ()
+
+    @property
+    def idle(self) -> bool:
+        """The frame matched the last analyzed one, so its detections still hold"""
+        return self.reason == SKIP_IDLE
+
+class AdaptiveInference:
+    """Motion-gated front end for analyzer.analyze_frame().
+
+    Each frame is reduced to a small grayscale thumbnail and compared with
+    the thumbnail of the last analyzed frame. Below motion_threshold the
+    screen counts as idle and the previous detections are reused without
+    running the model. Otherwise the model runs at most once per interval,
+    which shrinks towards min_interval as motion grows and never drops below
+    the measured inference latency divided by max_duty, so inference cannot
+    take more than that share of a core. Every decision is kept in history.
+    """
+    def __init__(self, analyzer, motion_threshold: float = 0.004, high_motion: float = 0.05,
+                 min_interval: float = 0.1, max_interval: float = 2.0, max_duty: float = 0.5,
+                 thumbnail_size: Tuple[int, int] = (64, 36), history: int = 300):
+        self.analyzer = analyzer
+        self.motion_threshold = motion_threshold
+        self.high_motion = high_motion
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_duty = max_duty
+        self.thumbnail_size = thumbnail_size
+        self.history = deque(maxlen=history)
+        self.latency: Optional[float] = None
+        self.interval = min_interval
+        self._reference: Optional[np.ndarray] = None
+        self._last_run = 0.0
+        self._last_result: Tuple[Any, Any] = (None, empty_detections())
+
+    def reset(self):
+        self._reference = None
+        self._last_result = (None, empty_detections())
+
+    @property
+    def names(self):
+        return self.analyzer.names
+
+    def _thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        if frame.ndim == 3:
+            code = cv2.COLOR_BGRA2GRAY if frame.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+            frame = cv2.cvtColor(frame, code)
+        return cv2.resize(frame, self.thumbnail_size, interpolation=cv2.INTER_AREA)
+
+    def motion(self, thumbnail: np.ndarray) -> float:
+        if self._reference is None or self._reference.shape != thumbnail.shape:
+            return 1.0
+        return float(cv2.absdiff(thumbnail, self._reference).mean()) / 255.0
+
+    def _update_interval(self, motion: float):
+        floor = self.min_interval
+        if self.latency is not None:
+            floor = max(floor, self.latency / self.max_duty)
+        activity = np.clip((motion - self.motion_threshold)
+                           / max(self.high_motion - self.motion_threshold, 1e-9), 0.0, 1.0)
+        self.interval = min(self.max_interval, floor + (self.max_interval - floor) * (1.0 - activity))
+
+    def process(self, frame: np.ndarray, now: Optional[float] = None):
+        """(annotated_frame, detections, decision); skipped frames return the last results"""
+        now = time.monotonic() if now is None else now
+        thumbnail = self._thumbnail(frame)
+        motion = self.motion(thumbnail)
+
+        if self._reference is None:
+            reason = RUN_FIRST
+        elif motion < self.motion_threshold:
+            reason = SKIP_IDLE
+        else:
+            self._update_interval(motion)
+            reason = RUN_MOTION if now - self._last_run >= self.interval else SKIP_RATE
+
+        latency = None
+        if reason in (RUN_FIRST, RUN_MOTION):
+            start = time.perf_counter()
+            self._last_result = self.analyzer.analyze_frame(frame)
+            latency = time.perf_counter() - start
+            # Smooth out one-off slow frames
+            self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+            self._last_run = now
+            # A model that is not loaded yet gives nothing worth reusing
+            if self._last_result[0] is not None:
+                self._reference = thumbnail
+
+        decision = Decision(now, latency is not None, reason, motion, self.interval, latency)
+        self.history.append(decision)
+        logger.debug(f"Inference {reason}: motion {motion:.4f}, interval {self.interval:.2f}s")
+        return self._last_result[0], self._last_result[1], decision
+
+    def analyze_frame(self, frame: np.ndarray):
+        """Analyzer interface for callers that only redraw on fresh results.
+
+        Frames the gate skips give None in place of the annotated frame.
+        """
+        annotated, detections, decision = self.process(frame)
+        return (annotated if decision.ran else None), detections
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Decision counts by reason and the share of frames that ran the model"""
+        reasons = Counter(decision.reason for decision in self.history)
+        runs = reasons[RUN_FIRST] + reasons[RUN_MOTION]
+        return {
+            'frames': len(self.history),
+            'reasons': dict(reasons),
+            'run_ratio': runs / len(self.history) if self.history else 0.0,
+            'interval': self.interval,
+            'latency': self.latency
+        }
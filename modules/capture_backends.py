@@ -0,0 +1,183 @@
+import cv2
+import numpy as np
+from mss import mss
+import logging
+from threading import Lock
+from typing import Any, Dict, List, Optional
+import time
+
+logger = logging.getLogger(__name__)
+
+class CaptureBackend:
+    """Source of BGRA frames with an mss-style monitor list.
+
+    ``monitors[0]`` covers every screen and ``monitors[1:]`` are the
+    individual screens; grab() accepts any of them or an arbitrary
+    left/top/width/height region. With fresh_frames, every grab returns a
+    newly allocated array the caller may keep; otherwise the next grab may
+    overwrite it.
+    """
+    name = 'base'
+    fresh_frames = True
+
+    @property
+    def monitors(self) -> List[Dict[str, int]]:
+        raise NotImplementedError
+
+    def grab(self, region: Dict[str, int]) -> np.ndarray:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+class MSSBackend(CaptureBackend):
+    """Live desktop capture through mss; one instance per thread"""
+    name = 'mss'
+
+    def __init__(self):
+        self.sct = mss()
+
+    @property
+    def monitors(self) -> List[Dict[str, int]]:
+        return self.sct.monitors
+
+    def grab(self, region: Dict[str, int]) -> np.ndarray:
+        screenshot = self.sct.grab(region)
+        raw = np.frombuffer(screenshot.raw, dtype=np.uint8)
+        return raw.reshape(screenshot.height, screenshot.width, 4)
+
+    def close(self):
+        self.sct.close()
+
+def _crop(frame: np.ndarray, region: Dict[str, int]) -> np.ndarray:
+    left, top = region.get('left', 0), region.get('top', 0)
+    return frame[top:top + region['height'], left:left + region['width']]
+
+class VideoFileBackend(CaptureBackend):
+    """Replays a video file as if it were the screen.
+
+    Each grab returns the next frame; with ``realtime`` the frame is picked
+    from the wall clock at the file's frame rate instead. The file restarts
+    when it ends if ``loop`` is set.
+    """
+    name = 'video'
+
+    def __init__(self, path: str, loop: bool = True, realtime: bool = False):
+        self.path = path
+        self.loop = loop
+        self.realtime = realtime
+        self._video = cv2.VideoCapture(path)
+        if not self._video.isOpened():
+            raise ValueError(f"Cannot open video file: {path}")
+        self.fps = self._video.get(cv2.CAP_PROP_FPS) or 30.0
+        width = int(self._video.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(self._video.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self._monitors = [{'left': 0, 'top': 0, 'width': width, 'height': height}] * 2
+        self._frame = np.zeros((height, width, 4), dtype=np.uint8)
+        self._bgr: Optional[np.ndarray] = None
+        self._position = -1
+        self._started = time.monotonic()
+        self._lock = Lock()
+
+    @property
+    def monitors(self) -> List[Dict[str, int]]:
+        return self._monitors
+
+    def _read_next(self) -> bool:
+        ok, frame = self._video.read(self._bgr)
+        if not ok and self.loop:
+            self._video.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self._video.read(self._bgr)
+        if ok:
+            self._bgr = frame
+            self._position += 1
+        return ok
+
+    def _advance(self, target: int):
+        advanced = False
+        while self._position < target and self._read_next():
+            advanced = True
+        if advanced:
+            cv2.cvtColor(self._bgr, cv2.COLOR_BGR2BGRA, dst=self._frame)
+
+    def grab(self, region: Dict[str, int]) -> np.ndarray:
+        with self._lock:
+            if self.realtime:
+                target = int((time.monotonic() - self._started) * self.fps)
+            else:
+                target = self._position + 1
+            self._advance(target)
+            return _crop(self._frame, region).copy()
+
+    def close(self):
+        self._video.release()
+
+class SyntheticBackend(CaptureBackend):
+    """Deterministic generated desktop for headless benchmarks and tests.
+
+    Every grab advances one frame (or follows the clock at ``fps`` with
+    ``realtime``). On each frame ``change_rate`` of the tiles are repainted
+    from a seeded generator, so runs are reproducible.
+    """
+    name = 'synthetic'
+
+    def __init__(self, width: int = 1920, height: int = 1080, fps: float = 30,
+                 change_rate: float = 0.05, tile_size: int = 64, seed: int = 0,
+                 realtime: bool = False, monitors: int = 1):
+        self.fps = fps
+        self.change_rate = change_rate
+        self.tile_size = tile_size
+        self.realtime = realtime
+        self._rng = np.random.default_rng(seed)
+        self._monitors = [{'left': 0, 'top': 0, 'width': width * monitors, 'height': height}]
+        self._monitors += [{'left': i * width, 'top': 0, 'width': width, 'height': height}
+                           for i in range(monitors)]
+        self._frame = self._rng.integers(0, 256, (height, width * monitors, 4), dtype=np.uint8)
+        self._frame[..., 3] = 255
+        self._rows = -(-height // tile_size)
+        self._cols = -(-width * monitors // tile_size)
+        self.frame_index = 0
+        self._started = time.monotonic()
+        self._lock = Lock()
+
+    @property
+    def monitors(self) -> List[Dict[str, int]]:
+        return self._monitors
+
+    def _step(self):
+        tiles = self._rows * self._cols
+        count = int(round(tiles * self.change_rate))
+        if count:
+            for tile in self._rng.choice(tiles, size=count, replace=False):
+                y = (tile // self._cols) * self.tile_size
+                x = (tile % self._cols) * self.tile_size
+                self._frame[y:y + self.tile_size, x:x + self.tile_size, :3] = \
+                    self._rng.integers(0, 256, 3, dtype=np.uint8)
+        self.frame_index += 1
+
+    def grab(self, region: Dict[str, int]) -> np.ndarray:
+        with self._lock:
+            target = int((time.monotonic() - self._started) * self.fps) if self.realtime \
+                else self.frame_index + 1
+            while self.frame_index < target:
+                self._step()
+            return _crop(self._frame, region).copy()
+
+BACKENDS = {
+    MSSBackend.name: MSSBackend,
+    VideoFileBackend.name: VideoFileBackend,
+    SyntheticBackend.name: SyntheticBackend
+}
+
+def create_backend(name: str = 'mss', **options: Any) -> CaptureBackend:
+    try:
+        backend_class = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown capture backend: {name}") from None
+    return backend_class(**options)
@@ -0,0 +1,313 @@
+"""Capture throughput and latency benchmarks.
+
+Times every capture path and colour conversion the application uses at
+several resolutions, measures the memory each call allocates, and writes
+the results as JSON. With --baseline the
+run is compared against stored numbers and exits non-zero on regressions:
+
+    python -m modules.capture_benchmark --backend synthetic \\
+        --baseline performance/capture_baseline.json --output bench.json
+"""
+import cv2
+import numpy as np
+from PIL import Image
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import types
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .capture_backends import CaptureBackend
+from .screen_capture import ScreenCapture
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESOLUTIONS = [(1280, 720), (1920, 1080), (2560, 1440)]
+DEFAULT_TOLERANCE = 0.25
+# Latency differences below this are timer noise, whatever the ratio
+MIN_DELTA_MS = 0.5
+# Interpreter bookkeeping around a call; any real frame copy is far larger
+ALLOC_SLACK_BYTES = 4096
+PROJECT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'alT-Las_Project')
+
+class _FixedRegion(CaptureBackend):
+    """Presents the top-left width x height corner of another backend as monitor 1"""
+    def __init__(self, backend: CaptureBackend, width: int, height: int):
+        screen = backend.monitors[1]
+        if width > screen['width'] or height > screen['height']:
+            raise ValueError(f"{width}x{height} does not fit on a "
+                             f"{screen['width']}x{screen['height']} monitor")
+        self.name = backend.name
+        self._backend = backend
+        region = {'left': screen['left'], 'top': screen['top'], 'width': width, 'height': height}
+        self._monitors = [region, region]
+
+    @property
+    def monitors(self) -> List[Dict[str, int]]:
+        return self._monitors
+
+    def grab(self, region: Dict[str, int]) -> np.ndarray:
+        return self._backend.grab(region)
+
+    def close(self):
+        self._backend.close()
+
+def _image_bytes(image: Image.Image) -> int:
+    # PIL keeps RGB pixels in 32-bit cells
+    return image.width * image.height * (1 if image.mode in ('1', 'L', 'P') else 4)
+
+def allocated_bytes(func: Callable) -> int:
+    """Peak memory allocated during one call to func.
+
+    tracemalloc sees Python and NumPy buffers, which includes OpenCV output.
+    PIL allocates pixels on its own, so a returned PIL image that owns its
+    pixels is added on top.
+    """
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        result = func()
+        allocated = tracemalloc.get_traced_memory()[1] - before
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+    if isinstance(result, Image.Image) and not result.readonly:
+        allocated += _image_bytes(result)
+    return allocated
+
+def _load_screen_control():
+    """alT-Las_Project's screen_control module, or None when it cannot be imported.
+
+    Only its capture path is benchmarked, so pyautogui is stubbed out for
+    the import when it is not installed.
+    """
+    if PROJECT_DIR not in sys.path:
+        sys.path.append(PROJECT_DIR)
+    stubbed = 'pyautogui' not in sys.modules
+    if stubbed:
+        try:
+            import pyautogui  # noqa: F401
+            stubbed = False
+        except ImportError:
+            sys.modules['pyautogui'] = types.ModuleType('pyautogui')
+    try:
+        import screen_control
+        return screen_control
+    except Exception as e:
+        logger.warning(f"screen_control unavailable: {e}")
+        return None
+    finally:
+        if stubbed:
+            sys.modules.pop('pyautogui', None)
+
+def capture_cases(capture: ScreenCapture, monitor: int = 1) -> Dict[str, Callable]:
+    """Capture paths as name -> callable"""
+    region = capture.backend.monitors[monitor]
+    cases = {
+        'grab': lambda: capture.backend.grab(region),
+        'capture': lambda: capture.capture(monitor),
+        'capture_screen': lambda: capture.capture_screen(monitor)
+    }
+    module = _load_screen_control()
+    if module is not None:
+        def screen_control():
+            # The project's own capture_screen, reading from this capture's backend
+            previous = module.capture_backend
+            module.set_capture_backend(capture.backend)
+            try:
+                return module.capture_screen()
+            finally:
+                module.set_capture_backend(previous)
+        cases['screen_control'] = screen_control
+    return cases
+
+def conversion_cases(frame: np.ndarray) -> Dict[str, Callable]:
+    """Colour conversions applied to a captured BGRA frame, as name -> callable"""
+    height, width = frame.shape[:2]
+    bgr = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+    dst = np.empty_like(bgr)
+    return {
+        # Preview window
+        'bgra2rgb_pil': lambda: Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGRA2RGB)),
+        # Vision input
+        'bgra2bgr': lambda: cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR),
+        # Recording ring slots
+        'bgra2bgr_dst': lambda: cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR, dst=dst),
+        # Annotated detections shown in the GUI
+        'bgr2rgb_pil': lambda: Image.fromarray(cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)),
+        'bgrx_frombuffer': lambda: Image.frombuffer('RGB', (width, height), frame, 'raw', 'BGRX', 0, 1)
+    }
+
+def measure(func: Callable, frames: int = 100, warmup: int = 5) -> Dict[str, float]:
+    """Call func back to back and summarize per-call latency"""
+    for _ in range(warmup):
+        func()
+    latencies = np.empty(frames)
+    started = time.perf_counter()
+    for i in range(frames):
+        start = time.perf_counter()
+        func()
+        latencies[i] = time.perf_counter() - start
+    elapsed = time.perf_counter() - started
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    return {
+        'frames': frames,
+        'latency_p50_ms': float(p50),
+        'latency_p95_ms': float(p95),
+        'latency_p99_ms': float(p99),
+        'latency_max_ms': float(latencies.max() * 1000),
+        'achieved_fps': frames / elapsed if elapsed > 0 else 0.0
+    }
+
+def _open_capture(backend: str, backend_options: Dict, width: int, height: int) -> ScreenCapture:
+    if backend == 'synthetic':
+        # Generated frames can be any size, no cropping needed
+        options = dict(backend_options, width=width, height=height)
+        return ScreenCapture(backend=backend, backend_options=options)
+    capture = ScreenCapture(backend=backend, backend_options=backend_options)
+    try:
+        capture.backend = _FixedRegion(capture.backend, width, height)
+    except ValueError:
+        capture.backend.close()
+        raise
+    return capture
+
+def run_benchmarks(resolutions: List[Tuple[int, int]] = None, frames: int = 100,
+                   backend: str = 'synthetic', backend_options: Optional[Dict] = None,
+                   warmup: int = 5) -> Dict[str, Any]:
+    """Benchmark every capture path and conversion at each resolution"""
+    results: Dict[str, Dict[str, Any]] = {}
+    for width, height in resolutions or DEFAULT_RESOLUTIONS:
+        key = f"{width}x{height}"
+        try:
+            capture = _open_capture(backend, backend_options or {}, width, height)
+        except ValueError as e:
+            logger.warning(f"Skipping {key}: {e}")
+            continue
+        try:
+            cases = capture_cases(capture)
+            frame = capture.capture()
+            if frame is None:
+                logger.warning(f"Skipping {key}: capture failed")
+                continue
+            cases.update(conversion_cases(frame.copy()))
+            results[key] = {}
+            for name, func in cases.items():
+                stats = measure(func, frames, warmup)
+                # After warmup, so pooled buffers are already allocated
+                stats['bytes_allocated'] = allocated_bytes(func)
+                results[key][name] = stats
+                logger.info(f"{key} {name}: p50 {stats['latency_p50_ms']:.2f} ms, "
+                            f"{stats['achieved_fps']:.1f} fps")
+        finally:
+            capture.backend.close()
+    return {
+        'backend': backend,
+        'backend_options': backend_options or {},
+        'platform': {
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'system': platform.system(),
+            'opencv': cv2.__version__,
+            'numpy': np.__version__
+        },
+        'timestamp': time.time(),
+        'results': results
+    }
+
+def _slower(stats: Dict[str, float], reference: Dict[str, float], metric: str,
+            tolerance: float) -> bool:
+    limit = max(reference[metric] * (1 + tolerance), reference[metric] + MIN_DELTA_MS)
+    return stats[metric] > limit
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any],
+            tolerance: float = DEFAULT_TOLERANCE) -> List[Dict[str, Any]]:
+    """Regressions of current against baseline.
+
+    Median latency and fps may drift by ``tolerance`` (a fraction) before
+    they count, and latency changes under MIN_DELTA_MS are ignored. Tail
+    percentiles are recorded but too noisy to gate on. Allocated bytes are
+    measured per call, so any growth beyond ALLOC_SLACK_BYTES is reported.
+    """
+    regressions = []
+    for resolution, cases in current['results'].items():
+        for name, stats in cases.items():
+            reference = baseline.get('results', {}).get(resolution, {}).get(name)
+            if reference is None:
+                continue
+            checks = [
+                ('latency_p50_ms', _slower(stats, reference, 'latency_p50_ms', tolerance)),
+                ('achieved_fps', stats['achieved_fps'] < reference['achieved_fps'] * (1 - tolerance)
+                 and _slower(stats, reference, 'latency_p50_ms', 0.0)),
+                ('bytes_allocated', 'bytes_allocated' in reference and
+                 stats['bytes_allocated'] > reference['bytes_allocated'] + ALLOC_SLACK_BYTES)
+            ]
+            for metric, regressed in checks:
+                if regressed:
+                    regressions.append({
+                        'resolution': resolution,
+                        'case': name,
+                        'metric': metric,
+                        'baseline': reference[metric],
+                        'current': stats[metric]
+                    })
+    return regressions
+
+def _parse_resolution(value: str) -> Tuple[int, int]:
+    try:
+        width, height = value.lower().split('x')
+        return int(width), int(height)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected WIDTHxHEIGHT, got {value}") from None
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Capture throughput and latency benchmark')
+    parser.add_argument('--backend', default='synthetic', help='Capture backend (mss, video, synthetic)')
+    parser.add_argument('--video', help='Video file for the video backend')
+    parser.add_argument('--resolutions', type=_parse_resolution, nargs='+',
+                        default=DEFAULT_RESOLUTIONS, help='Resolutions as WIDTHxHEIGHT')
+    parser.add_argument('--frames', type=int, default=100, help='Timed frames per case')
+    parser.add_argument('--warmup', type=int, default=5, help='Untimed frames per case')
+    parser.add_argument('--output', help='Write results JSON to this file')
+    parser.add_argument('--baseline', help='Baseline JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='Allowed latency/fps drift as a fraction')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='Write the results to --baseline instead of comparing')
+    args = parser.parse_args(argv)
+
+    options = {'path': args.video} if args.backend == 'video' else {}
+    report = run_benchmarks(args.resolutions, args.frames, args.backend, options, args.warmup)
+
+    if args.baseline and args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Baseline written to {args.baseline}")
+    elif args.baseline:
+        with open(args.baseline) as f:
+            report['regressions'] = compare(report, json.load(f), args.tolerance)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+    for regression in report.get('regressions', []):
+        logger.error(f"Regression in {regression['resolution']} {regression['case']}: "
+                     f"{regression['metric']} {regression['baseline']:.2f} -> "
+                     f"{regression['current']:.2f}")
+    return 1 if report.get('regressions') else 0
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
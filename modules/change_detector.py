@@ -0,0 +1,88 @@
+import cv2
+import numpy as np
+import logging
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Rect = Tuple[int, int, int, int]  # x, y, width, height
+
+class FrameChanges:
+    """Result of comparing a frame against the previous one"""
+    def __init__(self, dirty_tiles: np.ndarray, dirty_rects: List[Rect], frame_size: Tuple[int, int]):
+        self.dirty_tiles = dirty_tiles
+        self.dirty_rects = dirty_rects
+        self.frame_size = frame_size  # width, height
+
+    @property
+    def unchanged(self) -> bool:
+        return not self.dirty_rects
+
+    @property
+    def changed_ratio(self) -> float:
+        return float(self.dirty_tiles.mean()) if self.dirty_tiles.size else 0.0
+
+    @property
+    def bounding_rect(self) -> Optional[Rect]:
+        """Smallest rectangle covering every dirty tile, for consumers that crop"""
+        if self.unchanged:
+            return None
+        x0 = min(r[0] for r in self.dirty_rects)
+        y0 = min(r[1] for r in self.dirty_rects)
+        x1 = max(r[0] + r[2] for r in self.dirty_rects)
+        y1 = max(r[1] + r[3] for r in self.dirty_rects)
+        return x0, y0, x1 - x0, y1 - y0
+
+class ChangeDetector:
+    """Tile-based damage tracker for captured frames.
+
+    Pixels are compared against the previous frame and reduced per tile,
+    so one vectorized pass yields the dirty tile grid and its rectangles.
+    """
+    def __init__(self, tile_size: int = 64, threshold: int = 0):
+        self.tile_size = tile_size
+        self.threshold = threshold
+        self._previous: Optional[np.ndarray] = None
+
+    def reset(self):
+        self._previous = None
+
+    def update(self, frame: np.ndarray) -> FrameChanges:
+        height, width = frame.shape[:2]
+        rows = np.arange(0, height, self.tile_size)
+        cols = np.arange(0, width, self.tile_size)
+
+        if self._previous is None or self._previous.shape != frame.shape:
+            self._previous = np.empty_like(frame)
+            dirty_tiles = np.ones((len(rows), len(cols)), dtype=bool)
+        else:
+            changed = self._changed_pixels(frame)
+            dirty_tiles = np.logical_or.reduceat(changed, rows, axis=0)
+            dirty_tiles = np.logical_or.reduceat(dirty_tiles, cols, axis=1)
+        np.copyto(self._previous, frame)
+
+        return FrameChanges(dirty_tiles, self._tiles_to_rects(dirty_tiles, width, height), (width, height))
+
+    def _changed_pixels(self, frame: np.ndarray) -> np.ndarray:
+        if self.threshold > 0:
+            diff = cv2.absdiff(frame, self._previous)
+            if diff.ndim == 3:
+                diff = diff.max(axis=2)
+            return diff > self.threshold
+        if frame.ndim == 3 and frame.shape[2] == 4 and frame.flags.c_contiguous:
+            # Compare packed BGRA pixels as single 32-bit words
+            return frame.view(np.uint32)[..., 0] != self._previous.view(np.uint32)[..., 0]
+        changed = frame != self._previous
+        return changed.any(axis=2) if changed.ndim == 3 else changed
+
+    def _tiles_to_rects(self, dirty_tiles: np.ndarray, width: int, height: int) -> List[Rect]:
+        if not dirty_tiles.any():
+            return []
+        count, _, stats, _ = cv2.connectedComponentsWithStats(dirty_tiles.astype(np.uint8), connectivity=4)
+        rects = []
+        for tx, ty, tw, th, _ in stats[1:count]:
+            x, y = int(tx) * self.tile_size, int(ty) * self.tile_size
+            rects.append((x, y,
+                          min(int(tw) * self.tile_size, width - x),
+                          min(int(th) * self.tile_size, height - y)))
+        return rects
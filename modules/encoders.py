@@ -0,0 +1,151 @@
+import cv2
+import numpy as np
+import logging
+import shutil
+import subprocess
+import time
+from collections import deque
+from threading import Thread
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+ENCODER_OPENCV = 'opencv'
+ENCODER_FFMPEG = 'ffmpeg'
+
+# OpenCV fourcc codes mapped to ffmpeg encoders
+FFMPEG_CODECS = {
+    'h264': 'libx264',
+    'avc1': 'libx264',
+    'x264': 'libx264',
+    'hevc': 'libx265',
+    'h265': 'libx265',
+    'mp4v': 'mpeg4',
+    'mjpg': 'mjpeg',
+    'vp80': 'libvpx',
+    'vp90': 'libvpx-vp9'
+}
+
+class FFmpegWriter:
+    """cv2.VideoWriter-compatible writer that pipes raw BGR frames to an ffmpeg process.
+
+    Encoding happens outside the interpreter, so it no longer competes with
+    capture and inference for the GIL. Time spent blocked on the pipe is
+    tracked as backpressure. ffmpeg's log output is drained on a thread into
+    a bounded buffer, so a chatty encoder can never fill its stderr pipe and
+    stall the writes.
+    """
+    def __init__(self, output_path: str, codec: str, fps: float, size, quality: int = 23,
+                 ffmpeg_path: Optional[str] = None, window: int = 120, log_lines: int = 50):
+        self.output_path = output_path
+        self.size = tuple(size)
+        self.frames_written = 0
+        self.blocked_time = 0.0
+        self._writes = deque(maxlen=window)  # seconds each of the last writes blocked
+        self._interval = 1.0 / fps
+        self._process = subprocess.Popen(
+            self.build_command(ffmpeg_path or shutil.which('ffmpeg') or 'ffmpeg',
+                               output_path, codec, fps, self.size, quality),
+            stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+        )
+        self._log = deque(maxlen=log_lines)
+        self._log_thread = Thread(target=self._drain_stderr, name='ffmpeg-log', daemon=True)
+        self._log_thread.start()
+
+    @staticmethod
+    def build_command(ffmpeg: str, output_path: str, codec: str, fps: float, size,
+                      quality: int) -> List[str]:
+        encoder = FFMPEG_CODECS.get(codec.lower(), codec)
+        if encoder in ('libx264', 'libx265'):
+            quality_args = ['-crf', str(quality), '-preset', 'veryfast']
+        elif encoder in ('libvpx', 'libvpx-vp9'):
+            quality_args = ['-crf', str(quality), '-b:v', '0']
+        else:
+            # Map the CRF-style 0-51 scale onto ffmpeg's 1-31 qscale
+            quality_args = ['-q:v', str(max(1, min(31, round(1 + quality * 30 / 51))))]
+        # yuv420p subsamples chroma 2x2, so odd sizes get one pixel of padding
+        pad_args = ['-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2'] if size[0] % 2 or size[1] % 2 else []
+        return [ffmpeg, '-hide_banner', '-loglevel', 'error', '-y',
+                '-f', 'rawvideo', '-pix_fmt', 'bgr24',
+                '-s', f"{size[0]}x{size[1]}", '-r', str(fps), '-i', '-',
+                *pad_args, '-c:v', encoder, *quality_args, '-pix_fmt', 'yuv420p', output_path]
+
+    def isOpened(self) -> bool:
+        return self._process.poll() is None and self._process.stdin is not None
+
+    def write(self, frame: np.ndarray):
+        if frame.shape[1::-1] != self.size:
+            raise ValueError(f"Frame size {frame.shape[1::-1]} does not match {self.size}")
+        start = time.perf_counter()
+        try:
+            self._process.stdin.write(np.ascontiguousarray(frame).data)
+        except (BrokenPipeError, ValueError) as e:
+            raise RuntimeError(f"ffmpeg encoder exited: {self._stderr()}") from e
+        elapsed = time.perf_counter() - start
+        self.blocked_time += elapsed
+        self._writes.append(elapsed)
+        self.frames_written += 1
+
+    @property
+    def backpressure(self) -> float:
+        """Fraction of the frame budget recently spent blocked on the encoder pipe"""
+        if not self._writes:
+            return 0.0
+        return min(1.0, sum(self._writes) / (len(self._writes) * self._interval))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'frames_written': self.frames_written,
+            'blocked_time': self.blocked_time,
+            'backpressure': self.backpressure
+        }
+
+    def _drain_stderr(self):
+        try:
+            for line in iter(self._process.stderr.readline, b''):
+                self._log.append(line.decode(errors='replace').rstrip())
+        except (OSError, ValueError):
+            pass
+
+    def _stderr(self) -> str:
+        """The last lines ffmpeg logged; only complete once the process has exited"""
+        self._log_thread.join(timeout=1)
+        return '\n'.join(self._log)
+
+    def release(self):
+        if self._process.stdin and not self._process.stdin.closed:
+            try:
+                self._process.stdin.close()
+            except BrokenPipeError:
+                pass
+        if self._process.wait() != 0:
+            logger.error(f"ffmpeg exited with code {self._process.returncode}: {self._stderr()}")
+
+def ffmpeg_available(ffmpeg_path: Optional[str] = None) -> bool:
+    return shutil.which(ffmpeg_path or 'ffmpeg') is not None
+
+def create_video_writer(output_path: str, fps: float, quality: int, codec: str, width: int,
+                        height: int, encoder: str = ENCODER_OPENCV,
+                        ffmpeg_path: Optional[str] = None):
+    """Open a video writer on the requested backend, falling back to OpenCV"""
+    if encoder == ENCODER_FFMPEG:
+        if ffmpeg_available(ffmpeg_path):
+            try:
+                return FFmpegWriter(output_path, codec, fps, (width, height), quality, ffmpeg_path)
+            except OSError as e:
+                logger.warning(f"Failed to start ffmpeg, falling back to OpenCV: {e}")
+        else:
+            logger.warning("ffmpeg not found, falling back to OpenCV encoder")
+    elif encoder != ENCODER_OPENCV:
+        raise ValueError(f"Unknown encoder backend: {encoder}")
+
+    # Use GPU acceleration if available
+    if cv2.cuda.getCudaEnabledDeviceCount() > 0:
+        return cv2.cudacodec.createVideoWriter(
+            output_path, cv2.VideoWriter_fourcc(*codec), fps,
+            (width, height), quality
+        )
+    return cv2.VideoWriter(
+        output_path, cv2.VideoWriter_fourcc(*codec), fps,
+        (width, height)
+    )
@@ -0,0 +1,98 @@
+import numpy as np
+from collections import deque
+from threading import Lock, Condition
+from typing import List, Optional, Tuple
+
+class FrameBufferPool:
+    """Ring of preallocated frame buffers that captures are written into"""
+    def __init__(self, size: int = 4, dtype=np.uint8):
+        self._size = max(1, size)
+        self._dtype = dtype
+        self._shape: Optional[Tuple[int, ...]] = None
+        self._buffers: List[np.ndarray] = []
+        self._index = 0
+        self._lock = Lock()
+
+    @property
+    def shape(self) -> Optional[Tuple[int, ...]]:
+        return self._shape
+
+    def acquire(self, shape: Tuple[int, ...]) -> np.ndarray:
+        """Return the next writable buffer, reallocating the pool if the frame size changed"""
+        with self._lock:
+            if shape != self._shape:
+                self._buffers = [np.empty(shape, dtype=self._dtype) for _ in range(self._size)]
+                self._shape = shape
+                self._index = 0
+            buffer = self._buffers[self._index]
+            self._index = (self._index + 1) % self._size
+            return buffer
+
+    @staticmethod
+    def readonly(buffer: np.ndarray) -> np.ndarray:
+        view = buffer.view()
+        view.flags.writeable = False
+        return view
+
+DROP_OLDEST = 'drop_oldest'
+DROP_NEWEST = 'drop_newest'
+
+class FrameRing:
+    """Bounded single-producer/single-consumer ring of preallocated frames.
+
+    The producer acquires a free slot, fills it in place and commits it; the
+    consumer pops committed slots in order and releases them once done. When
+    every slot is taken the drop policy decides which frame is lost.
+    """
+    def __init__(self, capacity: int, shape: Tuple[int, ...], drop_policy: str = DROP_OLDEST,
+                 dtype=np.uint8):
+        if drop_policy not in (DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+        self.drop_policy = drop_policy
+        self.buffers = [np.empty(shape, dtype=dtype) for _ in range(max(1, capacity))]
+        self._free = deque(range(len(self.buffers)))
+        self._ready: deque = deque()
+        self._cond = Condition()
+        self.closed = False
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._ready)
+
+    def acquire(self) -> Optional[Tuple[int, np.ndarray]]:
+        """Claim a slot to write into, or None if the frame has to be dropped"""
+        with self._cond:
+            if self._free:
+                index = self._free.popleft()
+            elif self.drop_policy == DROP_OLDEST and self._ready:
+                index, _ = self._ready.popleft()
+                self.dropped += 1
+            else:
+                self.dropped += 1
+                return None
+        return index, self.buffers[index]
+
+    def commit(self, index: int, timestamp: float):
+        with self._cond:
+            self._ready.append((index, timestamp))
+            self._cond.notify()
+
+    def pop(self, timeout: Optional[float] = None) -> Optional[Tuple[int, np.ndarray, float]]:
+        """Next committed frame in order; None on timeout or once closed and drained"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._ready or self.closed, timeout):
+                return None
+            if not self._ready:
+                return None
+            index, timestamp = self._ready.popleft()
+        return index, self.buffers[index], timestamp
+
+    def release(self, index: int):
+        with self._cond:
+            self._free.append(index)
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
@@ -0,0 +1,223 @@
+import numpy as np
+import logging
+from multiprocessing import shared_memory
+from threading import Thread, Event
+from typing import List, Optional, Tuple
+import time
+
+from .frame_pacing import TickScheduler
+from .pyramid import FramePyramid
+
+logger = logging.getLogger(__name__)
+
+BUS_MAGIC = 0x414C5442  # "ALTB"
+HEADER_FIELDS = 8  # magic, slots, height, width, channels, latest sequence, reserved
+HEADER_BYTES = HEADER_FIELDS * 8
+SLOT_DTYPE = np.dtype([('seq', '<i8'), ('timestamp', '<f8')])
+
+def _frames_offset(slots: int) -> int:
+    # Keep frame data 64-byte aligned
+    offset = HEADER_BYTES + slots * SLOT_DTYPE.itemsize
+    return (offset + 63) // 64 * 64
+
+class _BusLayout:
+    """Numpy views over the shared memory block shared by publisher and subscribers"""
+    def __init__(self, shm: shared_memory.SharedMemory, slots: int, shape: Tuple[int, int, int]):
+        self.shm = shm
+        self.slots = slots
+        self.shape = shape
+        self.header = np.ndarray((HEADER_FIELDS,), dtype='<i8', buffer=shm.buf)
+        self.meta = np.ndarray((slots,), dtype=SLOT_DTYPE, buffer=shm.buf, offset=HEADER_BYTES)
+        self.frames = np.ndarray((slots,) + shape, dtype=np.uint8, buffer=shm.buf,
+                                 offset=_frames_offset(slots))
+
+    @staticmethod
+    def size(slots: int, shape: Tuple[int, int, int]) -> int:
+        return _frames_offset(slots) + slots * int(np.prod(shape))
+
+    def release(self):
+        # Views must go before the mapping can be closed
+        del self.header, self.meta, self.frames
+        try:
+            self.shm.close()
+        except BufferError:
+            # A caller still holds a zero-copy frame; the mapping goes with it
+            logger.debug(f"Frame bus {self.shm.name} still referenced, leaving mapping open")
+
+class FrameBus:
+    """Single-writer frame ring in shared memory.
+
+    Each published frame gets a sequence number. A slot's sequence is
+    cleared while it is being rewritten, so readers can tell a torn frame
+    from a complete one without taking a lock.
+    """
+    def __init__(self, shape: Tuple[int, int, int], slots: int = 4, name: Optional[str] = None):
+        self.shape = tuple(shape)
+        self.slots = slots
+        shm = shared_memory.SharedMemory(name=name, create=True, size=_BusLayout.size(slots, self.shape))
+        self._layout = _BusLayout(shm, slots, self.shape)
+        self._layout.header[:] = 0
+        self._layout.header[:5] = (BUS_MAGIC, slots) + self.shape
+        self._layout.meta['seq'] = 0
+        self.sequence = 0
+
+    @property
+    def name(self) -> str:
+        return self._layout.shm.name
+
+    def publish(self, frame: np.ndarray, timestamp: Optional[float] = None) -> int:
+        if frame.shape != self.shape:
+            raise ValueError(f"Frame shape {frame.shape} does not match bus shape {self.shape}")
+        seq = self.sequence + 1
+        index = seq % self.slots
+        meta = self._layout.meta
+        meta['seq'][index] = 0
+        np.copyto(self._layout.frames[index], frame)
+        meta['timestamp'][index] = time.monotonic() if timestamp is None else timestamp
+        meta['seq'][index] = seq
+        self._layout.header[5] = seq
+        self.sequence = seq
+        return seq
+
+    def close(self):
+        shm = self._layout.shm
+        self._layout.release()
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+class FrameBusSubscriber:
+    """Reads the newest frame from a FrameBus, in this or another process"""
+    def __init__(self, name: str):
+        shm = _attach(name)
+        header = np.ndarray((HEADER_FIELDS,), dtype='<i8', buffer=shm.buf)
+        if header[0] != BUS_MAGIC:
+            shm.close()
+            raise ValueError(f"Shared memory block {name} is not a frame bus")
+        slots, shape = int(header[1]), tuple(int(v) for v in header[2:5])
+        del header
+        self._layout = _BusLayout(shm, slots, shape)
+        self.name = name
+        self.shape = shape
+        self.last_seq = 0
+        self.missed = 0
+
+    def latest(self, copy: bool = False) -> Tuple[int, float, Optional[np.ndarray]]:
+        """Newest complete frame as (sequence, timestamp, frame).
+
+        Without ``copy`` the frame is a read-only view into shared memory that
+        stays valid until the publisher wraps around the ring. Nothing is read
+        from it here, so callers must check is_current() after reading the
+        pixels and drop the frame if that fails. Frames skipped since the
+        previous call are added to ``missed``.
+        """
+        layout = self._layout
+        while True:
+            seq = int(layout.header[5])
+            if seq == 0:
+                return 0, 0.0, None
+            index = seq % layout.slots
+            timestamp = float(layout.meta['timestamp'][index])
+            if copy:
+                frame = layout.frames[index].copy()
+                # Retry if the slot was rewritten while it was being copied
+                if int(layout.meta['seq'][index]) == seq:
+                    break
+            elif int(layout.meta['seq'][index]) == seq:
+                # Complete right now; is_current() tells whether it still is after use
+                frame = layout.frames[index].view()
+                break
+        frame.flags.writeable = copy
+        if self.last_seq and seq > self.last_seq + 1:
+            self.missed += seq - self.last_seq - 1
+        self.last_seq = max(self.last_seq, seq)
+        return seq, timestamp, frame
+
+    def is_current(self, seq: int) -> bool:
+        """True while the slot holding frame ``seq`` has not been reused"""
+        return int(self._layout.meta['seq'][seq % self._layout.slots]) == seq
+
+    def close(self):
+        self._layout.release()
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 registers attached blocks with the resource tracker,
+        # which would unlink the publisher's memory when this process exits
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        except Exception:
+            pass
+        return shm
+
+class FramePublisher:
+    """Captures the screen once per tick and publishes it on a FrameBus.
+
+    With pyramid_levels > 1 each downscaled level is built once here and
+    published on its own bus, so low-resolution consumers never touch the
+    full frame.
+    """
+    def __init__(self, capture_factory, fps: float = 30, monitor: int = 1, slots: int = 4,
+                 pyramid_levels: int = 1):
+        self._capture_factory = capture_factory
+        self.monitor = monitor
+        self.slots = slots
+        self.pacer = TickScheduler(fps, name='frame-bus')
+        self.pyramid = FramePyramid(pyramid_levels)
+        self.buses: List[FrameBus] = []
+        self._ready = Event()
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+
+    def start(self, timeout: float = 5.0) -> bool:
+        self._stop.clear()
+        self._ready.clear()
+        self._thread = Thread(target=self._run, name='frame-bus', daemon=True)
+        self._thread.start()
+        return self._ready.wait(timeout) and self.bus is not None
+
+    @property
+    def bus(self) -> Optional[FrameBus]:
+        """The full-resolution bus"""
+        return self.buses[0] if self.buses else None
+
+    def level_for(self, max_width: int, max_height: int) -> int:
+        if not self.buses:
+            return 0
+        return FramePyramid.select_level([bus.shape for bus in self.buses], max_width, max_height)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        try:
+            capture = self._capture_factory()
+            while self.pacer.wait(self._stop):
+                frame = capture.capture(self.monitor)
+                if frame is None:
+                    continue
+                if not self.buses:
+                    self.buses = [FrameBus(shape, self.slots) for shape in
+                                  FramePyramid.level_shapes(frame.shape, self.pyramid.levels)]
+                    self._ready.set()
+                if frame.shape != self.bus.shape:
+                    logger.warning(f"Frame size changed to {frame.shape}, skipping frame")
+                    continue
+                timestamp = time.monotonic()
+                for bus, level in zip(self.buses, self.pyramid.update(frame)):
+                    bus.publish(level, timestamp)
+        except Exception as e:
+            logger.error(f"Frame bus error: {e}")
+        finally:
+            self._ready.set()
+            buses, self.buses = self.buses, []
+            for bus in buses:
+                bus.close()
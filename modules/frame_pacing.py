@@ -0,0 +1,87 @@
+import numpy as np
+import logging
+from collections import deque
+from threading import Event
+from typing import Any, Dict, Optional
+import time
+
+logger = logging.getLogger(__name__)
+
+# Upper bin edges of the lateness histogram in milliseconds
+LATENESS_BINS_MS = (0.5, 1, 2, 4, 8, 16, 33, 66, 133, float('inf'))
+
+class TickScheduler:
+    """Paces a loop against absolute deadlines on the monotonic clock.
+
+    Each wait() sleeps until the next deadline and records how late the
+    loop woke up. Ticks that were missed entirely are skipped rather than
+    run back to back, so a stall never turns into a burst.
+    """
+    def __init__(self, fps: float, name: str = '', window: int = 1000):
+        if fps <= 0:
+            raise ValueError(f"Invalid tick rate: {fps}")
+        self.interval = 1.0 / fps
+        self.name = name
+        self._deadline: Optional[float] = None
+        self._started: Optional[float] = None
+        self._recent = deque(maxlen=window)
+        self.histogram = [0] * len(LATENESS_BINS_MS)
+        self.ticks = 0
+        self.skipped = 0
+
+    def reset(self):
+        self._deadline = None
+        self._started = None
+        self._recent.clear()
+        self.histogram = [0] * len(LATENESS_BINS_MS)
+        self.ticks = 0
+        self.skipped = 0
+
+    def wait(self, stop_event: Optional[Event] = None) -> bool:
+        """Block until the next tick; returns False if stop_event was set meanwhile"""
+        now = time.monotonic()
+        if self._deadline is None:
+            self._deadline = self._started = now
+        elif self._deadline > now:
+            if stop_event is not None:
+                if stop_event.wait(self._deadline - now):
+                    return False
+            else:
+                time.sleep(self._deadline - now)
+            now = time.monotonic()
+
+        self._record(now - self._deadline)
+        missed = int((now - self._deadline) // self.interval)
+        self.skipped += missed
+        self._deadline += (missed + 1) * self.interval
+        return stop_event is None or not stop_event.is_set()
+
+    def _record(self, lateness: float):
+        self.ticks += 1
+        self._recent.append(lateness)
+        lateness_ms = lateness * 1000
+        for i, edge in enumerate(LATENESS_BINS_MS):
+            if lateness_ms <= edge:
+                self.histogram[i] += 1
+                break
+
+    @property
+    def achieved_fps(self) -> float:
+        if self._started is None or self.ticks < 2:
+            return 0.0
+        elapsed = time.monotonic() - self._started
+        return (self.ticks - 1) / elapsed if elapsed > 0 else 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        recent_ms = np.array(self._recent) * 1000 if self._recent else np.zeros(1)
+        return {
+            'name': self.name,
+            'target_fps': 1.0 / self.interval,
+            'achieved_fps': self.achieved_fps,
+            'ticks': self.ticks,
+            'skipped': self.skipped,
+            'lateness_p50_ms': float(np.percentile(recent_ms, 50)),
+            'lateness_p95_ms': float(np.percentile(recent_ms, 95)),
+            'lateness_max_ms': float(recent_ms.max()),
+            'histogram_ms': dict(zip(LATENESS_BINS_MS, self.histogram))
+        }
@@ -0,0 +1,145 @@
+import numpy as np
+import logging
+from collections import deque
+from threading import Thread, Lock, Event
+from typing import Callable, Dict, List, Optional, Tuple
+import time
+
+from .capture_backends import CaptureBackend, MSSBackend
+from .frame_buffer import FrameBufferPool
+from .frame_pacing import TickScheduler
+
+logger = logging.getLogger(__name__)
+
+class LatestFrameSlot:
+    """Most recent frames published by one monitor worker, newest last"""
+    def __init__(self, history: int = 8):
+        self._frames = deque(maxlen=history)
+        self._lock = Lock()
+        self.sequence = 0
+
+    def publish(self, frame: np.ndarray, timestamp: float):
+        with self._lock:
+            self.sequence += 1
+            self._frames.append((frame, timestamp, self.sequence))
+
+    def latest(self) -> Tuple[Optional[np.ndarray], float, int]:
+        with self._lock:
+            if not self._frames:
+                return None, 0.0, 0
+            return self._frames[-1]
+
+    def nearest(self, timestamp: float) -> Tuple[Optional[np.ndarray], float, int]:
+        with self._lock:
+            if not self._frames:
+                return None, 0.0, 0
+            return min(self._frames, key=lambda item: abs(item[1] - timestamp))
+
+class MonitorSnapshot:
+    """Frames from every monitor chosen as close as possible to one point in time"""
+    def __init__(self, target: float, frames: Dict[int, np.ndarray], timestamps: Dict[int, float]):
+        self.target = target
+        self.frames = frames
+        self.timestamps = timestamps
+
+    @property
+    def skew(self) -> float:
+        """Spread between the oldest and newest frame in the snapshot, in seconds"""
+        if not self.timestamps:
+            return 0.0
+        return max(self.timestamps.values()) - min(self.timestamps.values())
+
+class MonitorWorker:
+    """Captures a single monitor on its own thread"""
+    def __init__(self, monitor: int, fps: float, history: int = 8,
+                 backend_factory: Callable[[], CaptureBackend] = MSSBackend):
+        self.monitor = monitor
+        self._backend_factory = backend_factory
+        self.pacer = TickScheduler(fps, name=f"monitor-{monitor}")
+        self.slot = LatestFrameSlot(history)
+        # One spare buffer so the frame being written never aliases published history
+        self._buffer_pool = FrameBufferPool(history + 1)
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+        self.frame_count = 0
+
+    def start(self):
+        self._stop.clear()
+        self._thread = Thread(target=self._run, name=f"monitor-{self.monitor}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def publish(self, raw: np.ndarray, timestamp: float):
+        buffer = self._buffer_pool.acquire(raw.shape)
+        np.copyto(buffer, raw)
+        self.slot.publish(FrameBufferPool.readonly(buffer), timestamp)
+        self.frame_count += 1
+
+    def _run(self):
+        try:
+            with self._backend_factory() as backend:
+                region = backend.monitors[self.monitor]
+                while self.pacer.wait(self._stop):
+                    timestamp = time.monotonic()
+                    self.publish(backend.grab(region), timestamp)
+        except Exception as e:
+            logger.error(f"Monitor {self.monitor} capture error: {e}")
+
+class MultiMonitorCapture:
+    """One capture worker per monitor, each publishing into its own latest-frame slot"""
+    def __init__(self, fps: float = 30, history: int = 8,
+                 backend_factory: Callable[[], CaptureBackend] = MSSBackend):
+        self.fps = fps
+        self.history = history
+        self._backend_factory = backend_factory
+        self.workers: Dict[int, MonitorWorker] = {}
+
+    @property
+    def running(self) -> bool:
+        return bool(self.workers)
+
+    def start(self, monitors: Optional[List[int]] = None):
+        if self.running:
+            return
+        if monitors is None:
+            with self._backend_factory() as backend:
+                monitors = list(range(1, len(backend.monitors)))
+        for monitor in monitors:
+            worker = MonitorWorker(monitor, self.fps, self.history, self._backend_factory)
+            self.workers[monitor] = worker
+            worker.start()
+        logger.info(f"Started capture workers for monitors {monitors}")
+
+    def stop(self):
+        for worker in self.workers.values():
+            worker.stop()
+        self.workers = {}
+
+    def latest(self, monitor: int) -> Tuple[Optional[np.ndarray], float]:
+        worker = self.workers.get(monitor)
+        if worker is None:
+            return None, 0.0
+        frame, timestamp, _ = worker.slot.latest()
+        return frame, timestamp
+
+    def snapshot(self, at: Optional[float] = None) -> MonitorSnapshot:
+        """Frames from all monitors nearest to monotonic time ``at``.
+
+        Defaults to the newest time every monitor has already published,
+        so no worker is still racing to catch up.
+        """
+        if at is None:
+            latest = [w.slot.latest()[1] for w in self.workers.values()]
+            at = min(latest) if latest else time.monotonic()
+        frames, timestamps = {}, {}
+        for monitor, worker in self.workers.items():
+            frame, timestamp, _ = worker.slot.nearest(at)
+            if frame is not None:
+                frames[monitor] = frame
+                timestamps[monitor] = timestamp
+        return MonitorSnapshot(at, frames, timestamps)
@@ -0,0 +1,61 @@
+import cv2
+import numpy as np
+import logging
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+def fit_size(width: int, height: int, max_width: int, max_height: int) -> Tuple[int, int]:
+    """Size of a width x height image scaled down to fit in max_width x max_height"""
+    scale = min(max_width / width, max_height / height, 1.0)
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+class FramePyramid:
+    """Downscaled copies of a frame, each level half the size of the one above.
+
+    Levels are built in a cascade with area interpolation into buffers that
+    are reused across frames, so every consumer can pick the smallest level
+    that still covers the size it needs instead of resizing the full frame.
+    """
+    def __init__(self, levels: int = 3):
+        self.levels = max(1, levels)
+        self._buffers: List[np.ndarray] = []
+        self._source_shape: Optional[Tuple[int, ...]] = None
+
+    @staticmethod
+    def level_shapes(shape: Tuple[int, ...], levels: int) -> List[Tuple[int, ...]]:
+        shapes = [tuple(shape)]
+        for _ in range(1, levels):
+            height, width = shapes[-1][:2]
+            shapes.append((max(1, height // 2), max(1, width // 2)) + tuple(shape[2:]))
+        return shapes
+
+    @property
+    def shapes(self) -> List[Tuple[int, ...]]:
+        if self._source_shape is None:
+            return []
+        return self.level_shapes(self._source_shape, self.levels)
+
+    def update(self, frame: np.ndarray) -> List[np.ndarray]:
+        """Build all levels for a frame; level 0 is the frame itself"""
+        if frame.shape != self._source_shape:
+            self._source_shape = frame.shape
+            self._buffers = [np.empty(shape, dtype=frame.dtype)
+                             for shape in self.level_shapes(frame.shape, self.levels)[1:]]
+        levels = [frame]
+        for buffer in self._buffers:
+            cv2.resize(levels[-1], (buffer.shape[1], buffer.shape[0]), dst=buffer,
+                       interpolation=cv2.INTER_AREA)
+            levels.append(buffer)
+        return levels
+
+    @staticmethod
+    def select_level(shapes: List[Tuple[int, ...]], max_width: int, max_height: int) -> int:
+        """Index of the smallest level still at least as large as the fitted target size"""
+        height, width = shapes[0][:2]
+        target_width, target_height = fit_size(width, height, max_width, max_height)
+        best = 0
+        for index, shape in enumerate(shapes):
+            if shape[1] >= target_width and shape[0] >= target_height:
+                best = index
+        return best
@@ -0,0 +1,159 @@
+import numpy as np
+import logging
+from threading import Thread, Lock, Event
+from typing import Callable, Dict, List, Optional, Tuple
+import itertools
+import time
+
+from .capture_backends import CaptureBackend, MSSBackend
+
+logger = logging.getLogger(__name__)
+
+Rect = Tuple[int, int, int, int]  # left, top, width, height
+
+def _overlaps(a: Rect, b: Rect) -> bool:
+    return (a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and
+            a[1] < b[1] + b[3] and b[1] < a[1] + a[3])
+
+def _union(a: Rect, b: Rect) -> Rect:
+    left, top = min(a[0], b[0]), min(a[1], b[1])
+    right = max(a[0] + a[2], b[0] + b[2])
+    bottom = max(a[1] + a[3], b[1] + b[3])
+    return left, top, right - left, bottom - top
+
+def merge_rects(rects: List[Rect]) -> List[Rect]:
+    """Merge overlapping rectangles until no two of the results overlap"""
+    merged = list(rects)
+    changed = True
+    while changed:
+        changed = False
+        result: List[Rect] = []
+        for rect in merged:
+            for i, other in enumerate(result):
+                if _overlaps(rect, other):
+                    result[i] = _union(rect, other)
+                    changed = True
+                    break
+            else:
+                result.append(rect)
+        merged = result
+    return merged
+
+class CaptureRegion:
+    def __init__(self, region_id: int, rect: Rect, fps: float,
+                 callback: Optional[Callable[[int, np.ndarray, float], None]] = None):
+        self.region_id = region_id
+        self.rect = rect
+        self.interval = 1.0 / fps
+        self.callback = callback
+        self.next_due = 0.0
+        self.frame: Optional[np.ndarray] = None
+        self.timestamp = 0.0
+
+class RegionScheduler:
+    """Captures registered screen regions at their own rates.
+
+    Regions due on the same tick are merged so overlapping subscriptions
+    share a single grab.
+    """
+    def __init__(self, backend_factory: Callable[[], CaptureBackend] = MSSBackend):
+        self._backend_factory = backend_factory
+        self._regions: Dict[int, CaptureRegion] = {}
+        self._ids = itertools.count(1)
+        self._lock = Lock()
+        self._stop = Event()
+        self._thread: Optional[Thread] = None
+        self.grab_count = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def add_region(self, rect: Rect, fps: float = 30,
+                   callback: Optional[Callable[[int, np.ndarray, float], None]] = None) -> int:
+        if fps <= 0 or rect[2] <= 0 or rect[3] <= 0:
+            raise ValueError(f"Invalid capture region {rect} at {fps} fps")
+        with self._lock:
+            region = CaptureRegion(next(self._ids), tuple(int(v) for v in rect), fps, callback)
+            self._regions[region.region_id] = region
+            return region.region_id
+
+    def remove_region(self, region_id: int) -> bool:
+        with self._lock:
+            return self._regions.pop(region_id, None) is not None
+
+    def latest(self, region_id: int) -> Tuple[Optional[np.ndarray], float]:
+        with self._lock:
+            region = self._regions.get(region_id)
+            if region is None:
+                return None, 0.0
+            return region.frame, region.timestamp
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def due_regions(self, now: float) -> List[CaptureRegion]:
+        with self._lock:
+            return [r for r in self._regions.values() if r.next_due <= now]
+
+    def tick(self, grab: Callable[[Rect], np.ndarray], now: float) -> int:
+        """Capture every due region with the minimum number of grabs; returns the grab count"""
+        due = self.due_regions(now)
+        if not due:
+            return 0
+        grabs = merge_rects([r.rect for r in due])
+        for rect in grabs:
+            pixels = grab(rect)
+            pixels.flags.writeable = False
+            timestamp = time.monotonic()
+            for region in due:
+                if not _overlaps(region.rect, rect):
+                    continue
+                x, y = region.rect[0] - rect[0], region.rect[1] - rect[1]
+                frame = pixels[y:y + region.rect[3], x:x + region.rect[2]]
+                with self._lock:
+                    region.frame, region.timestamp = frame, timestamp
+                if region.callback:
+                    try:
+                        region.callback(region.region_id, frame, timestamp)
+                    except Exception as e:
+                        logger.error(f"Region callback error: {e}")
+        for region in due:
+            region.next_due += region.interval
+            if region.next_due <= now:
+                # Skip ticks we fell behind on instead of bursting to catch up
+                region.next_due = now + region.interval
+        self.grab_count += len(grabs)
+        return len(grabs)
+
+    def _next_deadline(self) -> Optional[float]:
+        with self._lock:
+            if not self._regions:
+                return None
+            return min(r.next_due for r in self._regions.values())
+
+    def _run(self):
+        try:
+            with self._backend_factory() as backend:
+                def grab(rect: Rect) -> np.ndarray:
+                    return backend.grab({'left': rect[0], 'top': rect[1], 'width': rect[2], 'height': rect[3]})
+
+                while not self._stop.is_set():
+                    deadline = self._next_deadline()
+                    now = time.monotonic()
+                    if deadline is None or deadline > now:
+                        self._stop.wait(0.05 if deadline is None else deadline - now)
+                        continue
+                    self.tick(grab, now)
+        except Exception as e:
+            logger.error(f"Region capture error: {e}")
@@ -0,0 +1,126 @@
+import cv2
+import numpy as np
+import logging
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from typing import List, Optional, Tuple
+
+from .change_detector import ChangeDetector
+
+logger = logging.getLogger(__name__)
+
+class ReplayBuffer:
+    """Rolling window of the last few seconds of frames, JPEG-compressed in memory.
+
+    Frames older than ``seconds`` or beyond ``max_bytes`` are evicted.
+    Unchanged frames reuse the previous encoding, so an idle desktop costs
+    almost nothing to keep.
+    """
+    def __init__(self, seconds: float = 10, max_bytes: int = 256 * 1024**2, quality: int = 80):
+        self.seconds = seconds
+        self.max_bytes = max_bytes
+        self.quality = quality
+        self._frames: deque = deque()  # (timestamp, jpeg bytes, counted size)
+        self._bytes = 0
+        self._lock = Lock()
+        self._detector = ChangeDetector()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def memory_usage(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._frames)
+
+    def add(self, frame: np.ndarray, timestamp: float):
+        changes = self._detector.update(frame)
+        with self._lock:
+            previous = self._frames[-1][1] if self._frames else None
+        if changes.unchanged and previous is not None:
+            data, size = previous, 0
+        else:
+            if frame.ndim == 3 and frame.shape[2] == 4:
+                frame = cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+            ok, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+            if not ok:
+                logger.error("Replay frame encoding failed")
+                return
+            data = encoded.tobytes()
+            size = len(data)
+
+        with self._lock:
+            self._frames.append((timestamp, data, size))
+            self._bytes += size
+            self._evict(timestamp)
+
+    def _evict(self, now: float):
+        while self._frames and (self._frames[0][0] < now - self.seconds or
+                                (self._bytes > self.max_bytes and len(self._frames) > 1)):
+            _, data, size = self._frames.popleft()
+            self._bytes -= size
+            if self._frames and size and self._frames[0][2] == 0 and self._frames[0][1] is data:
+                # The next entry shared this encoding; it now owns the bytes
+                timestamp, data, _ = self._frames.popleft()
+                self._frames.appendleft((timestamp, data, size))
+                self._bytes += size
+
+    def snapshot(self) -> List[Tuple[float, bytes]]:
+        with self._lock:
+            return [(timestamp, data) for timestamp, data, _ in self._frames]
+
+    def save(self, output_path: str, fps: float = 30, codec: str = 'h264') -> Future:
+        """Write the current window to a video file on a background thread"""
+        frames = self.snapshot()
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='replay-writer')
+            return self._executor.submit(self._write, frames, output_path, fps, codec)
+
+    def close(self):
+        """Release the writer thread; saves already queued still finish"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    @staticmethod
+    def _write(frames: List[Tuple[float, bytes]], output_path: str, fps: float, codec: str) -> int:
+        """Returns the number of video frames written.
+
+        Each frame is held until the next one's timestamp, repeated or
+        skipped as needed, so the clip plays back in real time even when
+        capture dropped or bunched frames.
+        """
+        if not frames:
+            return 0
+        timestamps = np.array([timestamp for timestamp, _ in frames])
+        slots = np.round((timestamps - timestamps[0]) * fps).astype(np.int64)
+        repeats = np.append(np.diff(slots), 1).clip(0, None)
+        writer: Optional[cv2.VideoWriter] = None
+        written = 0
+        try:
+            for (_, data), count in zip(frames, repeats):
+                if not count:
+                    continue
+                frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+                if writer is None:
+                    height, width = frame.shape[:2]
+                    writer = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*codec), fps,
+                                             (width, height))
+                for _ in range(count):
+                    writer.write(frame)
+                written += int(count)
+        finally:
+            if writer is not None:
+                writer.release()
+        logger.info(f"Saved {written} replay frames to {output_path}")
+        return written
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self._bytes = 0
+        self._detector.reset()
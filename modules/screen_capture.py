@@ -1,37 +1,240 @@
 import cv2
 import numpy as np
-from mss import mss
 from PIL import Image
 import logging
-from queue import Queue
-from threading import Thread
+from concurrent.futures import Future
+from threading import Thread, Event, Lock
+from typing import Dict, List, Optional, Tuple
 import time
 
+from .capture_backends import CaptureBackend, create_backend
+from .frame_buffer import FrameBufferPool, FrameRing, DROP_OLDEST, DROP_NEWEST
+from .change_detector import ChangeDetector, FrameChanges
+from .frame_pacing import TickScheduler
+from .region_capture import RegionScheduler
+from .multi_monitor import MultiMonitorCapture, MonitorSnapshot
+from .replay_buffer import ReplayBuffer
+from .encoders import create_video_writer, ENCODER_OPENCV, ENCODER_FFMPEG
+from .frame_bus import FramePublisher, FrameBusSubscriber
+
 logger = logging.getLogger(__name__)
 
 class ScreenCapture:
-    def __init__(self):
-        self.sct = mss()
+    def __init__(self, zero_copy: bool = True, pool_size: int = 4, backend: str = 'mss',
+                 backend_options: Optional[Dict] = None):
+        self.backend_name = backend
+        self.backend_options = backend_options or {}
+        self.backend = self.create_backend()
         self.recording = False
-        self._frame_queue = Queue(maxsize=300)  # 10 seconds at 30fps
+        self.zero_copy = zero_copy
+        self.pool_size = pool_size
+        # Backends that reuse their output are copied into this pool, so
+        # such a frame stays valid for pool_size - 1 further captures
+        self._buffer_pool = FrameBufferPool(pool_size)
+        self._frame_ring: Optional[FrameRing] = None
         self._recording_thread = None
+        self.recording_pacer: Optional[TickScheduler] = None
+        self._writer = None
+        self.recording_stats = {'captured': 0, 'encoded': 0, 'dropped': 0}
+        self.regions = RegionScheduler(self.create_backend)
+        self.multi_monitor: Optional[MultiMonitorCapture] = None
+        self.replay: Optional[ReplayBuffer] = None
+        self._replay_fps = 30
+        self._replay_stop = Event()
+        self._replay_thread = None
+        self.frame_publisher: Optional[FramePublisher] = None
+        self._bus_lock = Lock()
         
-    def capture_screen(self, monitor=1):
+    def create_backend(self) -> CaptureBackend:
+        """New handle on this capture's backend.
+
+        mss handles can't be shared between threads, so every thread that
+        captures needs its own handle, or its own clone().
+        """
+        return create_backend(self.backend_name, **self.backend_options)
+
+    def clone(self) -> 'ScreenCapture':
+        """Capture with the same settings and a new backend handle"""
+        return ScreenCapture(zero_copy=self.zero_copy, pool_size=self.pool_size,
+                             backend=self.backend_name, backend_options=self.backend_options)
+
+    def capture(self, monitor=1) -> Optional[np.ndarray]:
+        """Capture a monitor as a BGRA array.
+
+        Backends with fresh_frames hand over a new array on every grab, so
+        zero-copy mode returns a read-only view of it and the caller owns it
+        otherwise. Grabs from a backend that reuses its output are copied,
+        in zero-copy mode into a pooled buffer.
+        """
         try:
-            screenshot = self.sct.grab(self.sct.monitors[monitor])
-            return Image.frombytes('RGB', screenshot.size, screenshot.rgb)
+            raw = self.backend.grab(self.backend.monitors[monitor])
+            if self.backend.fresh_frames:
+                return FrameBufferPool.readonly(raw) if self.zero_copy else raw
+            if not self.zero_copy:
+                return raw.copy()
+            buffer = self._buffer_pool.acquire(raw.shape)
+            np.copyto(buffer, raw)
+            return FrameBufferPool.readonly(buffer)
         except Exception as e:
             logger.error(f"Screen capture error: {e}")
             return None
+
+    def capture_with_changes(self, detector: ChangeDetector,
+                             monitor=1) -> Tuple[Optional[np.ndarray], Optional[FrameChanges]]:
+        """Capture a frame and report which tiles changed since the detector's last frame"""
+        frame = self.capture(monitor)
+        if frame is None:
+            return None, None
+        return frame, detector.update(frame)
+
+    def add_region(self, left, top, width, height, fps=30, callback=None) -> int:
+        """Subscribe to a screen rectangle (absolute coordinates) captured at its own rate"""
+        region_id = self.regions.add_region((left, top, width, height), fps, callback)
+        self.regions.start()
+        return region_id
+
+    def remove_region(self, region_id: int):
+        self.regions.remove_region(region_id)
+
+    def get_region_frame(self, region_id: int) -> Tuple[Optional[np.ndarray], float]:
+        """Latest BGRA frame for a region and its capture time"""
+        return self.regions.latest(region_id)
+
+    def start_multi_monitor(self, fps=30, monitors=None):
+        """Capture every monitor (or the given ones) in parallel, one worker per monitor"""
+        if self.multi_monitor is None:
+            self.multi_monitor = MultiMonitorCapture(fps, backend_factory=self.create_backend)
+            self.multi_monitor.start(monitors)
+
+    def stop_multi_monitor(self):
+        if self.multi_monitor is not None:
+            self.multi_monitor.stop()
+            self.multi_monitor = None
+
+    def capture_all(self, at: Optional[float] = None) -> Optional[MonitorSnapshot]:
+        """Synchronized frames from all monitors nearest to monotonic time ``at``"""
+        if self.multi_monitor is None:
+            return None
+        return self.multi_monitor.snapshot(at)
+
+    def start_replay(self, seconds=10, fps=30, max_bytes=256 * 1024**2, quality=80, monitor=1):
+        """Keep the last ``seconds`` of screen in memory so it can be saved after the fact"""
+        if self._replay_thread is not None:
+            return False
+        if self.replay is not None:
+            self.replay.close()
+        self.replay = ReplayBuffer(seconds, max_bytes, quality)
+        self._replay_fps = fps
+        self._replay_stop.clear()
+        self._replay_thread = Thread(target=self._fill_replay, args=(fps, monitor), daemon=True)
+        self._replay_thread.start()
+        return True
+
+    def stop_replay(self):
+        self._replay_stop.set()
+        if self._replay_thread:
+            self._replay_thread.join()
+            self._replay_thread = None
+
+    def save_replay(self, output_path='replay.mp4', codec='h264') -> Optional[Future]:
+        """Flush the replay window to a video file; returns a future with the frame count"""
+        if self.replay is None:
+            return None
+        return self.replay.save(output_path, self._replay_fps, codec)
+
+    def _fill_replay(self, fps, monitor):
+        capture = self.clone()
+        pacer = TickScheduler(fps, name='replay')
+        try:
+            while pacer.wait(self._replay_stop):
+                frame = capture.capture(monitor)
+                if frame is not None:
+                    self.replay.add(frame, time.monotonic())
+        except Exception as e:
+            logger.error(f"Replay buffer error: {e}")
+
+    @property
+    def frame_bus_name(self) -> Optional[str]:
+        names = self.frame_bus_names
+        return names[0] if names else None
+
+    @property
+    def frame_bus_names(self) -> List[str]:
+        """Bus names per pyramid level, full resolution first"""
+        if self.frame_publisher is None:
+            return []
+        return [bus.name for bus in self.frame_publisher.buses]
+
+    def start_frame_bus(self, fps=30, monitor=1, slots=4, pyramid_levels=1) -> Optional[str]:
+        """Capture once per tick into shared memory for every subscriber; returns the bus name"""
+        with self._bus_lock:
+            if self.frame_publisher is None:
+                publisher = FramePublisher(self.clone, fps, monitor, slots, pyramid_levels)
+                if not publisher.start():
+                    publisher.stop()
+                    logger.error("Frame bus failed to start")
+                    return None
+                self.frame_publisher = publisher
+            return self.frame_bus_name
+
+    def stop_frame_bus(self):
+        with self._bus_lock:
+            if self.frame_publisher is not None:
+                self.frame_publisher.stop()
+                self.frame_publisher = None
+
+    @property
+    def frame_bus_shape(self) -> Optional[Tuple[int, ...]]:
+        """Full-resolution frame shape published on the bus"""
+        publisher = self.frame_publisher
+        if publisher is None or publisher.bus is None:
+            return None
+        return publisher.bus.shape
+
+    def frame_bus_for(self, max_size: Optional[Tuple[int, int]] = None) -> Optional[str]:
+        """Name of the smallest pyramid level bus covering max_size (width, height)"""
+        names = self.frame_bus_names
+        if not names:
+            return None
+        if max_size is None:
+            return names[0]
+        return names[self.frame_publisher.level_for(*max_size)]
+
+    def subscribe(self, fps=30, monitor=1, max_size=None, pyramid_levels=1) -> Optional[FrameBusSubscriber]:
+        """Attach to the frame bus at the resolution needed, starting it on first use"""
+        self.start_frame_bus(fps, monitor, pyramid_levels=pyramid_levels)
+        name = self.frame_bus_for(max_size)
+        return FrameBusSubscriber(name) if name else None
+
+    def capture_screen(self, monitor=1):
+        frame = self.capture(monitor)
+        if frame is None:
+            return None
+        height, width = frame.shape[:2]
+        return Image.frombuffer('RGB', (width, height), frame, 'raw', 'BGRX', 0, 1)
             
     def start_recording(self, output_path='screen_recording.mp4', fps=30, 
-                       quality=23, codec='h264'):
+                       quality=23, codec='h264', drop_policy=DROP_OLDEST,
+                       buffer_frames=60, encoder=ENCODER_OPENCV):
+        """Record the screen with capture and encoding on separate threads.
+
+        Captured frames go through a ring of buffer_frames preallocated slots;
+        when the encoder falls behind, drop_policy decides which frame is lost.
+        encoder='ffmpeg' encodes in a separate ffmpeg process when one is
+        installed and falls back to cv2.VideoWriter otherwise.
+        """
         if self.recording:
             return False
+        if drop_policy not in (DROP_OLDEST, DROP_NEWEST):
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+        if encoder not in (ENCODER_OPENCV, ENCODER_FFMPEG):
+            raise ValueError(f"Unknown encoder backend: {encoder}")
             
         self.recording = True
+        self.recording_stats = {'captured': 0, 'encoded': 0, 'dropped': 0}
         self._recording_thread = Thread(target=self._record_screen,
-                                     args=(output_path, fps, quality, codec),
+                                     args=(output_path, fps, quality, codec,
+                                           drop_policy, buffer_frames, encoder),
                                      daemon=True)
         self._recording_thread.start()
         return True
@@ -41,41 +244,73 @@ def stop_recording(self):
         if self._recording_thread:
             self._recording_thread.join()
             
-    def _record_screen(self, output_path, fps, quality, codec):
+    def get_recording_stats(self) -> Dict[str, int]:
+        stats = dict(self.recording_stats)
+        if self._frame_ring is not None:
+            stats['dropped'] = self._frame_ring.dropped
+            stats['queued'] = len(self._frame_ring)
+        if self.recording_pacer is not None:
+            stats['achieved_fps'] = self.recording_pacer.achieved_fps
+            stats['skipped_ticks'] = self.recording_pacer.skipped
+        if hasattr(self._writer, 'get_stats'):
+            stats['encoder'] = self._writer.get_stats()
+        return stats
+
+    def _record_screen(self, output_path, fps, quality, codec, drop_policy, buffer_frames,
+                       encoder_backend):
+        encoder = None
         try:
-            frame = self.capture_screen()
-            height, width = np.array(frame).shape[:2]
+            capture = self.clone()
+            frame = capture.capture()
+            height, width = frame.shape[:2]
+            writer = create_video_writer(output_path, fps, quality, codec, width, height,
+                                         encoder_backend)
+            self._writer = writer
             
-            # Use GPU acceleration if available
-            if cv2.cuda.getCudaEnabledDeviceCount() > 0:
-                writer = cv2.cudacodec.createVideoWriter(
-                    output_path, cv2.VideoWriter_fourcc(*codec), fps,
-                    (width, height), quality
-                )
-            else:
-                writer = cv2.VideoWriter(
-                    output_path, cv2.VideoWriter_fourcc(*codec), fps,
-                    (width, height)
-                )
+            self._frame_ring = FrameRing(buffer_frames, (height, width, 3), drop_policy)
+            encoder = Thread(target=self._encode_frames, args=(self._frame_ring, writer),
+                             daemon=True)
+            encoder.start()
                 
-            start_time = time.time()
-            frame_count = 0
-            
-            while self.recording:
-                frame = self.capture_screen()
-                if frame:
-                    frame_array = np.array(frame)
-                    writer.write(frame_array)
-                    frame_count += 1
-                    
-                    # Maintain FPS
-                    elapsed = time.time() - start_time
-                    expected_frames = int(elapsed * fps)
-                    if frame_count > expected_frames:
-                        time.sleep(1/fps)
+            self.recording_pacer = TickScheduler(fps, name='recording')
+            while self.recording and self.recording_pacer.wait():
+                frame = capture.capture()
+                if frame is not None and frame.shape[:2] == (height, width):
+                    slot = self._frame_ring.acquire()
+                    if slot is not None:
+                        index, buffer = slot
+                        # Convert straight into the ring slot, no intermediate copy
+                        cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR, dst=buffer)
+                        self._frame_ring.commit(index, time.monotonic())
+                    self.recording_stats['captured'] += 1
                         
-            writer.release()
-            
         except Exception as e:
             logger.error(f"Recording error: {e}")
             self.recording = False
+        finally:
+            if self._frame_ring is not None:
+                self._frame_ring.close()
+            if encoder is not None:
+                encoder.join()
+            self.recording_stats = self.get_recording_stats()
+            self._frame_ring = None
+
+    def _encode_frames(self, ring: FrameRing, writer):
+        try:
+            while True:
+                item = ring.pop(timeout=0.5)
+                if item is None:
+                    if ring.closed:
+                        break
+                    continue
+                index, buffer, _ = item
+                try:
+                    writer.write(buffer)
+                finally:
+                    ring.release(index)
+                self.recording_stats['encoded'] += 1
+        except Exception as e:
+            logger.error(f"Encoder error: {e}")
+            self.recording = False
+        finally:
+            writer.release()
@@ -1,30 +1,100 @@
 import cv2
 import torch
 import numpy as np
-from typing import Tuple, List, Dict, Any
+from typing import Tuple, List, Dict, Any, Optional
 import logging
 
+from utils.config import Config
+from ai_vision.detections import empty_detections, from_prediction
+from ai_vision.model_store import load_yolov5
+from ai_vision.tiling import TiledInference
+from modules.change_detector import ChangeDetector, FrameChanges
+
 logger = logging.getLogger(__name__)
 
 class VisionProcessor:
     def __init__(self):
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         self.model = None
+        self.detector = None
+        self.tiler = None
+        self.change_detector = None
+        settings = Config().vision
+        if settings['tile_size']:
+            self.enable_tiling(settings['tile_size'], settings['tile_overlap'], settings['dirty_tiles_only'])
         
-    def load_model(self, model_name: str):
+    def load_model(self, model_name: str, backend: Optional[str] = None,
+                   quantized: Optional[bool] = None):
+        """Load a YOLOv5 model through torch hub or, with backend='onnx', ONNX Runtime.
+
+        Weights come from the local model store when cached there.
+
+        quantized=True loads the calibrated INT8 ONNX model instead (see
+        ai_vision.quantization) and implies the ONNX backend. Both default
+        to the 'vision' section of the config.
+        """
+        settings = Config().vision
+        if quantized is None:
+            quantized = settings['quantized'] and backend in (None, 'onnx')
+        backend = 'onnx' if quantized else backend or settings['backend']
+        # Boxes cached per tile came from the previous model
+        if self.tiler is not None:
+            self.tiler.reset()
         try:
-            self.model = torch.hub.load('ultralytics/yolov5', model_name, pretrained=True)
-            self.model.to(self.device)
+            if backend == 'onnx':
+                from ai_vision.onnx_backend import load_detector
+                from ai_vision.quantization import load_quantized_detector
+                model_path = settings['onnx_models'].get(model_name)
+                load = load_quantized_detector if quantized else load_detector
+                self.detector = load(model_name, model_path, img_size=settings['img_size'],
+                                     threads=settings['threads'])
+                self.model = self.detector
+            else:
+                self.model = load_yolov5(model_name)
+                self.model.to(self.device)
+                self.detector = None
         except Exception as e:
             logger.error(f"Model load error: {e}")
             
-    def process_frame(self, frame: np.ndarray) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+    def enable_tiling(self, tile_size: int = 640, overlap: float = 0.2, dirty_only: bool = False):
+        """Detect on overlapping tile_size tiles instead of the downscaled frame.
+
+        Keeps small elements on large screens visible to the model without
+        raising img_size. With dirty_only, tiles the change detector saw no
+        change in keep their previous detections.
+        """
+        self.tiler = TiledInference(tile_size, overlap, dirty_only=dirty_only)
+        self.change_detector = ChangeDetector() if dirty_only else None
+
+    def disable_tiling(self):
+        self.tiler = None
+        self.change_detector = None
+
+    def _predict_batch(self, images: List[np.ndarray]) -> List[np.ndarray]:
+        if self.detector is not None:
+            return self.detector.predict(images)
+        return self.model(images, size=self.tiler.tile_size).xyxy
+
+    def process_frame(self, frame: np.ndarray,
+                      changes: Optional[FrameChanges] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Run the model on one frame; detections use ai_vision.detections.DETECTION_DTYPE.
+
+        changes, the change detector's result for this frame, picks the tiles
+        to rerun in dirty-only tiling; without it the processor's own
+        ChangeDetector is used.
+        """
         if self.model is None:
-            return frame, []
+            return frame, empty_detections()
             
         try:
+            if self.tiler is not None:
+                if self.change_detector is not None and changes is None:
+                    changes = self.change_detector.update(frame)
+                return frame, from_prediction(self.tiler.predict(frame, self._predict_batch, changes))
+            if self.detector is not None:
+                return frame, from_prediction(self.detector.predict([frame])[0])
             results = self.model(frame)
-            # ... rest of processing code ...
+            return frame, from_prediction(results.xyxy[0])
         except Exception as e:
             logger.error(f"Frame processing error: {e}")
-            return frame, []
+            return frame, empty_detections()
@@ -46,7 +46,20 @@ def create_config_files():
     "debug": false,
     "performance_mode": "balanced",
     "log_level": "INFO",
-    "cuda_enabled": true
+    "cuda_enabled": true,
+    "vision": {
+        "backend": "torch",
+        "model_dir": "models",
+        "onnx_models": {},
+        "quantized": false,
+        "img_size": 640,
+        "threads": 0,
+        "keyframe_interval": 5,
+        "workers": 1,
+        "tile_size": 0,
+        "tile_overlap": 0.2,
+        "dirty_tiles_only": false
+    }
 }'''
     }
     
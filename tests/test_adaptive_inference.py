@@ -0,0 +1,65 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from modules.adaptive_inference import (AdaptiveInference, RUN_FIRST, RUN_MOTION,
+                                        SKIP_IDLE, SKIP_RATE)
+
+class FakeAnalyzer:
+    def __init__(self):
+        self.calls = 0
+
+    def analyze_frame(self, frame):
+        self.calls += 1
+        return frame, [{'call': self.calls}]
+
+def frame(value):
+    return np.full((72, 128, 3), value, dtype=np.uint8)
+
+class TestAdaptiveInference(unittest.TestCase):
+    def setUp(self):
+        self.analyzer = FakeAnalyzer()
+        self.gate = AdaptiveInference(self.analyzer, motion_threshold=0.01, high_motion=0.2,
+                                      min_interval=0.1, max_interval=2.0)
+
+    def test_idle_screen_reuses_detections(self):
+        self.gate.process(frame(10), now=0.0)
+        for i in range(1, 20):
+            _, detections, decision = self.gate.process(frame(10), now=float(i))
+            self.assertFalse(decision.ran)
+            self.assertEqual(decision.reason, SKIP_IDLE)
+        self.assertEqual(detections, [{'call': 1}])
+        self.assertEqual(self.analyzer.calls, 1)
+        self.assertEqual(self.gate.stats['reasons'], {RUN_FIRST: 1, SKIP_IDLE: 19})
+
+    def test_high_motion_runs_at_min_interval(self):
+        reasons = [self.gate.process(frame(value), now=i * 0.06)[2].reason
+                   for i, value in enumerate([0, 100, 200, 0, 100, 200])]
+        self.assertEqual(reasons, [RUN_FIRST, SKIP_RATE, RUN_MOTION, SKIP_RATE, RUN_MOTION, SKIP_RATE])
+        self.assertAlmostEqual(self.gate.interval, 0.1)
+
+    def test_small_motion_slows_inference(self):
+        self.gate.process(frame(100), now=0.0)
+        decision = self.gate.process(frame(105), now=0.5)
+        self.assertEqual(decision[2].reason, SKIP_RATE)
+        self.assertGreater(decision[2].interval, 1.0)
+
+    def test_interval_respects_inference_latency(self):
+        self.gate.process(frame(0), now=0.0)
+        self.gate.latency = 0.3
+        self.gate.process(frame(255), now=0.2)
+        # 0.3 s per inference at 50% duty leaves 0.6 s between runs
+        self.assertAlmostEqual(self.gate.interval, 0.6)
+
+    def test_analyze_frame_hides_skipped_frames(self):
+        annotated, _ = self.gate.analyze_frame(frame(10))
+        self.assertIsNotNone(annotated)
+        annotated, detections = self.gate.analyze_frame(frame(10))
+        self.assertIsNone(annotated)
+        self.assertEqual(detections, [{'call': 1}])
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,96 @@
+import unittest
+import sys
+import os
+from unittest import mock
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from ai_vision.batching import MicroBatcher
+from ai_vision.detections import DETECTION_DTYPE, from_prediction, to_records
+from ai_vision.detection_benchmark import run_benchmarks
+
+class FakeAnalyzer:
+    def __init__(self):
+        self.batches = []
+
+    def analyze_batch(self, frames):
+        self.batches.append(len(frames))
+        return [(frame, [{'value': int(frame[0, 0])}]) for frame in frames]
+
+class TestMicroBatcher(unittest.TestCase):
+    def setUp(self):
+        self.analyzer = FakeAnalyzer()
+
+    def test_batches_concurrent_submissions(self):
+        batcher = MicroBatcher(self.analyzer, max_batch=4, max_delay=1.0)
+        batcher.start()
+        try:
+            futures = [batcher.submit(np.full((2, 2), i, dtype=np.uint8)) for i in range(4)]
+            values = [future.result(timeout=2)[1][0]['value'] for future in futures]
+        finally:
+            batcher.stop()
+        self.assertEqual(values, [0, 1, 2, 3])
+        self.assertEqual(self.analyzer.batches, [4])
+
+    def test_flushes_partial_batch_after_delay(self):
+        batcher = MicroBatcher(self.analyzer, max_batch=8, max_delay=0.01)
+        batcher.start()
+        try:
+            result = batcher.submit(np.zeros((2, 2), dtype=np.uint8)).result(timeout=2)
+        finally:
+            batcher.stop()
+        self.assertEqual(result[1], [{'value': 0}])
+        self.assertEqual(self.analyzer.batches, [1])
+
+    def test_errors_reach_every_caller(self):
+        self.analyzer.analyze_batch = lambda frames: 1 / 0
+        batcher = MicroBatcher(self.analyzer, max_batch=2, max_delay=0.01)
+        batcher.start()
+        try:
+            future = batcher.submit(np.zeros((2, 2), dtype=np.uint8))
+            with self.assertRaises(ZeroDivisionError):
+                future.result(timeout=2)
+        finally:
+            batcher.stop()
+
+class TestDetections(unittest.TestCase):
+    def setUp(self):
+        self.prediction = np.array([
+            [10, 20, 50, 60, 0.9, 0],
+            [15, 25, 55, 65, 0.3, 2],
+            [30, 40, 80, 90, 0.7, 2]
+        ], dtype=np.float32)
+
+    def test_filters_by_confidence_and_class(self):
+        detections = from_prediction(self.prediction, min_confidence=0.5)
+        self.assertEqual(detections.dtype, DETECTION_DTYPE)
+        self.assertEqual(detections['class'].tolist(), [0, 2])
+        detections = from_prediction(self.prediction, classes=[2])
+        self.assertEqual(detections['confidence'].tolist(), [np.float32(0.3), np.float32(0.7)])
+        self.assertEqual(len(from_prediction(np.empty((0, 6)))), 0)
+
+    def test_records_view_matches_pandas_columns(self):
+        records = to_records(from_prediction(self.prediction[:1]), {0: 'person'})
+        self.assertEqual(records, [{'xmin': 10.0, 'ymin': 20.0, 'xmax': 50.0, 'ymax': 60.0,
+                                    'confidence': float(np.float32(0.9)), 'class': 0,
+                                    'name': 'person'}])
+
+    def test_unloaded_analyzer_returns_structured_detections(self):
+        from ai_vision.analyzer import AIVisionAnalyzer
+        with mock.patch.object(AIVisionAnalyzer, '_load_model', side_effect=RuntimeError("offline")):
+            analyzer = AIVisionAnalyzer()
+        annotated, detections = analyzer.analyze_frame(np.zeros((8, 8, 3), dtype=np.uint8))
+        self.assertIsNone(annotated)
+        self.assertEqual(detections.dtype, DETECTION_DTYPE)
+        self.assertEqual(analyzer.analyze_batch([None])[0][1].dtype, DETECTION_DTYPE)
+
+    def test_benchmark_reports_saving_per_box_count(self):
+        report = run_benchmarks([5], frames=3, warmup=1)
+        cases = report['results']['5_boxes']
+        self.assertIn('structured', cases)
+        if 'pandas' in cases:
+            self.assertIn('saved_p50_ms', cases)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
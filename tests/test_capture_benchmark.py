@@ -0,0 +1,52 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PIL import Image
+
+from modules.capture_benchmark import allocated_bytes, run_benchmarks, compare
+
+class TestCaptureBenchmark(unittest.TestCase):
+    def test_reports_every_case_per_resolution(self):
+        report = run_benchmarks([(64, 48), (128, 96)], frames=3, warmup=1)
+        self.assertEqual(set(report['results']), {'64x48', '128x96'})
+        cases = report['results']['64x48']
+        for name in ('grab', 'capture', 'capture_screen', 'screen_control',
+                     'bgra2rgb_pil', 'bgra2bgr', 'bgra2bgr_dst', 'bgr2rgb_pil', 'bgrx_frombuffer'):
+            self.assertIn(name, cases)
+        self.assertGreater(cases['capture']['achieved_fps'], 0)
+
+    def test_allocations_are_measured(self):
+        cases = run_benchmarks([(64, 48)], frames=3, warmup=1)['results']['64x48']
+        frame_bytes = 64 * 48 * 4
+        self.assertGreaterEqual(cases['grab']['bytes_allocated'], frame_bytes)
+        # Converting into a preallocated slot allocates nothing per frame
+        self.assertLess(cases['bgra2bgr_dst']['bytes_allocated'], 1024)
+        self.assertGreaterEqual(cases['bgra2bgr']['bytes_allocated'], 64 * 48 * 3)
+
+    def test_allocated_bytes_sees_an_added_copy(self):
+        frame = np.zeros((48, 64, 4), dtype=np.uint8)
+        dst = np.empty_like(frame)
+        self.assertLess(allocated_bytes(lambda: np.copyto(dst, frame)), 1024)
+        self.assertGreaterEqual(allocated_bytes(lambda: frame.copy()), frame.nbytes)
+        self.assertGreaterEqual(allocated_bytes(lambda: Image.fromarray(frame[..., :3].copy())),
+                                64 * 48 * 3 + 64 * 48 * 4)
+
+    def test_compare_flags_regressions_only(self):
+        def report(p50, fps, copied):
+            return {'results': {'64x48': {'grab': {
+                'latency_p50_ms': p50, 'latency_p95_ms': p50, 'achieved_fps': fps,
+                'bytes_allocated': copied}}}}
+        baseline = report(10.0, 100.0, 1000)
+        self.assertEqual(compare(report(11.0, 95.0, 1000), baseline), [])
+        # Allocator noise below the slack is not a new copy
+        self.assertEqual(compare(report(10.0, 100.0, 1500), baseline), [])
+        # Sub-millisecond jitter is never a regression
+        self.assertEqual(compare(report(0.4, 1000.0, 1000), report(0.1, 1000.0, 1000)), [])
+        metrics = {r['metric'] for r in compare(report(20.0, 50.0, 100000), baseline)}
+        self.assertEqual(metrics, {'latency_p50_ms', 'achieved_fps', 'bytes_allocated'})
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,50 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from modules.change_detector import ChangeDetector
+
+class TestChangeDetector(unittest.TestCase):
+    def setUp(self):
+        self.detector = ChangeDetector(tile_size=16)
+        self.frame = np.zeros((50, 70, 4), dtype=np.uint8)
+
+    def test_first_frame_is_fully_dirty(self):
+        changes = self.detector.update(self.frame)
+        self.assertFalse(changes.unchanged)
+        self.assertEqual(changes.dirty_tiles.shape, (4, 5))
+        self.assertEqual(changes.dirty_rects, [(0, 0, 70, 50)])
+
+    def test_identical_frame_is_unchanged(self):
+        self.detector.update(self.frame)
+        changes = self.detector.update(self.frame.copy())
+        self.assertTrue(changes.unchanged)
+        self.assertEqual(changes.changed_ratio, 0.0)
+        self.assertIsNone(changes.bounding_rect)
+
+    def test_single_pixel_marks_its_tile(self):
+        self.detector.update(self.frame)
+        frame = self.frame.copy()
+        frame[20, 40, 1] = 255
+        changes = self.detector.update(frame)
+        self.assertEqual(changes.dirty_rects, [(32, 16, 16, 16)])
+        self.assertEqual(int(changes.dirty_tiles.sum()), 1)
+
+    def test_edge_tiles_are_clipped(self):
+        self.detector.update(self.frame)
+        frame = self.frame.copy()
+        frame[49, 69] = 1
+        self.assertEqual(self.detector.update(frame).dirty_rects, [(64, 48, 6, 2)])
+
+    def test_threshold_ignores_noise(self):
+        detector = ChangeDetector(tile_size=16, threshold=8)
+        detector.update(self.frame)
+        frame = self.frame.copy()
+        frame[:, :, :3] = 4
+        self.assertTrue(detector.update(frame).unchanged)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
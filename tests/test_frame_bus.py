@@ -0,0 +1,114 @@
+import unittest
+import sys
+import os
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from modules.frame_bus import FrameBus, FrameBusSubscriber, FramePublisher
+from modules.pyramid import FramePyramid, fit_size
+
+class FakeCapture:
+    def __init__(self):
+        self.count = 0
+
+    def capture(self, monitor=1):
+        self.count += 1
+        return np.full((8, 8, 4), self.count % 256, dtype=np.uint8)
+
+class TestFrameBus(unittest.TestCase):
+    def setUp(self):
+        self.bus = FrameBus((8, 8, 4), slots=3)
+        self.subscriber = FrameBusSubscriber(self.bus.name)
+        self.addCleanup(self.bus.close)
+        self.addCleanup(self.subscriber.close)
+
+    def publish(self, value, timestamp=0.0):
+        return self.bus.publish(np.full((8, 8, 4), value, dtype=np.uint8), timestamp)
+
+    def test_empty_bus_has_no_frame(self):
+        self.assertEqual(self.subscriber.latest(), (0, 0.0, None))
+
+    def test_reads_latest_frame_zero_copy(self):
+        self.publish(1, 1.0)
+        self.publish(2, 2.0)
+        seq, timestamp, frame = self.subscriber.latest()
+        self.assertEqual((seq, timestamp), (2, 2.0))
+        self.assertEqual(int(frame[0, 0, 0]), 2)
+        self.assertFalse(frame.flags.writeable)
+
+    def test_counts_missed_frames(self):
+        self.publish(1)
+        self.subscriber.latest()
+        for value in range(2, 6):
+            self.publish(value)
+        self.subscriber.latest()
+        self.assertEqual(self.subscriber.missed, 3)
+
+    def test_view_invalidated_after_ring_wraps(self):
+        seq = self.publish(1)
+        self.assertTrue(self.subscriber.is_current(seq))
+        for value in range(3):
+            self.publish(value)
+        self.assertFalse(self.subscriber.is_current(seq))
+
+    def test_latest_waits_for_slot_being_written(self):
+        seq = self.publish(7, 1.0)
+        meta = self.subscriber._layout.meta
+        # As publish() leaves the slot while it copies a new frame in
+        meta['seq'][seq % 3] = 0
+        timer = threading.Timer(0.05, meta['seq'].__setitem__, (seq % 3, seq))
+        timer.start()
+        self.assertEqual(self.subscriber.latest()[0], seq)
+        timer.join()
+
+    def test_rejects_mismatched_frame(self):
+        with self.assertRaises(ValueError):
+            self.bus.publish(np.zeros((4, 4, 4), dtype=np.uint8))
+
+class TestFramePublisher(unittest.TestCase):
+    def test_publishes_captured_frames(self):
+        publisher = FramePublisher(FakeCapture, fps=200)
+        self.assertTrue(publisher.start())
+        subscriber = FrameBusSubscriber(publisher.bus.name)
+        try:
+            seq, _, frame = subscriber.latest(copy=True)
+            self.assertGreater(seq, 0)
+            self.assertEqual(frame.shape, (8, 8, 4))
+        finally:
+            subscriber.close()
+            publisher.stop()
+        self.assertIsNone(publisher.bus)
+
+    def test_publishes_pyramid_levels(self):
+        publisher = FramePublisher(FakeCapture, fps=200, pyramid_levels=3)
+        self.assertTrue(publisher.start())
+        try:
+            self.assertEqual([bus.shape for bus in publisher.buses],
+                             [(8, 8, 4), (4, 4, 4), (2, 2, 4)])
+            self.assertEqual(publisher.level_for(3, 3), 1)
+        finally:
+            publisher.stop()
+
+class TestFramePyramid(unittest.TestCase):
+    def test_levels_halve_and_reuse_buffers(self):
+        pyramid = FramePyramid(levels=3)
+        frame = np.full((40, 60, 4), 9, dtype=np.uint8)
+        levels = pyramid.update(frame)
+        self.assertEqual([level.shape for level in levels], [(40, 60, 4), (20, 30, 4), (10, 15, 4)])
+        self.assertTrue((levels[2] == 9).all())
+        self.assertIs(pyramid.update(frame)[1], levels[1])
+
+    def test_select_smallest_covering_level(self):
+        shapes = FramePyramid.level_shapes((2160, 3840, 4), 4)
+        self.assertEqual(FramePyramid.select_level(shapes, 400, 300), 3)
+        self.assertEqual(FramePyramid.select_level(shapes, 640, 480), 2)
+        self.assertEqual(FramePyramid.select_level(shapes, 4000, 4000), 0)
+
+    def test_fit_size_keeps_aspect(self):
+        self.assertEqual(fit_size(3840, 2160, 400, 300), (400, 225))
+        self.assertEqual(fit_size(100, 50, 400, 300), (100, 50))
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,63 @@
+import unittest
+from unittest import mock
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.frame_pacing import TickScheduler
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+class TestTickScheduler(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch('modules.frame_pacing.time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.pacer = TickScheduler(10)
+
+    def test_sleeps_until_absolute_deadline(self):
+        self.pacer.wait()
+        self.clock.now += 0.03  # loop body
+        self.pacer.wait()
+        self.assertAlmostEqual(self.clock.now, 100.1)
+        self.assertEqual(self.pacer.skipped, 0)
+
+    def test_skips_missed_ticks_instead_of_bursting(self):
+        self.pacer.wait()
+        self.clock.now += 0.35  # stall spanning three deadlines
+        self.pacer.wait()
+        self.assertEqual(self.pacer.skipped, 2)
+        before = self.clock.now
+        self.pacer.wait()
+        self.assertAlmostEqual(self.clock.now - before, 0.05)
+
+    def test_records_lateness(self):
+        self.pacer.wait()
+        self.clock.now += 0.105
+        self.pacer.wait()
+        stats = self.pacer.get_stats()
+        self.assertEqual(stats['ticks'], 2)
+        self.assertAlmostEqual(stats['lateness_max_ms'], 5.0)
+        self.assertEqual(stats['histogram_ms'][8], 1)
+
+    def test_stop_event_interrupts_wait(self):
+        stop = mock.Mock()
+        stop.wait.return_value = True
+        self.pacer.wait(stop)
+        self.assertFalse(self.pacer.wait(stop))
+
+    def test_rejects_invalid_rate(self):
+        with self.assertRaises(ValueError):
+            TickScheduler(0)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,81 @@
+import unittest
+import sys
+import os
+import tempfile
+import threading
+from unittest import mock
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_vision.model_store import ModelStore, load_in_background
+
+class TestModelStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = ModelStore(os.path.join(self.tmp.name, 'models'))
+
+    def weights(self, content, name='yolov5s.pt'):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+
+    def test_resolves_newest_version(self):
+        self.store.add('yolov5s', self.weights(b'old'), version='v1')
+        with mock.patch('ai_vision.model_store.time.time', return_value=2e9):
+            self.store.add('yolov5s', self.weights(b'new'), version='v2')
+        self.assertEqual(self.store.versions('yolov5s'), ['v2', 'v1'])
+        self.assertEqual(self.store.resolve('yolov5s', 'yolov5s.pt').read_bytes(), b'new')
+        self.assertEqual(self.store.resolve('yolov5s', 'yolov5s.pt', 'v1').read_bytes(), b'old')
+        self.assertIsNone(self.store.resolve('yolov5s', 'yolov5s.onnx'))
+        self.assertIsNone(self.store.resolve('yolov5m', 'yolov5m.pt'))
+
+    def test_version_defaults_to_content_hash(self):
+        path = self.store.add('yolov5s', self.weights(b'weights'))
+        self.assertEqual(len(path.parent.name), 12)
+        self.assertEqual(self.store.add('yolov5s', self.weights(b'weights')), path)
+
+    def test_skips_corrupt_files(self):
+        self.store.add('yolov5s', self.weights(b'good'), version='v1')
+        with mock.patch('ai_vision.model_store.time.time', return_value=2e9):
+            bad = self.store.add('yolov5s', self.weights(b'fine'), version='v2')
+        bad.write_bytes(b'truncated')
+        self.assertEqual(self.store.resolve('yolov5s', 'yolov5s.pt').read_bytes(), b'good')
+
+class TestBackgroundLoading(unittest.TestCase):
+    def test_future_resolves_off_thread(self):
+        release = threading.Event()
+        future = load_in_background(lambda: release.wait(2) and 'model')
+        self.assertFalse(future.done())
+        release.set()
+        self.assertEqual(future.result(timeout=2), 'model')
+
+    def test_future_carries_load_errors(self):
+        future = load_in_background(lambda: 1 / 0)
+        with self.assertRaises(ZeroDivisionError):
+            future.result(timeout=2)
+
+    def test_analyzer_reports_loading_until_ready(self):
+        from ai_vision.analyzer import AIVisionAnalyzer
+        from ai_vision.detections import DETECTION_DTYPE
+        release = threading.Event()
+        model = mock.Mock(names={0: 'button'})
+
+        def slow_load(name):
+            release.wait(2)
+            return model
+
+        with mock.patch('ai_vision.analyzer.load_yolov5', side_effect=slow_load):
+            analyzer = AIVisionAnalyzer(backend='torch', background=True)
+            self.assertTrue(analyzer.loading)
+            annotated, detections = analyzer.analyze_frame(None)
+            self.assertIsNone(annotated)
+            self.assertEqual(detections.dtype, DETECTION_DTYPE)
+            self.assertEqual(len(detections), 0)
+            release.set()
+            analyzer.ready.result(timeout=2)
+        self.assertFalse(analyzer.loading)
+        self.assertIs(analyzer.model, model)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
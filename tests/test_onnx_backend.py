@@ -0,0 +1,192 @@
+import unittest
+import sys
+import os
+import tempfile
+import importlib.util
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import torch
+
+from ai_vision.inference_benchmark import agreement, run_benchmarks
+from ai_vision.onnx_backend import (ONNXDetector, inference_shape, letterbox, nms,
+                                    postprocess, scale_boxes)
+
+ONNX_AVAILABLE = all(importlib.util.find_spec(name) for name in ('onnx', 'onnxruntime'))
+
+class TinyYOLO(torch.nn.Module):
+    """Stand-in with YOLOv5's output layout: one (cx, cy, w, h, obj, classes...) row per grid cell"""
+    def __init__(self, classes=3, stride=16):
+        super().__init__()
+        torch.manual_seed(0)
+        self.head = torch.nn.Conv2d(3, 5 + classes, stride, stride=stride)
+
+    def forward(self, x):
+        # Image size from the data, so it stays dynamic in the exported graph
+        ones = torch.ones_like(x[0, 0])
+        size = torch.stack([ones.sum(1)[0], ones.sum(0)[0]])
+        y = torch.sigmoid(self.head(x * 8 - 4)).flatten(2).transpose(1, 2)
+        return torch.cat([y[..., :2] * size, y[..., 2:4] * size / 2, y[..., 4:]], dim=-1)
+
+def reference_nms(boxes, scores, iou_threshold):
+    order = sorted(range(len(scores)), key=lambda i: -scores[i])
+    keep = []
+    for i in order:
+        suppressed = False
+        for j in keep:
+            x1, y1 = max(boxes[i][0], boxes[j][0]), max(boxes[i][1], boxes[j][1])
+            x2, y2 = min(boxes[i][2], boxes[j][2]), min(boxes[i][3], boxes[j][3])
+            overlap = max(0.0, x2 - x1) * max(0.0, y2 - y1)
+            area_i = (boxes[i][2] - boxes[i][0]) * (boxes[i][3] - boxes[i][1])
+            area_j = (boxes[j][2] - boxes[j][0]) * (boxes[j][3] - boxes[j][1])
+            if overlap / (area_i + area_j - overlap) > iou_threshold:
+                suppressed = True
+                break
+        if not suppressed:
+            keep.append(i)
+    return keep
+
+class TestPreprocessing(unittest.TestCase):
+    def test_inference_shape_matches_autoshape(self):
+        frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+        self.assertEqual(inference_shape([frame], 640), (384, 640))
+
+    def test_letterbox_round_trip(self):
+        frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+        image, ratio, pad = letterbox(frame, (384, 640))
+        self.assertEqual(image.shape, (384, 640, 3))
+        boxes = np.array([[100 * ratio + pad[0], 50 * ratio + pad[1],
+                           300 * ratio + pad[0], 200 * ratio + pad[1], 0.9, 1]], dtype=np.float32)
+        np.testing.assert_allclose(scale_boxes(boxes, ratio, pad, frame.shape[:2])[0, :4],
+                                   [100, 50, 300, 200], atol=1e-3)
+
+    def test_nms_matches_reference(self):
+        rng = np.random.default_rng(1)
+        xy = rng.uniform(0, 100, (200, 2))
+        boxes = np.hstack([xy, xy + rng.uniform(5, 40, (200, 2))]).astype(np.float32)
+        scores = rng.uniform(0, 1, 200).astype(np.float32)
+        self.assertEqual(nms(boxes, scores, 0.45).tolist(), reference_nms(boxes, scores, 0.45))
+
+    def test_postprocess_keeps_boxes_of_different_classes(self):
+        output = np.array([
+            [50, 50, 20, 20, 0.9, 0.9, 0.1],
+            [51, 51, 20, 20, 0.9, 0.1, 0.9],
+            [52, 52, 20, 20, 0.8, 0.9, 0.1],
+            [10, 10, 5, 5, 0.1, 0.9, 0.1]
+        ], dtype=np.float32)
+        prediction = postprocess(output, conf_threshold=0.25, iou_threshold=0.45)
+        self.assertEqual(sorted(prediction[:, 5].tolist()), [0, 1])
+        np.testing.assert_allclose(prediction[prediction[:, 5] == 0][0, :4], [40, 40, 60, 60])
+
+    def test_agreement_matches_same_class_overlaps(self):
+        reference = [np.array([[0, 0, 10, 10, 0.9, 0], [20, 20, 30, 30, 0.9, 1]], dtype=np.float32)]
+        candidate = [np.array([[1, 1, 10, 10, 0.8, 0], [20, 20, 30, 30, 0.8, 2]], dtype=np.float32)]
+        result = agreement(reference, candidate)
+        self.assertEqual((result['recall'], result['precision']), (0.5, 0.5))
+
+@unittest.skipUnless(ONNX_AVAILABLE, "onnx and onnxruntime are required")
+class TestONNXDetector(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.model = TinyYOLO().eval()
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmp.name, 'tiny.onnx')
+        torch.onnx.export(cls.model, torch.zeros(1, 3, 64, 64), cls.path, opset_version=12,
+                          input_names=['images'], output_names=['output0'], dynamo=False,
+                          dynamic_axes={'images': {0: 'batch', 2: 'height', 3: 'width'}})
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def torch_predict(self, frame, img_size):
+        # The torch path: same letterbox, model forward in torch, same postprocess
+        shape = inference_shape([frame], img_size)
+        image, ratio, pad = letterbox(frame, shape)
+        batch = torch.from_numpy(image.transpose(2, 0, 1)[None].astype(np.float32) / 255.0)
+        with torch.no_grad():
+            output = self.model(batch)[0].numpy()
+        return scale_boxes(postprocess(output, 0.25, 0.45), ratio, pad, frame.shape[:2])
+
+    def test_matches_torch_forward_with_shared_pre_and_postprocessing(self):
+        detector = ONNXDetector(self.path, img_size=64, threads=1)
+        rng = np.random.default_rng(0)
+        frames = [rng.integers(0, 255, (90, 160, 3), dtype=np.uint8) for _ in range(3)]
+        predictions = detector.predict(frames)
+        self.assertEqual(len(predictions), 3)
+        for frame, prediction in zip(frames, predictions):
+            expected = self.torch_predict(frame, 64)
+            self.assertEqual(prediction.shape, expected.shape)
+            np.testing.assert_allclose(prediction, expected, atol=1e-3)
+
+    def test_session_is_cached(self):
+        first = ONNXDetector(self.path, img_size=64, threads=1)
+        second = ONNXDetector(self.path, img_size=64, threads=1)
+        self.assertIs(first.session, second.session)
+        # Exported without class names
+        self.assertEqual(first.names[2], '2')
+
+    def test_benchmark_reports_latency(self):
+        rng = np.random.default_rng(0)
+        frames = [rng.integers(0, 255, (90, 160, 3), dtype=np.uint8) for _ in range(2)]
+        report = run_benchmarks(frames, ['onnx'], model_path=self.path, img_size=64,
+                                threads=1, iterations=2, warmup=1)
+        stats = report['results']['onnx']
+        self.assertGreater(stats['achieved_fps'], 0)
+        self.assertEqual(stats['agreement']['recall'], 1.0)
+
+def hub_checkpoint():
+    """(weights, hub repo) for a small YOLOv5 checkpoint on disk, or None.
+
+    Point YOLOV5_WEIGHTS at a .pt file, or cache yolov5n/yolov5s in the model
+    store; the hub code must be in the torch hub cache.
+    """
+    from ai_vision.model_store import ModelStore, _cached_hub_repo
+    repo = _cached_hub_repo()
+    if repo is None:
+        return None
+    candidates = [os.environ.get('YOLOV5_WEIGHTS')]
+    store = ModelStore()
+    candidates += [store.resolve(name, f"{name}.pt") for name in ('yolov5n', 'yolov5s')]
+    weights = next((str(path) for path in candidates if path and os.path.exists(path)), None)
+    return (weights, repo) if weights else None
+
+@unittest.skipUnless(ONNX_AVAILABLE, "onnx and onnxruntime are required")
+class TestHubParity(unittest.TestCase):
+    """ONNX backend against the hub model's own AutoShape preprocessing and NMS"""
+    @classmethod
+    def setUpClass(cls):
+        checkpoint = hub_checkpoint()
+        if checkpoint is None:
+            raise unittest.SkipTest("no local YOLOv5 checkpoint and cached hub code")
+        import cv2
+        from ai_vision.onnx_backend import export_yolov5
+        weights, repo = checkpoint
+        cls.hub_model = torch.hub.load(str(repo), 'custom', path=weights, source='local')
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.path = export_yolov5('yolov5', os.path.join(cls.tmp.name, 'yolov5.onnx'), weights=weights)
+        images = sorted((repo / 'data' / 'images').glob('*.jpg'))
+        cls.frames = [cv2.cvtColor(cv2.imread(str(path)), cv2.COLOR_BGR2RGB) for path in images]
+        if not cls.frames:
+            cls.tmp.cleanup()
+            raise unittest.SkipTest("hub repo has no sample images")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_matches_autoshape_output(self):
+        with torch.no_grad():
+            expected = [prediction.cpu().numpy() for prediction in self.hub_model(self.frames).xyxy]
+        detector = ONNXDetector(self.path, img_size=640, conf_threshold=self.hub_model.conf,
+                                iou_threshold=self.hub_model.iou, max_det=self.hub_model.max_det)
+        predictions = detector.predict(self.frames)
+        result = agreement(expected, predictions, iou_threshold=0.9)
+        self.assertGreater(result['reference_boxes'], 0)
+        self.assertGreaterEqual(result['recall'], 0.95)
+        self.assertGreaterEqual(result['precision'], 0.95)
+        self.assertEqual(detector.names, self.hub_model.names if isinstance(self.hub_model.names, dict)
+                         else dict(enumerate(self.hub_model.names)))
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,96 @@
+import unittest
+import sys
+import os
+import tempfile
+import importlib.util
+from unittest import mock
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import torch
+
+from tests.test_onnx_backend import TinyYOLO
+
+ONNX_AVAILABLE = all(importlib.util.find_spec(name) for name in ('onnx', 'onnxruntime'))
+
+@unittest.skipUnless(ONNX_AVAILABLE, "onnx and onnxruntime are required")
+class TestQuantization(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import onnx
+        from ai_vision.model_store import ModelStore
+        from ai_vision.quantization import quantize_model
+        cls.tmp = tempfile.TemporaryDirectory()
+        exported = os.path.join(cls.tmp.name, 'tiny.onnx')
+        torch.onnx.export(TinyYOLO().eval(), torch.zeros(1, 3, 64, 64), exported, opset_version=13,
+                          input_names=['images'], output_names=['output0'], dynamo=False,
+                          dynamic_axes={'images': {0: 'batch', 2: 'height', 3: 'width'}})
+        model = onnx.load(exported)
+        meta = model.metadata_props.add()
+        meta.key, meta.value = 'names', str({0: 'button', 1: 'icon', 2: 'text'})
+        onnx.save(model, exported)
+        # Where VisionProcessor finds it relative to the working directory
+        cls.path = str(ModelStore(os.path.join(cls.tmp.name, 'models')).add('tiny', exported, 'v1'))
+
+        rng = np.random.default_rng(0)
+        cls.frames = [rng.integers(0, 255, (90, 160, 3), dtype=np.uint8) for _ in range(8)]
+        cls.quantized = quantize_model(cls.path, cls.frames, img_size=64)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_writes_int8_model_next_to_fp32(self):
+        import onnx
+        self.assertEqual(self.quantized, os.path.join(self.tmp.name, 'models', 'tiny', 'v1', 'tiny-int8.onnx'))
+        ops = {node.op_type for node in onnx.load(self.quantized).graph.node}
+        self.assertIn('QuantizeLinear', ops)
+
+    def test_quantized_detector_keeps_names(self):
+        from ai_vision.quantization import load_quantized_detector
+        detector = load_quantized_detector('tiny', self.path, img_size=64, threads=1)
+        self.assertEqual(detector.names[1], 'icon')
+        self.assertEqual(len(detector.predict(self.frames[:2])), 2)
+
+    def test_missing_int8_model_asks_for_calibration(self):
+        from ai_vision.quantization import load_quantized_detector
+        with self.assertRaises(FileNotFoundError):
+            load_quantized_detector('tiny', os.path.join(self.tmp.name, 'missing.onnx'))
+
+    def test_accuracy_report_compares_against_fp32(self):
+        from ai_vision.quantization import accuracy_report
+        report = accuracy_report(self.frames, self.path, self.quantized, img_size=64,
+                                 threads=1, iterations=2, warmup=1)
+        self.assertEqual(set(report['results']), {'onnx', 'onnx-int8'})
+        self.assertIn('speedup', report)
+        self.assertGreaterEqual(report['results']['onnx-int8']['agreement']['recall'], 0.0)
+
+    def test_load_model_selects_int8_per_call(self):
+        from modules.vision import VisionProcessor
+        cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        try:
+            processor = VisionProcessor()
+            processor.load_model('tiny', quantized=True)
+        finally:
+            os.chdir(cwd)
+        self.assertTrue(processor.detector.model_path.endswith('tiny-int8.onnx'))
+        _, detections = processor.process_frame(self.frames[0])
+        self.assertEqual(detections.dtype.names[-1], 'class')
+
+    def test_load_model_uses_the_path_configured_for_that_model(self):
+        from modules.vision import VisionProcessor
+        from utils.config import VISION_DEFAULTS
+        settings = {**VISION_DEFAULTS, 'backend': 'onnx', 'img_size': 64, 'onnx_models': {'tiny': self.path}}
+        with mock.patch('modules.vision.Config') as config:
+            config.return_value.vision = settings
+            processor = VisionProcessor()
+            processor.load_model('tiny')
+            self.assertEqual(processor.detector.model_path, self.path)
+            # Another model never picks up tiny's file
+            with mock.patch('ai_vision.onnx_backend.resolve_model_path', return_value=self.path) as resolve:
+                processor.load_model('other')
+        self.assertEqual(resolve.call_args[0][0], 'other')
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
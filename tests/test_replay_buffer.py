@@ -0,0 +1,82 @@
+import unittest
+import sys
+import os
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+
+from modules.replay_buffer import ReplayBuffer
+
+def noise_frame(seed, shape=(48, 64, 4)):
+    return np.random.default_rng(seed).integers(0, 255, shape, dtype=np.uint8)
+
+class TestReplayBuffer(unittest.TestCase):
+    def test_evicts_frames_outside_window(self):
+        replay = ReplayBuffer(seconds=10)
+        for i in range(30):
+            replay.add(noise_frame(i), float(i))
+        timestamps = [timestamp for timestamp, _ in replay.snapshot()]
+        self.assertEqual(timestamps[0], 19.0)
+        self.assertEqual(len(timestamps), 11)
+
+    def test_respects_memory_ceiling(self):
+        replay = ReplayBuffer(seconds=60, max_bytes=20000)
+        for i in range(20):
+            replay.add(noise_frame(i), float(i))
+        self.assertLessEqual(replay.memory_usage, 20000)
+        self.assertLess(len(replay), 20)
+
+    def test_unchanged_frames_share_encoding(self):
+        replay = ReplayBuffer()
+        frame = noise_frame(0)
+        replay.add(frame, 0.0)
+        size = replay.memory_usage
+        replay.add(frame.copy(), 0.1)
+        self.assertEqual(len(replay), 2)
+        self.assertEqual(replay.memory_usage, size)
+
+    def test_shared_encoding_survives_eviction(self):
+        replay = ReplayBuffer(seconds=1.0)
+        frame = noise_frame(0)
+        replay.add(frame, 0.0)
+        replay.add(frame.copy(), 0.5)
+        replay.add(frame.copy(), 1.2)
+        self.assertEqual(len(replay), 2)
+        self.assertGreater(replay.memory_usage, 0)
+
+    def test_save_writes_video(self):
+        replay = ReplayBuffer()
+        for i in range(5):
+            replay.add(noise_frame(i), i / 30)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'replay.avi')
+            self.assertEqual(replay.save(path, fps=30, codec='MJPG').result(timeout=10), 5)
+            video = cv2.VideoCapture(path)
+            self.assertEqual(int(video.get(cv2.CAP_PROP_FRAME_COUNT)), 5)
+            video.release()
+
+    def test_save_keeps_real_time_across_dropped_frames(self):
+        replay = ReplayBuffer()
+        # A gap of four frame intervals, then two frames closer than one interval
+        for i, timestamp in enumerate((0.0, 1 / 30, 5 / 30, 5.2 / 30, 6 / 30)):
+            replay.add(noise_frame(i), timestamp)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'replay.avi')
+            self.assertEqual(replay.save(path, fps=30, codec='MJPG').result(timeout=10), 7)
+        replay.close()
+
+    def test_close_releases_writer_thread(self):
+        replay = ReplayBuffer()
+        replay.add(noise_frame(0), 0.0)
+        with tempfile.TemporaryDirectory() as tmp:
+            future = replay.save(os.path.join(tmp, 'replay.avi'), fps=30, codec='MJPG')
+            executor = replay._executor
+            replay.close()
+            self.assertEqual(future.result(timeout=10), 1)
+        self.assertTrue(executor._shutdown)
+        self.assertIsNone(replay._executor)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,314 @@
+import unittest
+from unittest import mock
+import sys
+import os
+import time
+import tempfile
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+from mss.screenshot import ScreenShot
+
+from modules.frame_buffer import FrameBufferPool, FrameRing, DROP_OLDEST, DROP_NEWEST
+from modules.screen_capture import ScreenCapture
+from modules.region_capture import RegionScheduler, merge_rects
+from modules.multi_monitor import MonitorWorker, MultiMonitorCapture
+from modules.encoders import FFmpegWriter, create_video_writer
+from modules.capture_backends import SyntheticBackend, VideoFileBackend, create_backend
+
+class FakeMSS:
+    def __init__(self, width=64, height=48):
+        self.monitors = [{}, {'left': 0, 'top': 0, 'width': width, 'height': height}]
+        self.grabs = 0
+
+    def grab(self, monitor):
+        self.grabs += 1
+        data = bytearray(np.full(monitor['height'] * monitor['width'] * 4, self.grabs % 256, dtype=np.uint8))
+        return ScreenShot.from_size(data, monitor['width'], monitor['height'])
+
+    def close(self):
+        pass
+
+def make_capture(**kwargs):
+    with mock.patch('modules.capture_backends.mss', FakeMSS):
+        return ScreenCapture(**kwargs)
+
+class TestFrameBufferPool(unittest.TestCase):
+    def test_buffers_are_reused(self):
+        pool = FrameBufferPool(size=2)
+        first = pool.acquire((4, 4, 4))
+        second = pool.acquire((4, 4, 4))
+        self.assertIsNot(first, second)
+        self.assertIs(pool.acquire((4, 4, 4)), first)
+
+    def test_reallocates_on_shape_change(self):
+        pool = FrameBufferPool(size=2)
+        pool.acquire((4, 4, 4))
+        self.assertEqual(pool.acquire((8, 8, 4)).shape, (8, 8, 4))
+
+    def test_readonly_view(self):
+        view = FrameBufferPool.readonly(np.zeros((2, 2), dtype=np.uint8))
+        with self.assertRaises(ValueError):
+            view[0, 0] = 1
+
+class TestFrameRing(unittest.TestCase):
+    def fill(self, ring, values):
+        for value in values:
+            slot = ring.acquire()
+            if slot is not None:
+                index, buffer = slot
+                buffer[:] = value
+                ring.commit(index, float(value))
+
+    def drain(self, ring):
+        values = []
+        while len(ring):
+            index, buffer, _ = ring.pop(timeout=0)
+            values.append(int(buffer[0]))
+            ring.release(index)
+        return values
+
+    def test_drop_oldest_keeps_newest_frames(self):
+        ring = FrameRing(2, (1,), DROP_OLDEST)
+        self.fill(ring, [1, 2, 3])
+        self.assertEqual(ring.dropped, 1)
+        self.assertEqual(self.drain(ring), [2, 3])
+
+    def test_drop_newest_keeps_queued_frames(self):
+        ring = FrameRing(2, (1,), DROP_NEWEST)
+        self.fill(ring, [1, 2, 3])
+        self.assertEqual(ring.dropped, 1)
+        self.assertEqual(self.drain(ring), [1, 2])
+
+    def test_pop_returns_none_once_closed(self):
+        ring = FrameRing(2, (1,))
+        ring.close()
+        self.assertIsNone(ring.pop(timeout=1))
+
+    def test_rejects_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            FrameRing(2, (1,), 'drop_random')
+
+class TestScreenCapture(unittest.TestCase):
+    def test_capture_returns_readonly_bgra(self):
+        capture = make_capture()
+        frame = capture.capture()
+        self.assertEqual(frame.shape, (48, 64, 4))
+        self.assertFalse(frame.flags.writeable)
+
+    def test_zero_copy_returns_the_grab_itself(self):
+        capture = make_capture()
+        raw = np.zeros((48, 64, 4), dtype=np.uint8)
+        with mock.patch.object(capture.backend, 'grab', return_value=raw):
+            frame = capture.capture()
+        self.assertTrue(np.shares_memory(frame, raw))
+        self.assertFalse(frame.flags.writeable)
+        # A backend that reuses its output still gets copied into the pool
+        with mock.patch.object(capture.backend, 'grab', return_value=raw), \
+                mock.patch.object(capture.backend, 'fresh_frames', False):
+            self.assertFalse(np.shares_memory(capture.capture(), raw))
+
+    def test_capture_without_zero_copy_is_owned(self):
+        capture = make_capture(zero_copy=False)
+        self.assertTrue(capture.capture().flags.writeable)
+
+    def test_capture_screen_returns_rgb_image(self):
+        image = make_capture().capture_screen()
+        self.assertEqual(image.size, (64, 48))
+        self.assertEqual(image.mode, 'RGB')
+
+    def test_recording_pipeline_counts_frames(self):
+        # The recorder clones the capture, so use a backend that works off-screen
+        capture = ScreenCapture(backend='synthetic', backend_options={'width': 64, 'height': 48})
+        writer = mock.Mock(spec=['write', 'release'])
+        with mock.patch('modules.screen_capture.create_video_writer', return_value=writer), \
+                mock.patch.object(capture, 'capture', side_effect=AssertionError("shared backend used")):
+            self.assertTrue(capture.start_recording(fps=200, buffer_frames=4))
+            time.sleep(0.2)
+            capture.stop_recording()
+        stats = capture.get_recording_stats()
+        self.assertGreater(stats['captured'], 0)
+        self.assertEqual(stats['captured'], stats['encoded'] + stats['dropped'])
+        self.assertEqual(writer.write.call_count, stats['encoded'])
+        self.assertEqual(writer.write.call_args[0][0].shape, (48, 64, 3))
+        writer.release.assert_called_once()
+
+class TestEncoders(unittest.TestCase):
+    def test_ffmpeg_command_maps_codec_and_quality(self):
+        command = FFmpegWriter.build_command('ffmpeg', 'out.mp4', 'h264', 30, (640, 480), 23)
+        self.assertEqual(command[command.index('-c:v') + 1], 'libx264')
+        self.assertEqual(command[command.index('-crf') + 1], '23')
+        self.assertEqual(command[command.index('-s') + 1], '640x480')
+
+    def test_odd_sizes_are_padded_for_yuv420p(self):
+        command = FFmpegWriter.build_command('ffmpeg', 'out.mp4', 'h264', 30, (641, 480), 23)
+        self.assertEqual(command[command.index('-vf') + 1], 'pad=ceil(iw/2)*2:ceil(ih/2)*2')
+        self.assertNotIn('-vf', FFmpegWriter.build_command('ffmpeg', 'out.mp4', 'h264', 30, (640, 480), 23))
+
+    @unittest.skipIf(os.name == 'nt', "fake ffmpeg is a POSIX script")
+    def test_write_path_with_chatty_ffmpeg(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            # Logs far more than a pipe buffer before reading any input
+            fake = os.path.join(tmp, 'ffmpeg')
+            with open(fake, 'w') as f:
+                f.write(f"""#!{sys.executable}
+import sys
+sys.stderr.write('warning: noisy encoder\\n' * 20000)
+sys.stderr.flush()
+size = len(sys.stdin.buffer.read())
+with open(sys.argv[-1], 'w') as out:
+    out.write(f"{{size}} {{' '.join(sys.argv[1:])}}")
+sys.stderr.write('done\\n')
+""")
+            os.chmod(fake, 0o755)
+            output = os.path.join(tmp, 'out.mp4')
+            writer = FFmpegWriter(output, 'h264', 30, (65, 47), ffmpeg_path=fake)
+            frame = np.zeros((47, 65, 3), dtype=np.uint8)
+
+            def encode():
+                for _ in range(60):
+                    writer.write(frame)
+                writer.release()
+            thread = threading.Thread(target=encode, daemon=True)
+            thread.start()
+            thread.join(timeout=30)
+            self.assertFalse(thread.is_alive(), "writer blocked on ffmpeg's stderr")
+            with open(output) as f:
+                size, args = f.read().split(' ', 1)
+        self.assertEqual(int(size), 60 * 65 * 47 * 3)
+        self.assertIn('pad=ceil(iw/2)*2:ceil(ih/2)*2', args)
+        self.assertEqual(writer.get_stats()['frames_written'], 60)
+        self.assertEqual(writer._stderr().splitlines()[-1], 'done')
+
+    def test_falls_back_to_opencv_without_ffmpeg(self):
+        with mock.patch('modules.encoders.ffmpeg_available', return_value=False), \
+                mock.patch('modules.encoders.cv2.VideoWriter') as video_writer:
+            writer = create_video_writer('out.avi', 30, 23, 'MJPG', 64, 48, encoder='ffmpeg')
+        self.assertIs(writer, video_writer.return_value)
+
+    def test_rejects_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            create_video_writer('out.avi', 30, 23, 'MJPG', 64, 48, encoder='gstreamer')
+
+class TestCaptureBackends(unittest.TestCase):
+    def test_synthetic_backend_is_deterministic(self):
+        first = SyntheticBackend(width=128, height=64, change_rate=0.25, tile_size=32, seed=3)
+        second = SyntheticBackend(width=128, height=64, change_rate=0.25, tile_size=32, seed=3)
+        for _ in range(3):
+            a = first.grab(first.monitors[1])
+            b = second.grab(second.monitors[1])
+        np.testing.assert_array_equal(a, b)
+        self.assertEqual(a.shape, (64, 128, 4))
+
+    def test_synthetic_change_rate(self):
+        backend = SyntheticBackend(width=128, height=128, change_rate=0.25, tile_size=32)
+        before = backend.grab(backend.monitors[1])
+        after = backend.grab(backend.monitors[1])
+        changed_tiles = (before != after).any(axis=2).reshape(4, 32, 4, 32).any(axis=(1, 3))
+        self.assertLessEqual(int(changed_tiles.sum()), 4)
+        self.assertGreater(int(changed_tiles.sum()), 0)
+
+    def test_synthetic_monitors_and_regions(self):
+        backend = SyntheticBackend(width=64, height=32, monitors=2)
+        self.assertEqual(len(backend.monitors), 3)
+        self.assertEqual(backend.grab(backend.monitors[0]).shape, (32, 128, 4))
+        region = backend.grab({'left': 70, 'top': 4, 'width': 10, 'height': 8})
+        self.assertEqual(region.shape, (8, 10, 4))
+
+    def test_video_file_backend_replays_frames(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'clip.avi')
+            writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 30, (32, 16))
+            for value in (0, 120, 240):
+                writer.write(np.full((16, 32, 3), value, dtype=np.uint8))
+            writer.release()
+            backend = VideoFileBackend(path)
+            means = [int(backend.grab(backend.monitors[1])[..., :3].mean()) for _ in range(4)]
+            backend.close()
+        self.assertEqual(means[0] < means[1] < means[2], True)
+        self.assertAlmostEqual(means[3], means[0], delta=5)
+
+    def test_screen_capture_on_synthetic_backend(self):
+        capture = ScreenCapture(backend='synthetic', backend_options={'width': 96, 'height': 64})
+        self.assertEqual(capture.capture().shape, (64, 96, 4))
+        self.assertEqual(capture.clone().backend_name, 'synthetic')
+
+    def test_clone_keeps_pool_size(self):
+        capture = ScreenCapture(pool_size=7, backend='synthetic')
+        clone = capture.clone()
+        self.assertEqual(clone.pool_size, 7)
+        self.assertIsNot(clone.backend, capture.backend)
+
+    def test_rejects_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            create_backend('dxgi')
+
+class TestRegionScheduler(unittest.TestCase):
+    def test_merge_rects(self):
+        merged = merge_rects([(0, 0, 10, 10), (5, 5, 10, 10), (100, 100, 5, 5)])
+        self.assertEqual(sorted(merged), [(0, 0, 15, 15), (100, 100, 5, 5)])
+
+    def test_merge_chains_transitively(self):
+        merged = merge_rects([(0, 0, 10, 10), (20, 0, 10, 10), (8, 0, 14, 5)])
+        self.assertEqual(merged, [(0, 0, 30, 10)])
+
+    def test_overlapping_regions_share_a_grab(self):
+        scheduler = RegionScheduler()
+        received = {}
+        callback = lambda region_id, frame, timestamp: received.__setitem__(region_id, frame)
+        first = scheduler.add_region((0, 0, 20, 20), fps=60, callback=callback)
+        second = scheduler.add_region((10, 10, 20, 20), fps=10, callback=callback)
+        grabbed = []
+
+        def grab(rect):
+            grabbed.append(rect)
+            return np.zeros((rect[3], rect[2], 4), dtype=np.uint8)
+
+        self.assertEqual(scheduler.tick(grab, now=1.0), 1)
+        self.assertEqual(grabbed, [(0, 0, 30, 30)])
+        self.assertEqual(received[first].shape, (20, 20, 4))
+        self.assertEqual(received[second].shape, (20, 20, 4))
+
+        # Only the 60 fps region is due a frame later
+        self.assertEqual(scheduler.tick(grab, now=1.0 + 1 / 60), 1)
+        self.assertEqual(grabbed[-1], (0, 0, 20, 20))
+
+    def test_timestamps_use_monotonic_clock(self):
+        scheduler = RegionScheduler()
+        region_id = scheduler.add_region((0, 0, 10, 10), fps=30)
+        before = time.monotonic()
+        scheduler.tick(lambda rect: np.zeros((rect[3], rect[2], 4), dtype=np.uint8), now=1.0)
+        _, timestamp = scheduler.latest(region_id)
+        self.assertTrue(before <= timestamp <= time.monotonic())
+
+    def test_rejects_invalid_region(self):
+        with self.assertRaises(ValueError):
+            RegionScheduler().add_region((0, 0, 0, 10))
+
+class TestMultiMonitorCapture(unittest.TestCase):
+    def test_snapshot_picks_frames_nearest_target(self):
+        capture = MultiMonitorCapture(fps=30)
+        for monitor in (1, 2):
+            capture.workers[monitor] = MonitorWorker(monitor, fps=30)
+        for i, timestamp in enumerate((1.00, 1.03, 1.06)):
+            frame = np.full((4, 4, 4), i, dtype=np.uint8)
+            capture.workers[1].publish(frame, timestamp)
+            capture.workers[2].publish(frame, timestamp + 0.01)
+
+        snapshot = capture.snapshot(at=1.035)
+        self.assertEqual(snapshot.timestamps[1], 1.03)
+        self.assertAlmostEqual(snapshot.timestamps[2], 1.04)
+        self.assertAlmostEqual(snapshot.skew, 0.01)
+        self.assertEqual(int(snapshot.frames[1][0, 0, 0]), 1)
+
+    def test_published_frames_are_not_overwritten(self):
+        worker = MonitorWorker(1, fps=30, history=2)
+        worker.publish(np.zeros((2, 2, 4), dtype=np.uint8), 1.0)
+        first, _, _ = worker.slot.latest()
+        worker.publish(np.ones((2, 2, 4), dtype=np.uint8), 2.0)
+        self.assertEqual(int(first.max()), 0)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,106 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+
+from ai_vision.tiling import TiledInference, dirty_mask, merge_predictions, tile_grid
+from modules.change_detector import ChangeDetector
+
+class BlobDetector:
+    """Reports every bright blob in each image as a class 0 box"""
+    def __init__(self):
+        self.batches = []
+
+    def predict(self, images):
+        self.batches.append([image.shape[:2] for image in images])
+        predictions = []
+        for image in images:
+            count, _, stats, _ = cv2.connectedComponentsWithStats((image[..., 0] > 0).astype(np.uint8))
+            predictions.append(np.array([[x, y, x + w, y + h, 0.9, 0] for x, y, w, h, _ in stats[1:count]],
+                                        dtype=np.float32).reshape(-1, 6))
+        return predictions
+
+def screen(*boxes):
+    frame = np.zeros((200, 300, 3), dtype=np.uint8)
+    for x1, y1, x2, y2 in boxes:
+        frame[y1:y2, x1:x2] = 255
+    return frame
+
+class TestTiling(unittest.TestCase):
+    def test_grid_overlaps_and_reaches_the_edges(self):
+        tiles = tile_grid(200, 300, 100, 0.25)
+        self.assertEqual(tiles[:, 2].max(), 300)
+        self.assertEqual(tiles[:, 3].max(), 200)
+        self.assertTrue(((tiles[:, 2] - tiles[:, 0]) == 100).all())
+        self.assertEqual(sorted(set(tiles[:, 0].tolist())), [0, 75, 150, 200])
+        np.testing.assert_array_equal(tile_grid(50, 60, 100, 0.25), [[0, 0, 60, 50]])
+
+    def test_dirty_mask_selects_touching_tiles(self):
+        tiles = tile_grid(200, 300, 100, 0.0)
+        mask = dirty_mask(tiles, [(120, 10, 5, 5)])
+        np.testing.assert_array_equal(np.flatnonzero(mask), [1])
+        self.assertFalse(dirty_mask(tiles, []).any())
+
+    def test_merge_keeps_other_classes(self):
+        merged = merge_predictions([np.array([[0, 0, 10, 10, 0.9, 0]]),
+                                    np.array([[0, 0, 10, 10, 0.8, 1], [1, 0, 10, 10, 0.5, 0]])])
+        self.assertEqual(sorted(merged[:, 5].tolist()), [0, 1])
+
+    def test_only_clipped_boxes_fold_into_containing_ones(self):
+        whole = np.array([[0, 0, 10, 10, 0.9, 0]])
+        inner = np.array([[2, 2, 8, 8, 0.95, 0]])
+        # An unclipped box inside another is a separate element under IoU NMS
+        self.assertEqual(len(merge_predictions([whole, inner], clipped=[[False], [False]])), 2)
+        # A clipped one is a fragment, even when it scored higher
+        merged = merge_predictions([whole, inner], clipped=[[False], [True]])
+        np.testing.assert_array_equal(merged, whole.astype(np.float32))
+
+    def test_border_object_is_merged_into_one_box(self):
+        detector = BlobDetector()
+        tiler = TiledInference(tile_size=100, overlap=0.3, full_frame=False)
+        # Crosses the border between the first two tile columns
+        prediction = tiler.predict(screen((60, 20, 90, 40)), detector.predict)
+        np.testing.assert_array_equal(prediction[:, :4], [[60, 20, 90, 40]])
+
+    def test_tiles_run_in_one_batch_with_the_full_frame(self):
+        detector = BlobDetector()
+        tiler = TiledInference(tile_size=100, overlap=0.3)
+        prediction = tiler.predict(screen((10, 10, 20, 20), (150, 120, 290, 190)), detector.predict)
+        self.assertEqual(len(detector.batches), 1)
+        self.assertEqual(len(detector.batches[0]), len(tiler.tiles(200, 300)) + 1)
+        self.assertEqual(detector.batches[0][-1], (200, 300))
+        # The large box comes whole from the full frame and absorbs its tile fragments
+        self.assertEqual(sorted(prediction[:, :4].tolist()),
+                         [[10, 10, 20, 20], [150, 120, 290, 190]])
+
+    def test_dirty_only_reruns_changed_tiles(self):
+        detector = BlobDetector()
+        changes = ChangeDetector(tile_size=16)
+        tiler = TiledInference(tile_size=100, overlap=0.0, full_frame=False, dirty_only=True)
+        first = screen((10, 10, 20, 20))
+        tiler.predict(first, detector.predict, changes.update(first))
+        second = screen((10, 10, 20, 20), (250, 150, 260, 160))
+        prediction = tiler.predict(second, detector.predict, changes.update(second))
+        self.assertEqual(len(detector.batches[1]), 1)
+        self.assertEqual(len(prediction), 2)
+        self.assertEqual(tiler.stats['tiles_reused'], 5)
+        # Nothing changed: no model call at all
+        tiler.predict(second, detector.predict, changes.update(second.copy()))
+        self.assertEqual(len(detector.batches), 2)
+
+    def test_vision_processor_tiled_mode(self):
+        from modules.vision import VisionProcessor
+        processor = VisionProcessor()
+        processor.model = processor.detector = BlobDetector()
+        processor.enable_tiling(100, 0.3, dirty_only=True)
+        frame = screen((60, 20, 90, 40))
+        _, detections = processor.process_frame(frame)
+        self.assertEqual(detections[['xmin', 'xmax']].tolist(), [(60.0, 90.0)])
+        processor.process_frame(frame.copy())
+        self.assertEqual(processor.tiler.stats['tiles_run'], len(processor.tiler.tiles(200, 300)))
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
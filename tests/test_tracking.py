@@ -0,0 +1,139 @@
+import unittest
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from ai_vision.detections import from_prediction
+from ai_vision.tracking import ObjectTracker, TrackingAnalyzer
+
+def detections(*rows):
+    return from_prediction(np.array(rows, dtype=np.float32).reshape(-1, 6))
+
+class FakeAnalyzer:
+    names = {0: 'button', 1: 'icon'}
+
+    def __init__(self):
+        self.calls = 0
+
+    def analyze_frame(self, frame):
+        self.calls += 1
+        # A wide button moving 10 px right per frame
+        x = 10.0 * frame[0, 0]
+        return frame, detections([x, 0, x + 100, 20, 0.9, 0])
+
+class TestObjectTracker(unittest.TestCase):
+    def test_ids_stay_stable_across_keyframes(self):
+        tracker = ObjectTracker(keyframe_interval=2)
+        first = tracker.update(detections([0, 0, 20, 20, 0.9, 0], [100, 100, 140, 120, 0.8, 1]), now=0.0)
+        tracker.predict(now=0.1)
+        tracker.predict(now=0.2)
+        second = tracker.update(detections([102, 100, 142, 120, 0.8, 1], [4, 0, 24, 20, 0.9, 0]), now=0.3)
+        self.assertEqual(sorted(first['track_id'].tolist()), [1, 2])
+        by_class = {int(c): int(t) for c, t in zip(second['class'], second['track_id'])}
+        self.assertEqual(by_class, {int(c): int(t) for c, t in zip(first['class'], first['track_id'])})
+
+    def test_predicts_constant_velocity(self):
+        tracker = ObjectTracker(keyframe_interval=2, smoothing=0.0)
+        tracker.update(detections([0, 0, 20, 20, 0.9, 0]), now=0.0)
+        tracker.predict(now=1.0)
+        tracker.predict(now=2.0)
+        tracker.update(detections([6, 0, 26, 20, 0.9, 0]), now=3.0)
+        predicted = tracker.predict(now=4.0)
+        self.assertAlmostEqual(float(predicted['xmin'][0]), 8.0)
+        # Velocity is per second, so an irregular frame gap moves the box further
+        self.assertAlmostEqual(float(tracker.predict(now=6.5)['xmin'][0]), 13.0)
+        self.assertEqual(tracker.drift_stats['samples'], 1)
+        # The first prediction assumed no motion, so it was off
+        self.assertGreater(tracker.drift_stats['mean'], 0.0)
+
+    def test_hold_stops_tracks_in_place(self):
+        tracker = ObjectTracker(smoothing=0.0)
+        tracker.update(detections([0, 0, 20, 20, 0.9, 0]), now=0.0)
+        tracker.update(detections([10, 0, 30, 20, 0.9, 0]), now=1.0)
+        tracker.hold(now=2.0)
+        self.assertAlmostEqual(float(tracker.predict(now=5.0)['xmin'][0]), 10.0)
+
+    def test_drops_tracks_missed_too_often(self):
+        tracker = ObjectTracker(max_missed=1)
+        tracker.update(detections([0, 0, 20, 20, 0.9, 0]))
+        self.assertEqual(len(tracker.update(detections())), 1)
+        self.assertEqual(len(tracker.update(detections())), 0)
+        # A different class never continues the track
+        tracks = tracker.update(detections([0, 0, 20, 20, 0.9, 1]))
+        self.assertEqual(tracks['track_id'].tolist(), [2])
+
+class TestTrackingAnalyzer(unittest.TestCase):
+    def test_runs_model_on_keyframes_only(self):
+        analyzer = FakeAnalyzer()
+        tracking = TrackingAnalyzer(analyzer, keyframe_interval=3, smoothing=0.0)
+        positions = []
+        for i in range(7):
+            _, tracks = tracking.analyze_frame(np.full((4, 4), i, dtype=np.uint8), now=float(i))
+            positions.append(float(tracks['xmin'][0]))
+        self.assertEqual(analyzer.calls, 3)
+        # Once the velocity is known, tracked frames land where the model would have
+        self.assertEqual(positions[3:], [30.0, 40.0, 50.0, 60.0])
+        self.assertEqual(tracking.tracker.drift_stats['samples'], 2)
+
+    def test_keyframes_reuse_the_analyzer_annotation(self):
+        class Blank(FakeAnalyzer):
+            def analyze_frame(self, frame):
+                self.calls += 1
+                return frame.copy(), detections() if self.calls > 1 else detections([1, 1, 6, 6, 0.9, 0])
+        tracking = TrackingAnalyzer(Blank(), keyframe_interval=1)
+        frame = np.zeros((10, 10, 3), dtype=np.uint8)
+        annotated, tracks = tracking.analyze_frame(frame)
+        # The analyzer drew nothing and the tracks it detected are not drawn again
+        self.assertFalse(annotated.any())
+        # A track the keyframe missed is still shown
+        annotated, tracks = tracking.analyze_frame(frame)
+        self.assertEqual(len(tracks), 1)
+        self.assertTrue(annotated.any())
+        self.assertFalse(frame.any())
+
+    def test_unloaded_analyzer_gives_empty_tracks(self):
+        class Unloaded(FakeAnalyzer):
+            def analyze_frame(self, frame):
+                return None, detections()
+        annotated, tracks = TrackingAnalyzer(Unloaded()).analyze_frame(np.zeros((4, 4), dtype=np.uint8))
+        self.assertIsNone(annotated)
+        self.assertEqual(tracks.dtype.names[-1], 'track_id')
+        self.assertEqual(len(tracks), 0)
+
+class TestTrackerInFrontOfGate(unittest.TestCase):
+    def setUp(self):
+        from modules.adaptive_inference import AdaptiveInference
+        self.analyzer = FakeAnalyzer()
+        self.gate = AdaptiveInference(self.analyzer, min_interval=2.5, max_interval=2.5)
+        self.tracking = TrackingAnalyzer(self.gate, keyframe_interval=1, smoothing=0.0)
+
+    def frame(self, i):
+        frame = np.full((36, 64), 50 + 10 * i, dtype=np.uint8)
+        frame[0, 0] = i
+        return frame
+
+    def test_gate_only_sees_model_runs(self):
+        positions = []
+        for i in range(7):
+            annotated, tracks = self.tracking.analyze_frame(self.frame(i), now=float(i))
+            self.assertIsNotNone(annotated)
+            positions.append(float(tracks['xmin'][0]))
+        # The gate rate-limits keyframes; the tracker fills in every frame
+        self.assertEqual(self.analyzer.calls, 3)
+        self.assertEqual(positions[3:], [30.0, 40.0, 50.0, 60.0])
+        self.assertEqual(self.gate.stats['reasons'], {'first': 1, 'motion': 2, 'rate_limited': 4})
+        self.assertEqual(len([d for d in self.gate.history if d.latency is not None]), 3)
+
+    def test_idle_screen_holds_the_tracks(self):
+        for i in range(4):
+            self.tracking.analyze_frame(self.frame(i), now=float(i))
+        still = self.frame(3)
+        for now in (4.0, 5.0):
+            _, tracks = self.tracking.analyze_frame(still, now=now)
+        self.assertEqual(self.gate.history[-1].reason, 'idle')
+        self.assertEqual(float(tracks['xmin'][0]), 30.0)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
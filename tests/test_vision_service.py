@@ -0,0 +1,141 @@
+import unittest
+import sys
+import os
+import time
+from concurrent.futures import CancelledError
+from threading import Event, Lock
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from ai_vision.service import InferenceService
+
+class BlockingAnalyzer:
+    """Holds every call until released so tests control when workers are busy"""
+    def __init__(self):
+        self.release = Event()
+        self.started = Event()
+        self.seen = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = Lock()
+
+    def analyze_frame(self, frame):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        self.started.set()
+        self.release.wait(5)
+        with self.lock:
+            self.active -= 1
+            self.seen.append(int(frame[0, 0, 0]))
+        return frame, [int(frame[0, 0, 0])]
+
+class DoublingAnalyzer:
+    def analyze_frame(self, frame):
+        return frame * 2, []
+
+def frame(value):
+    return np.full((4, 4, 3), value, dtype=np.uint8)
+
+class TestInferenceService(unittest.TestCase):
+    def setUp(self):
+        self.analyzer = BlockingAnalyzer()
+
+    def test_latest_frame_wins(self):
+        service = InferenceService(self.analyzer)
+        service.start()
+        try:
+            first = service.submit('screen', frame(1))
+            self.assertTrue(self.analyzer.started.wait(5))
+            # Submitting never waits on the busy worker
+            start = time.perf_counter()
+            stale = [service.submit('screen', frame(value)) for value in (2, 3)]
+            latest = service.submit('screen', frame(4))
+            self.assertLess(time.perf_counter() - start, 0.5)
+            self.analyzer.release.set()
+            self.assertEqual(first.result(5).detections, [1])
+            self.assertEqual(latest.result(5).detections, [4])
+        finally:
+            service.stop()
+        for future in stale:
+            with self.assertRaises(CancelledError):
+                future.result(0)
+        self.assertEqual(self.analyzer.seen, [1, 4])
+        self.assertEqual(service.stats['dropped'], 2)
+        self.assertEqual(service.stats['completed'], 2)
+
+    def test_one_frame_per_source_at_a_time(self):
+        service = InferenceService(self.analyzer, workers=3)
+        service.start()
+        try:
+            service.submit('a', frame(1))
+            self.assertTrue(self.analyzer.started.wait(5))
+            second = service.submit('a', frame(2))
+            other = service.submit('b', frame(10))
+            time.sleep(0.05)
+            self.assertEqual(self.analyzer.active, 2)
+            self.analyzer.release.set()
+            second.result(5)
+            other.result(5)
+        finally:
+            service.stop()
+        self.assertEqual(self.analyzer.max_active, 2)
+        self.assertLess(self.analyzer.seen.index(1), self.analyzer.seen.index(2))
+
+    def test_result_carries_source_timestamp(self):
+        service = InferenceService(DoublingAnalyzer())
+        delivered = []
+        done = Event()
+        service.start()
+        try:
+            captured = time.monotonic() - 0.05
+            future = service.submit('screen', frame(3), captured,
+                                    callback=lambda result: (delivered.append(result), done.set()))
+            result = future.result(5)
+            self.assertTrue(done.wait(5))
+        finally:
+            service.stop()
+        self.assertIs(delivered[0], result)
+        self.assertEqual(result.timestamp, captured)
+        self.assertGreaterEqual(result.latency, 0.05)
+        self.assertEqual(int(result.annotated[0, 0, 0]), 6)
+        self.assertEqual(service.latency_stats['samples'], 1)
+        self.assertGreaterEqual(service.latency_stats['p50_ms'], 50.0)
+
+    def test_analyzer_errors_reach_the_future(self):
+        class Failing:
+            def analyze_frame(self, frame):
+                raise ValueError("bad frame")
+        service = InferenceService(Failing())
+        service.start()
+        try:
+            with self.assertRaises(ValueError):
+                service.submit('screen', frame(0)).result(5)
+            # The worker survives and keeps serving
+            service.analyzer = DoublingAnalyzer()
+            self.assertEqual(int(service.submit('screen', frame(1)).result(5).annotated[0, 0, 0]), 2)
+        finally:
+            service.stop()
+        self.assertEqual(service.stats['failed'], 1)
+
+    def test_process_workers_build_their_own_analyzer(self):
+        service = InferenceService(workers=2, mode='process', analyzer_factory=DoublingAnalyzer)
+        service.start()
+        try:
+            futures = [service.submit(source, frame(value))
+                       for source, value in (('a', 1), ('b', 2))]
+            values = [int(future.result(30).annotated[0, 0, 0]) for future in futures]
+        finally:
+            service.stop()
+        self.assertEqual(values, [2, 4])
+
+    def test_rejects_submit_when_stopped(self):
+        service = InferenceService(DoublingAnalyzer())
+        with self.assertRaises(RuntimeError):
+            service.submit('screen', frame(0))
+        with self.assertRaises(ValueError):
+            InferenceService(workers=1, mode='process')
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
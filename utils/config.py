@@ -5,6 +5,20 @@
 
 logger = logging.getLogger(__name__)
 
+VISION_DEFAULTS = {
+    'backend': 'torch',
+    'model_dir': 'models',
+    'onnx_models': {},
+    'quantized': False,
+    'img_size': 640,
+    'threads': 0,
+    'keyframe_interval': 5,
+    'workers': 1,
+    'tile_size': 0,
+    'tile_overlap': 0.2,
+    'dirty_tiles_only': False
+}
+
 class Config:
     _instance = None
     _config = {}
@@ -21,6 +35,8 @@ def __init__(self):
     def load_config(self):
         try:
             config_path = Path(__file__).parent.parent / 'config.json'
+            if not config_path.exists():
+                config_path = Path(__file__).parent.parent / 'config' / 'config.json'
             if config_path.exists():
                 with open(config_path) as f:
                     self._config = json.load(f)
@@ -35,3 +51,12 @@ def debug_mode(self):
     @property
     def performance_mode(self):
         return self._config.get('performance_mode', 'balanced')
+
+    @property
+    def vision(self):
+        """Vision model settings; backend is 'torch' or 'onnx', quantized selects the INT8 ONNX model.
+
+        onnx_models maps a model name to its ONNX file; models without an
+        entry use the model store's export.
+        """
+        return {**VISION_DEFAULTS, **self._config.get('vision', {})}